@@ -55,6 +55,8 @@ from app.api.v1.endpoints import (
 )
 from app.api.v1.endpoints import postLandingMessage
 from app.api.v1.endpoints import deleteUser
+from app.api.v1.endpoints import getSchedulerStats
+from app.api.v1.endpoints import getLLMStats
 from app.core.deps import get_session
 from app.dependencies.verifyjwt import verify_jwt
 from app.dependencies.verifystatus import verify_status_factory
@@ -82,6 +84,22 @@ api_router.include_router(
     dependencies=[Depends(verify_jwt), Depends(verify_user_type_factory("ADM")), Depends(verify_status_factory("active"))],
 )
 
+# rota de desenvolvimento com a telemetria das varreduras periódicas (por processo)
+api_router.include_router(
+    getSchedulerStats.router,
+    prefix="/dev",
+    tags=["dev"],
+    dependencies=[Depends(verify_jwt), Depends(verify_user_type_factory("ADM")), Depends(verify_status_factory("active"))],
+)
+
+# rota de desenvolvimento com o estado das chamadas ao modelo (governor, cache, breaker, gravação)
+api_router.include_router(
+    getLLMStats.router,
+    prefix="/dev",
+    tags=["dev"],
+    dependencies=[Depends(verify_jwt), Depends(verify_user_type_factory("ADM")), Depends(verify_status_factory("active"))],
+)
+
 # rota pública para mensagens do landing page
 api_router.include_router(postLandingMessage.router, prefix="/contact", tags=["contact"])
 
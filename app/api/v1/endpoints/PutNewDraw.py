@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.core.deps import get_session
+from app.core.configs import settings
 from app.schemas.draw import DrawUpdate  # Import DrawUpdate schema
 from app.schemas.spread_type import SpreadTypeSchema  # Import SpreadTypeSchema
 from app.schemas.user import UserSchemaBase  # Import UserSchemaBase
@@ -14,9 +15,18 @@ from app.schemas.deck import DeckSchema  # Import DeckSchema
 from app.schemas.user_type import UserTypeSchema  # Import ClientSchema
 # from app.schemas.user_type import UserTypeSchemaBase  # Import UserTypeSchemaBase
 from app.services.token import TokenInfoSchema # Import TokenInfoSchema
+import ast
 import asyncio
+import json
+import re
+import time
 
 from app.services.openai import OpenAIService  # Import OpenAIService
+from app.services.llm_governor import LLMLane
+from app.services.llm_errors import LLMError, LLMDeadlineExceeded, LLMTimeoutError
+from app.services.embeddings import embedding_service
+from app.services.reading_summary import reading_summary_service
+from app.services.topic_classifier import topic_classifier
 from app.schemas.topic import TopicSchema  # Import TopicSchema
 from app.schemas.status import StatusSchema  # Import StatusSchema
 from app.schemas.reading_style import ReadingStyleSchema # Import ReadingStyleSchema
@@ -24,22 +34,21 @@ from app.schemas.review import ReviewSchema  # Import ReviewSchema
 from app.schemas.mission_type import MissionTypeSchemaBase  # Import MissionTypeSchemaBase
 from app.services.confirmMissionService import ConfirmMissionService
 
-from app.services.extract import JsonExtractor  # Import JsonExtractor
+from app.services.extract import JsonExtractor, IncrementalJsonParser  # Import JsonExtractor
+from app.services.metrics import metrics
+from app.services.prompt_budget import PromptBudget
+from app.core.postgresdatabase import Session
 from app.prompts.analise_contexto import (
     prompt_analise_contexto_template,
     role_analise_contexto,
 )
-from app.prompts.comparador import (
-    prompt_comparador_template,
-    role_comparador,
-)
-from app.prompts.resumo_leitura import (
-    prompt_resumo_leitura_template,
-    role_resumo_leitura,
-)
 from app.prompts.readings import (
     prompt_base_template,
     prompt_final_template,
+    prompt_preambulo_paralelo_template,
+    prompt_secao_introducao_template,
+    prompt_secao_carta_template,
+    prompt_secao_conclusao_template,
     role as readings_role,
 )
 
@@ -47,6 +56,540 @@ router = APIRouter()
 
 
 
+async def _classify_topics_with_llm(db: AsyncSession, context: str, deadline: float) -> list[int]:
+    """
+    Classificação dos tópicos pelo modelo, usada quando o topic_classifier local não tem confiança.
+    """
+    topic_name = await TopicSchema.get_all_topics_names(db)
+    prompt_analise_contexto = prompt_analise_contexto_template.format(
+        context=context,
+        topic_name=topic_name,
+    )
+
+    try:
+        matching_topics = await OpenAIService().gerar_texto(
+            prompt_ajustado=prompt_analise_contexto,
+            max_tokens=40,
+            role=role_analise_contexto,
+            temperature=0.95,
+            timeout=20,
+            lane=LLMLane.AUXILIARY,
+            cache_ttl=settings.LLM_CACHE_TTL_CONTEXT,
+            deadline=deadline,
+        )
+    except LLMError as e:
+        # os tópicos só enriquecem a tiragem; segue sem eles
+        print(f"Erro ao classificar o contexto: {e}")
+        return []
+
+    # Ensure matching_topics is parsed into a Python list
+    match = re.search(r"\[.*?\]", matching_topics, re.DOTALL)
+    try:
+        matching_topics = ast.literal_eval(match.group(0)) if match else []
+    except (ValueError, SyntaxError):
+        matching_topics = []
+
+    return await TopicSchema.get_all_topics_ids_by_list_names(db, matching_topics)
+
+
+async def _prepare_reading(
+    request: Request,
+    draw_data: DrawUpdate,
+    db: AsyncSession,
+    deadline: float,
+) -> dict:
+    """
+    Valida a requisição e monta o prompt da leitura (tudo o que acontece antes da
+    chamada principal ao modelo). Retorna o prompt, o role, o max_tokens e os dados
+    usados por _finalize_reading para concluir a tiragem.
+    `deadline` (time.monotonic()) é o prazo total da requisição, repassado às chamadas ao modelo.
+    """
+
+
+    token_info: TokenInfoSchema = getattr(request.state, "token_info", None)
+    if token_info is None:
+        raise HTTPException(
+            status_code=401, detail="token information is missing"
+        )
+
+    try:
+        user_id = token_info.id
+    except AttributeError:
+        raise HTTPException(status_code=400, detail="User id not found in token")
+    # verifica se o user existe
+    userexists = await UserSchemaBase.user_exists(db, user_id)
+    #print("userexists: ", userexists)
+    if not userexists:
+        raise HTTPException(
+            status_code=400, 
+            detail="User does not exist."
+        )
+    # verifica se o reading style existe
+    #tem que verificar se o cliente tem acesso ao reading style
+
+
+    # verifica se o tipo de spread existe
+    spreadexists = await SpreadTypeSchema.spread_type_exists(db, draw_data.spread_type_id)
+    #print("spreadexists: ", spreadexists)
+
+    # pega o nome pelo id
+    spreadname = await SpreadTypeSchema.get_spread_type_name_by_id(db, draw_data.spread_type_id)
+
+    # spread_type_exists(db, draw_data.spread_type_id)
+    if not spreadexists:
+        raise HTTPException(
+            status_code=400, 
+            detail="Spread type does not exist."
+        )
+
+    #verifica se o usuario tem um draw pendente do mesmo tipo de spread e pegar esse id
+    id_draw = await DrawSchemaBase.get_pending_draw_id_by_user_and_spread_type(db, user_id, draw_data.spread_type_id)
+    if not id_draw:
+        raise HTTPException(
+        status_code=400,
+        detail="User does not have any pending draws available."
+        )
+
+    #print(f"ID do draw pendente: {id_draw}")
+
+    #verifica se o deck existe
+    deckexists = await DeckSchema.deck_exists(db, draw_data.deck_id)
+    if draw_data.deck_id and not deckexists:
+        raise HTTPException(
+            status_code=400, 
+            detail="Deck does not exist."
+
+        )
+    #print(f"ID do deck: {draw_data.deck_id}")
+
+    # pega o nome do deck pelo id
+    deckname = await DeckSchema.get_deck_name_by_id(db, draw_data.deck_id)
+
+    #pega o id do tipo de usuario
+    user_type_id = await UserSchemaBase.get_user_type_by_id(db, user_id)
+
+
+
+
+    #print(f"ID do tipo de usuario: {user_type_id}")
+    # verifica se o cliente tem o deck
+    client_check = await UserTypeSchema.check_deck_belongs_to_user(db, user_type_id, draw_data.deck_id)
+    if draw_data.deck_id and not client_check:
+        raise HTTPException(
+            status_code=400, 
+            detail="User does not have access to this deck."
+        )
+
+    # verifica se a quantidade de cartas é igual ao tipo de spread
+    card_count = await SpreadTypeSchema.get_card_count(db, draw_data.spread_type_id)
+    #print(f"Quantidade de cartas do tipo de spread: {card_count}")
+    if draw_data.cards and len(draw_data.cards) != card_count:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid number of cards. Expected {card_count}."
+        )   
+
+    # verifica se a as cartas estão duplicadas
+    if draw_data.cards and len(draw_data.cards) != len(set(draw_data.cards)):
+        raise HTTPException(
+            status_code=400, 
+            detail="Duplicate cards found."
+        )
+
+    #verifica se as cartas estão em mesma quantidade que o is_reversed
+
+    #is reversed é opcional, se não for enviado, não verifica
+    if draw_data.is_reversed is not None and len(draw_data.cards) != len(draw_data.is_reversed):
+        raise HTTPException(
+            status_code=400, 
+            detail="The number of cards and the number of is_reversed values must match."
+        )
+
+
+    #verifica se as cartas são todas do mesmo deck
+    deck_check = await CardSchema.check_cards_belong_to_deck(db,  draw_data.deck_id, draw_data.cards,)
+    #print("deck_check: ", deck_check)
+    if not deck_check:
+        raise HTTPException(
+            status_code=400, 
+            detail="Cards do not belong to the same deck."
+        )
+
+    #pegar o nome das cartas que é uma lista de strings        
+    cards_names = await CardSchema.get_cards_names_by_group_ids(db, draw_data.cards, keep_order=True)
+
+    reading_style_exists = await UserTypeSchema.check_reading_style_belongs_to_user(
+        db, 
+        user_type_id= user_type_id, 
+        reading_style_id=draw_data.reading_style
+    )
+
+    if draw_data.reading_style and not reading_style_exists:
+        raise HTTPException(
+            status_code=400, 
+            detail="Reading style does not exist or is not accessible to the user."
+        )
+
+    reading_style_name = await ReadingStyleSchema.get_reading_style_name_by_id(db, draw_data.reading_style)
+    if not reading_style_name:
+        raise HTTPException(
+            status_code=400, 
+            detail="Reading style name does not exist."
+        )        
+    reading_style_description = await ReadingStyleSchema.get_reading_style_description_by_id(db, draw_data.reading_style)
+    if not reading_style_description:
+        raise HTTPException(
+            status_code=400, 
+            detail="Reading style description does not exist."
+        )
+
+    #retorna uma lista de strings com os nomes das cartas
+    #print(f"Nome das cartas: {cards_names}")
+    # return {'cards_names' : cards_names}
+
+    #verifica se o contexto foi enviado 
+    # se o contexto for None retorna erro pq nesse precisa
+    # do contexto para fazer a tiragem de cartas
+    if draw_data.context is None:
+        raise HTTPException(
+            status_code=400, 
+            detail="Context is required for the draw."
+        )
+
+    # se ele tiver, temos que fazer a tiragem de cartas usando o servico de ia da azure 
+
+    # classificação local dos tópicos; o modelo só é consultado quando a confiança é baixa
+    list_id_topics, confidence = topic_classifier.classify(draw_data.context)
+    if list_id_topics and confidence >= settings.TOPIC_CLASSIFIER_MIN_CONFIDENCE:
+        metrics.increment("topics.local")
+    else:
+        metrics.increment("topics.llm_fallback")
+        list_id_topics = await _classify_topics_with_llm(db, draw_data.context, deadline)
+
+    # print(f"Lista de ids dos topicos: {list_id_topics}")
+
+    # tem que pegar o limite de draw por tipo de usuario
+
+    context_amount = await UserTypeSchema.get_context_amount_by_id(db, user_type_id)
+    # Busca as tiragens mais parecidas em todo o histórico do usuário:
+    # uma única consulta de vizinhos mais próximos sobre o embedding do contexto
+    context_embedding = await embedding_service.embed(draw_data.context)
+    nearest_draws = await DrawSchemaBase.get_similar_draws(
+        db,
+        user_id=user_id,
+        embedding=context_embedding,
+        exclude_draw_id=id_draw,
+        top_k=settings.SIMILAR_DRAWS_TOP_K,
+        min_score=settings.SIMILAR_DRAWS_MIN_SCORE,
+    )
+    # variavel para salvar o contexto
+    preview_context = []
+    # lista para armazenar similaridades e detalhes
+    similar_draws = []
+
+    # nomes de baralho e spread se repetem entre as tiragens; consulta cada um uma vez
+    deck_names: dict = {}
+    spread_type_names: dict = {}
+
+    if nearest_draws:
+        for nearest in nearest_draws:
+            d = await DrawSchemaBase.get_draw_details_by_id(db, nearest["id"])
+            review = await ReviewSchema.get_rating_and_comment_by_draw_id(db, nearest["id"])
+            rating, comment = (review if review else (None, None))
+            # o resumo é gerado uma única vez quando a tiragem é concluída;
+            # se ainda não existir (tiragem antiga), é agendado para as próximas buscas
+            if not d.get('reading_summary'):
+                reading_summary_service.schedule(nearest["id"])
+            if d.get('deck_id') not in deck_names:
+                deck_names[d.get('deck_id')] = await DeckSchema.get_deck_name_by_id(db, d.get('deck_id'))
+            if d.get('spread_type_id') not in spread_type_names:
+                spread_type_names[d.get('spread_type_id')] = await SpreadTypeSchema.get_spread_type_name_by_id(
+                    db, d.get('spread_type_id')
+                )
+            similar_draws.append({
+                "similaridade": nearest["score"],
+                "context": nearest["context"],
+                "deck_name": deck_names[d.get('deck_id')],
+                "spread_type_name": spread_type_names[d.get('spread_type_id')],
+                "cards": d.get('cards'),
+                "reading_summary": d.get('reading_summary'),
+                "rating": rating,
+                "comment": comment,
+                "is_reversed": d.get('is_reversed', []),
+            })
+
+    # Ordena: primeiro por rating (se existir, maior primeiro), depois por similaridade (maior primeiro)
+    def sort_key(x):
+        # Se rating não existe, considera -1 para ficar depois dos que têm rating
+        return (x["rating"] if x["rating"] is not None else -1, x["similaridade"])
+
+    similar_draws_sorted = sorted(similar_draws, key=sort_key, reverse=True)
+    preview_context = similar_draws_sorted[:context_amount]
+
+    # pega o nome do usuario
+    user_name = await UserSchemaBase.get_user_name_by_id(db, user_id)
+
+    mandala_id = await SpreadTypeSchema.get_id_by_name(db, "Mandala Astrológica")
+
+
+    # Monta o prompt ajustado incluindo o contexto anterior, se houver
+    # Monta string com contextos anteriores dentro do orçamento de tokens do tipo de usuário
+    previous_contexts_str = ""
+    if preview_context:
+        # print(f"Contextos anteriores encontrados: {preview_context}")
+        card_names_map = await CardSchema.get_cards_names_map(
+            db, [card_id for ctx in preview_context for card_id in (ctx['cards'] or [])]
+        )
+        prompt_budget = PromptBudget(
+            max_tokens=min(
+                settings.READING_CONTEXT_MAX_TOKENS,
+                (context_amount or 0) * settings.READING_CONTEXT_TOKENS_PER_DRAW,
+            ),
+            compact_chars=settings.READING_CONTEXT_COMPACT_CHARS,
+        )
+        previous_contexts_str = prompt_budget.build([
+            (ctx, [card_names_map[card_id] for card_id in (ctx['cards'] or []) if card_id in card_names_map])
+            for ctx in preview_context
+        ])
+        metrics.observe("reading.previous_context_tokens", prompt_budget.used_tokens)
+        metrics.increment("reading.previous_contexts_compacted", prompt_budget.compacted)
+        metrics.increment("reading.previous_contexts_dropped", prompt_budget.dropped)
+
+    # Monta string com informações de cartas invertidas, se houver
+    reversed_info = ""
+    if draw_data.is_reversed is not None:
+        reversed_info = "\n".join(
+            [
+                f"- {card_name}: {'invertida' if is_rev else 'normal'}"
+                for card_name, is_rev in zip(cards_names, draw_data.is_reversed)
+            ]
+        )
+        # print(f"Reversed info: {reversed_info}")
+        reversed_info = f"Situação de cada carta (invertida ou normal):\n{reversed_info}\n\n"
+
+    # Parte comum do prompt
+    explicacao_invertidas = (
+        f"{reversed_info}"
+        f"Para cada carta, utilize a lista 'is_reversed': {draw_data.is_reversed}.\n"
+        f"Cada item da lista 'is_reversed' corresponde exatamente à carta na mesma posição da lista de cartas.\n"
+        f"Se o valor correspondente for True, interprete a carta como invertida (com significado oposto ou alterado); se for False, interprete normalmente.\n"
+        f"Exemplo: se is_reversed = [False, True, False], então a primeira e terceira carta são normais, e a segunda está invertida.\n"
+        f"Cartas invertidas devem receber uma análise diferenciada, destacando como o significado se transforma em relação à posição normal.\n\n"
+    )
+
+    # Prompt base (do template)
+    prompt_base = prompt_base_template.format(explicacao_invertidas=explicacao_invertidas)
+
+    # Acrescenta contextos anteriores se houver
+    if previous_contexts_str:
+        prompt_base += (
+            f"Considere também os seguintes contextos e leituras anteriores do consulente para enriquecer sua análise e trazer informações relevantes para a consulta atual:\n"
+            f"{previous_contexts_str}\n\n"
+        )
+
+    # Parte final do prompt (do template)
+    prompt_final = prompt_final_template.format(
+        cards_names=cards_names,
+        context=draw_data.context,
+        user_name=user_name,
+        spreadname=spreadname,
+        deckname=deckname,
+        reading_style_name=reading_style_name,
+        reading_style_description=reading_style_description,
+    )
+
+    # Prompt ajustado completo
+    prompt_ajustado = prompt_base + prompt_final
+    metrics.observe("reading.prompt_tokens", PromptBudget.estimate_tokens(prompt_ajustado))
+
+    # Role fixo (do template)
+    role = readings_role
+
+
+    #pegar os tokens
+    amount_tokens = await UserTypeSchema.get_token_amount_by_id(db, user_type_id)
+    max_tokens = (amount_tokens) * (card_count + 2)
+
+    # Modo paralelo: uma chamada menor por seção, todas com o mesmo preâmbulo
+    sections = []
+    if draw_data.parallel:
+        preambulo = prompt_base + prompt_preambulo_paralelo_template.format(
+            cards_names=cards_names,
+            context=draw_data.context,
+            user_name=user_name,
+            spreadname=spreadname,
+            deckname=deckname,
+            reading_style_name=reading_style_name,
+            reading_style_description=reading_style_description,
+        )
+        is_reversed_list = draw_data.is_reversed or [False] * len(cards_names)
+        sections.append(("introducao", preambulo + prompt_secao_introducao_template))
+        for position, (card_name, is_rev) in enumerate(zip(cards_names, is_reversed_list), start=1):
+            sections.append((
+                f"carta_{position}",
+                preambulo + prompt_secao_carta_template.format(
+                    position=position,
+                    card_count=len(cards_names),
+                    card_name=card_name,
+                    orientation="invertida" if is_rev else "normal",
+                ),
+            ))
+        sections.append(("conclusao", preambulo + prompt_secao_conclusao_template))
+
+    #verifica se a pessoa tem o estilo da carta
+    if draw_data.card_style is not None:
+        accessible_card_styles = await UserTypeSchema.get_accessible_card_styles_by_user_type(
+            db, user_type_id
+        )
+        if draw_data.card_style not in accessible_card_styles:
+            raise HTTPException(
+                status_code=400,
+                detail="Card style does not exist or is not accessible to the user."
+            )
+    #agora a gente atribui o valor dele para 1 caso venha None 
+    if draw_data.card_style is None:
+        draw_data.card_style = 1  # Default value if not provided
+
+    return {
+        "user_id": user_id,
+        "id_draw": id_draw,
+        "mandala_id": mandala_id,
+        "list_id_topics": list_id_topics,
+        "context_embedding": context_embedding,
+        "card_count": card_count,
+        "cards_names": cards_names,
+        "prompt": prompt_ajustado,
+        "role": role,
+        "max_tokens": max_tokens,
+        # modo paralelo: (chave, prompt) por seção, cada uma com amount_tokens de saída
+        "sections": sections,
+        "section_max_tokens": amount_tokens,
+        "deadline": deadline,
+    }
+
+
+def _section_task(prepared: dict, key: str, prompt: str) -> asyncio.Task:
+    async def run():
+        text = await OpenAIService().gerar_texto(
+            prompt_ajustado=prompt,
+            role=prepared["role"],
+            max_tokens=prepared["section_max_tokens"],
+            temperature=0.9,
+            lane=LLMLane.READING,
+            deadline=prepared["deadline"],
+        )
+        return key, text
+    return asyncio.create_task(run())
+
+
+async def _generate_parallel_reading(prepared: dict) -> dict:
+    """
+    Gera introdução, cartas e conclusão em paralelo e junta o resultado pela posição.
+    """
+    tasks = [_section_task(prepared, key, prompt) for key, prompt in prepared["sections"]]
+    try:
+        results = await asyncio.gather(*tasks)
+    except Exception:
+        for task in tasks:
+            task.cancel()
+        raise
+    return dict(results)
+
+
+async def _finalize_reading(
+    db: AsyncSession,
+    draw_data: DrawUpdate,
+    prepared: dict,
+    reading: dict | None,
+) -> dict:
+    """
+    Confirma as missões, ordena as cartas e persiste a leitura concluída (uma única gravação).
+    Retorna a leitura ordenada (introducao, carta_1..carta_N, conclusao).
+    """
+    if not isinstance(reading, dict):
+        raise ValueError("A leitura retornada pelo modelo não é um JSON válido.")
+
+    user_id = prepared["user_id"]
+    id_draw = prepared["id_draw"]
+    mandala_id = prepared["mandala_id"]
+    list_id_topics = prepared["list_id_topics"]
+    context_embedding = prepared["context_embedding"]
+
+    status_id = await StatusSchema.get_id_by_name(db, "completed")
+
+    # Se draw_data.is_reversed for None, envia lista vazia
+    is_reversed = draw_data.is_reversed if draw_data.is_reversed is not None else []
+
+    confirm_service = ConfirmMissionService()
+
+    # se for do tipo mandala astrológica, tem que confirmar a missão do usuário
+    if draw_data.spread_type_id == mandala_id:  # Mandala Astrológica
+
+        mission_type_id = await MissionTypeSchemaBase.get_id_by_name(db, "Fazer uma leitura do tipo Mandala Astrológica")
+        await confirm_service.confirm_mission(db,  mission_type_id, user_id)
+
+    id_analitico = await ReadingStyleSchema.get_id_by_name(db, "Analítico")
+
+    if draw_data.reading_style == id_analitico:
+        # se for do tipo analítico, tem que confirmar a missão do usuário
+
+        # print("Fazer uma leitura no modo analitico")
+        mission_type_id = await MissionTypeSchemaBase.get_id_by_name(db, "Fazer uma leitura no modo analítico")
+        await confirm_service.confirm_mission(db,  mission_type_id, user_id)
+
+
+    ordered_reading = {}
+    ordered_reading["introducao"] = reading.get("introducao", "")
+
+    cards_names = prepared["cards_names"]
+
+    if draw_data.parallel:
+        # modo paralelo: cada seção já foi gerada para a sua posição
+        for position in range(1, len(cards_names) + 1):
+            ordered_reading[f"carta_{position}"] = reading.get(f"carta_{position}", "")
+    else:
+        # Reordena as cartas e renomeia as chaves para carta_1, carta_2, ...
+        carta_idx = 1
+        for card_name in cards_names:
+            # Encontrar a chave original (ex: carta_10) cujo valor corresponde ao nome da carta atual
+            for key, value in reading.items():
+                if key.startswith("carta_") and card_name in value:
+                    ordered_reading[f"carta_{carta_idx}"] = value
+                    carta_idx += 1
+                    break
+
+    ordered_reading["conclusao"] = reading.get("conclusao", "")
+
+    # Only extract JSON if ordered_reading is a string
+    if isinstance(ordered_reading, str):
+        ordered_reading = JsonExtractor.extract_json_from_reading(ordered_reading)
+
+    # Converte o dicionário ordered_reading para uma string JSON antes de enviar ao banco
+    ordered_reading_json = json.dumps(ordered_reading)
+
+    draw = await DrawSchemaBase.update_draw_after_standard_reading(
+        db, 
+        draw_id=id_draw, 
+        user_id=user_id, 
+        spread_type_id=draw_data.spread_type_id,
+        deck_id=draw_data.deck_id,
+        cards=draw_data.cards,
+        context=draw_data.context,
+        status_id=status_id,
+        reading=ordered_reading_json,  # Usa a string JSON aqui
+        topics=list_id_topics,
+        is_reversed=is_reversed,
+        card_style=draw_data.card_style
+    )
+    # Embedding do contexto fica salvo para as próximas buscas de tiragens parecidas
+    await DrawSchemaBase.update_context_embedding(db, id_draw, context_embedding)
+    # Resumo da leitura gerado em segundo plano, sem atrasar a resposta
+    reading_summary_service.schedule(id_draw)
+
+
+    return ordered_reading
+
+
 @router.put(
     "/update",
     summary="Atualizar uma tiragem existente",
@@ -122,487 +665,127 @@ async def update_draw(
     db: AsyncSession = Depends(get_session)
 ):
     try:
-        
-        
-        token_info: TokenInfoSchema = getattr(request.state, "token_info", None)
-        if token_info is None:
-            raise HTTPException(
-                status_code=401, detail="token information is missing"
-            )
-        
-        try:
-            user_id = token_info.id
-        except AttributeError:
-            raise HTTPException(status_code=400, detail="User id not found in token")
-        # verifica se o user existe
-        userexists = await UserSchemaBase.user_exists(db, user_id)
-        #print("userexists: ", userexists)
-        if not userexists:
-            raise HTTPException(
-                status_code=400, 
-                detail="User does not exist."
-            )
-        # verifica se o reading style existe
-        #tem que verificar se o cliente tem acesso ao reading style
-        
-            
-        # verifica se o tipo de spread existe
-        spreadexists = await SpreadTypeSchema.spread_type_exists(db, draw_data.spread_type_id)
-        #print("spreadexists: ", spreadexists)
-        
-        # pega o nome pelo id
-        spreadname = await SpreadTypeSchema.get_spread_type_name_by_id(db, draw_data.spread_type_id)
-        
-        # spread_type_exists(db, draw_data.spread_type_id)
-        if not spreadexists:
-            raise HTTPException(
-                status_code=400, 
-                detail="Spread type does not exist."
-            )
-            
-        #verifica se o usuario tem um draw pendente do mesmo tipo de spread e pegar esse id
-        id_draw = await DrawSchemaBase.get_pending_draw_id_by_user_and_spread_type(db, user_id, draw_data.spread_type_id)
-        if not id_draw:
-            raise HTTPException(
-            status_code=400,
-            detail="User does not have any pending draws available."
-            )
-        
-        #print(f"ID do draw pendente: {id_draw}")
-        
-        #verifica se o deck existe
-        deckexists = await DeckSchema.deck_exists(db, draw_data.deck_id)
-        if draw_data.deck_id and not deckexists:
-            raise HTTPException(
-                status_code=400, 
-                detail="Deck does not exist."
-                
-            )
-        #print(f"ID do deck: {draw_data.deck_id}")
-        
-        # pega o nome do deck pelo id
-        deckname = await DeckSchema.get_deck_name_by_id(db, draw_data.deck_id)
-            
-        #pega o id do tipo de usuario
-        user_type_id = await UserSchemaBase.get_user_type_by_id(db, user_id)
-        
-        
-        
-        
-        #print(f"ID do tipo de usuario: {user_type_id}")
-        # verifica se o cliente tem o deck
-        client_check = await UserTypeSchema.check_deck_belongs_to_user(db, user_type_id, draw_data.deck_id)
-        if draw_data.deck_id and not client_check:
-            raise HTTPException(
-                status_code=400, 
-                detail="User does not have access to this deck."
-            )
-        
-        # verifica se a quantidade de cartas é igual ao tipo de spread
-        card_count = await SpreadTypeSchema.get_card_count(db, draw_data.spread_type_id)
-        #print(f"Quantidade de cartas do tipo de spread: {card_count}")
-        if draw_data.cards and len(draw_data.cards) != card_count:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid number of cards. Expected {card_count}."
-            )   
-            
-        # verifica se a as cartas estão duplicadas
-        if draw_data.cards and len(draw_data.cards) != len(set(draw_data.cards)):
-            raise HTTPException(
-                status_code=400, 
-                detail="Duplicate cards found."
-            )
-            
-        #verifica se as cartas estão em mesma quantidade que o is_reversed
-        
-        #is reversed é opcional, se não for enviado, não verifica
-        if draw_data.is_reversed is not None and len(draw_data.cards) != len(draw_data.is_reversed):
-            raise HTTPException(
-                status_code=400, 
-                detail="The number of cards and the number of is_reversed values must match."
+        deadline = time.monotonic() + settings.READING_DEADLINE_SECONDS
+        prepared = await _prepare_reading(request, draw_data, db, deadline)
+
+        started = time.monotonic()
+        if draw_data.parallel:
+            reading = await _generate_parallel_reading(prepared)
+        else:
+            reading = await OpenAIService().gerar_texto(
+                prompt_ajustado=prepared["prompt"],
+                role=prepared["role"],
+                max_tokens=prepared["max_tokens"],
+                temperature=0.9,
+                lane=LLMLane.READING,
+                deadline=prepared["deadline"],
             )
+            reading = JsonExtractor.extract_json_from_reading(reading)
+        # sem streaming, a leitura chega inteira: mede o tempo total (time_to_first_card é só do /update/stream)
+        metrics.observe("reading.total_time", time.monotonic() - started)
 
-            
-        #verifica se as cartas são todas do mesmo deck
-        deck_check = await CardSchema.check_cards_belong_to_deck(db,  draw_data.deck_id, draw_data.cards,)
-        #print("deck_check: ", deck_check)
-        if not deck_check:
-            raise HTTPException(
-                status_code=400, 
-                detail="Cards do not belong to the same deck."
-            )
-
-        #pegar o nome das cartas que é uma lista de strings        
-        cards_names = await CardSchema.get_cards_names_by_group_ids(db, draw_data.cards, keep_order=True)
-        
-        reading_style_exists = await UserTypeSchema.check_reading_style_belongs_to_user(
-            db, 
-            user_type_id= user_type_id, 
-            reading_style_id=draw_data.reading_style
-        )
-        
-        if draw_data.reading_style and not reading_style_exists:
-            raise HTTPException(
-                status_code=400, 
-                detail="Reading style does not exist or is not accessible to the user."
-            )
-        
-        reading_style_name = await ReadingStyleSchema.get_reading_style_name_by_id(db, draw_data.reading_style)
-        if not reading_style_name:
-            raise HTTPException(
-                status_code=400, 
-                detail="Reading style name does not exist."
-            )        
-        reading_style_description = await ReadingStyleSchema.get_reading_style_description_by_id(db, draw_data.reading_style)
-        if not reading_style_description:
-            raise HTTPException(
-                status_code=400, 
-                detail="Reading style description does not exist."
-            )
-        
-        #retorna uma lista de strings com os nomes das cartas
-        #print(f"Nome das cartas: {cards_names}")
-        # return {'cards_names' : cards_names}
-        
-        #verifica se o contexto foi enviado 
-        # se o contexto for None retorna erro pq nesse precisa
-        # do contexto para fazer a tiragem de cartas
-        if draw_data.context is None:
-            raise HTTPException(
-                status_code=400, 
-                detail="Context is required for the draw."
-            )
-        
-        # se ele tiver, temos que fazer a tiragem de cartas usando o servico de ia da azure 
-        
-        topic_name = await TopicSchema.get_all_topics_names(db)
-        
-
-
-        # aqui pegar as draws antigas com a mesma tag, usando o contexto
-        
-        
-
-        prompt_analise_contexto = prompt_analise_contexto_template.format(
-            context=draw_data.context,
-            topic_name=topic_name,
-        )
-
-        openai_service = OpenAIService()  # Initialize the OpenAIService
-
-        # Limit concurrent OpenAI requests to avoid spikes (adjust as needed)
-        _openai_semaphore = asyncio.Semaphore(5)
-
-        async def _call_openai(prompt_ajustado, role, max_tokens, temperature):
-            async with _openai_semaphore:
-                return await openai_service.gerar_texto(
-                    prompt_ajustado=prompt_ajustado,
-                    role=role,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                )
-        matching_topics = await openai_service.gerar_texto(
-            prompt_ajustado=prompt_analise_contexto,
-            max_tokens=40,
-            role=role_analise_contexto,
-            temperature=0.95
-        )
-        
-        
-
-        # print(f"Tópicos correspondentes: {matching_topics}")
-        
-        # return {'matching_topics': matching_topics}
-        # Ensure matching_topics is parsed into a Python list
-        if isinstance(matching_topics, str):
-            import re
-            import ast
-            match = re.search(r"\[.*?\]", matching_topics, re.DOTALL)
-            if match:
-                matching_topics = ast.literal_eval(match.group(0))
-            else:
-                matching_topics = []
-        
-        list_id_topics = await TopicSchema.get_all_topics_ids_by_list_names(db, matching_topics)
-        
-        # print(f"Lista de ids dos topicos: {list_id_topics}")
-        
-        # tem que pegar o limite de draw por tipo de usuario
-
-        context_amount = await UserTypeSchema.get_context_amount_by_id(db, user_type_id)
-        # pegar o id de todas as tiragens que tem pelo menos um dos topicos
-        draws_with_topics = await DrawSchemaBase.get_draw_ids_by_topics(
-            db,
-            user_id=user_id,
-            spread_type_id=draw_data.spread_type_id,
-            topics=list_id_topics
-        )
-        # print(f"IDs de draws com tópicos correspondentes: {draws_with_topics}")
-        # variavel para salvar o contexto
-        preview_context = []
-        # lista para armazenar similaridades e detalhes
-        similar_draws = []
-
-        # Parallelize comparator calls and subsequent resumo_leitura for matches
-        if draws_with_topics:
-            # 1) Fetch all contexts concurrently
-            context_coros = [DrawSchemaBase.get_context_by_id(db, draw_id) for draw_id in draws_with_topics]
-            contexts = await asyncio.gather(*context_coros)
-
-            # 2) Build comparator prompts and run comparator in parallel (throttled)
-            comparator_prompts = [
-                prompt_comparador_template.format(context1=draw_data.context, context2=ctx)
-                for ctx in contexts
-            ]
-            comparator_tasks = [
-                _call_openai(prompt, role_comparador, 10, 0.9) for prompt in comparator_prompts
-            ]
-            comparator_results = await asyncio.gather(*comparator_tasks)
-
-            # 3) For those above threshold, fetch draw details and reviews in parallel
-            positive_indices = []
-            similaridade_values = []
-            for idx, res in enumerate(comparator_results):
-                try:
-                    val = float(res)
-                except Exception:
-                    val = 0.0
-                similaridade_values.append(val)
-                if val > 0.5:
-                    positive_indices.append(idx)
-
-            if positive_indices:
-                # coroutines for draw details and reviews and deck/spread names
-                draw_detail_coros = [DrawSchemaBase.get_draw_details_by_id(db, draws_with_topics[i]) for i in positive_indices]
-                review_coros = [ReviewSchema.get_rating_and_comment_by_draw_id(db, draws_with_topics[i]) for i in positive_indices]
-                draw_details = await asyncio.gather(*draw_detail_coros)
-                reviews = await asyncio.gather(*review_coros)
-
-                # Prepare resumo_leitura prompts and call OpenAI in parallel (throttled)
-                resumo_prompts = []
-                for d in draw_details:
-                    prev_reading = d.get('reading')
-                    if isinstance(prev_reading, str):
-                        try:
-                            prev_reading = JsonExtractor.extract_json_from_reading(prev_reading)
-                        except Exception:
-                            pass
-                    prev_deck_name = await DeckSchema.get_deck_name_by_id(db, d.get('deck_id'))
-                    prev_spread_name = await SpreadTypeSchema.get_spread_type_name_by_id(db, d.get('spread_type_id'))
-                    resumo_prompts.append(
-                        prompt_resumo_leitura_template.format(
-                            context=d.get('context'),
-                            deck_name=prev_deck_name,
-                            spread_name=prev_spread_name,
-                            cards=d.get('cards'),
-                            reading=prev_reading,
-                        )
-                    )
-
-                resumo_tasks = [_call_openai(p, role_resumo_leitura, 50, 0.9) for p in resumo_prompts]
-                resumo_results = await asyncio.gather(*resumo_tasks)
-
-                # Assemble similar_draws using collected data
-                for idx_local, idx_global in enumerate(positive_indices):
-                    d = draw_details[idx_local]
-                    review = reviews[idx_local]
-                    rating, comment = (review if review else (None, None))
-                    similar_draws.append({
-                        "similaridade": similaridade_values[idx_global],
-                        "context": contexts[idx_global],
-                        "deck_name": await DeckSchema.get_deck_name_by_id(db, d.get('deck_id')),
-                        "spread_type_name": await SpreadTypeSchema.get_spread_type_name_by_id(db, d.get('spread_type_id')),
-                        "cards": d.get('cards'),
-                        "reading_summary": resumo_results[idx_local],
-                        "rating": rating,
-                        "comment": comment,
-                        "is_reversed": d.get('is_reversed', []),
-                    })
-
-        # Ordena: primeiro por rating (se existir, maior primeiro), depois por similaridade (maior primeiro)
-        def sort_key(x):
-            # Se rating não existe, considera -1 para ficar depois dos que têm rating
-            return (x["rating"] if x["rating"] is not None else -1, x["similaridade"])
-
-        similar_draws_sorted = sorted(similar_draws, key=sort_key, reverse=True)
-        preview_context = similar_draws_sorted[:context_amount]
-
-        # pega o nome do usuario
-        user_name = await UserSchemaBase.get_user_name_by_id(db, user_id)
-        
-        mandala_id = await SpreadTypeSchema.get_id_by_name(db, "Mandala Astrológica")
-
-
-        # Monta o prompt ajustado incluindo o contexto anterior, se houver
-        # Monta string com contextos anteriores, se existirem
-        previous_contexts_str = ""
-        if preview_context:
-            # print(f"Contextos anteriores encontrados: {preview_context}")
-            previous_contexts_str = "\n".join(
-                [
-                    f"- Contexto anterior: '{ctx['context']}', Baralho: '{ctx['deck_name']}', Spread: '{ctx['spread_type_name']}', "
-                    f"Cartas: {await CardSchema.get_cards_names_by_group_ids(db, ctx['cards'])}"
-                    + (
-                        f", Está invertida?: "
-                        + (
-                            str(ctx['is_reversed'])
-                            if ctx.get('is_reversed') and len(ctx['is_reversed']) == len(ctx['cards'])
-                            else str([False] * len(ctx['cards']))
-                        )
-                    )
-                    + f", Resumo: {ctx['reading_summary']}"
-                    + (
-                        f", Avaliação do usuário: {ctx['rating']}, Comentário do usuário: '{ctx['comment']}'"
-                        if ctx['rating'] is not None else ""
-                    )
-                    for ctx in preview_context
-                ]
-            )
-
-        # Monta string com informações de cartas invertidas, se houver
-        reversed_info = ""
-        if draw_data.is_reversed is not None:
-            reversed_info = "\n".join(
-                [
-                    f"- {card_name}: {'invertida' if is_rev else 'normal'}"
-                    for card_name, is_rev in zip(cards_names, draw_data.is_reversed)
-                ]
-            )
-            # print(f"Reversed info: {reversed_info}")
-            reversed_info = f"Situação de cada carta (invertida ou normal):\n{reversed_info}\n\n"
-
-        # Parte comum do prompt
-        explicacao_invertidas = (
-            f"{reversed_info}"
-            f"Para cada carta, utilize a lista 'is_reversed': {draw_data.is_reversed}.\n"
-            f"Cada item da lista 'is_reversed' corresponde exatamente à carta na mesma posição da lista de cartas.\n"
-            f"Se o valor correspondente for True, interprete a carta como invertida (com significado oposto ou alterado); se for False, interprete normalmente.\n"
-            f"Exemplo: se is_reversed = [False, True, False], então a primeira e terceira carta são normais, e a segunda está invertida.\n"
-            f"Cartas invertidas devem receber uma análise diferenciada, destacando como o significado se transforma em relação à posição normal.\n\n"
-        )
-
-        # Prompt base (do template)
-        prompt_base = prompt_base_template.format(explicacao_invertidas=explicacao_invertidas)
-
-        # Acrescenta contextos anteriores se houver
-        if previous_contexts_str:
-            prompt_base += (
-                f"Considere também os seguintes contextos e leituras anteriores do consulente para enriquecer sua análise e trazer informações relevantes para a consulta atual:\n"
-                f"{previous_contexts_str}\n\n"
-            )
-
-        # Parte final do prompt (do template)
-        prompt_final = prompt_final_template.format(
-            cards_names=cards_names,
-            context=draw_data.context,
-            user_name=user_name,
-            spreadname=spreadname,
-            deckname=deckname,
-            reading_style_name=reading_style_name,
-            reading_style_description=reading_style_description,
-        )
-
-        # Prompt ajustado completo
-        prompt_ajustado = prompt_base + prompt_final
+        ordered_reading = await _finalize_reading(db, draw_data, prepared, reading)
+        return {"leitura": ordered_reading, "id": prepared["id_draw"]}
+    except HTTPException as e:
+        raise e
+    except LLMError as e:
+        # nada é gravado: a tiragem continua pendente e pode ser refeita
+        raise _llm_http_error(e)
+    except Exception as e:
+        print(f"Erro ao atualizar draw: {e}")
+        raise HTTPException(status_code=500, detail="Ocorreu um erro ao buscar os eventos.")
 
-        # Role fixo (do template)
-        role = readings_role
 
+def _llm_http_error(error: LLMError) -> HTTPException:
+    print(f"Erro ao gerar leitura: {error}")
+    if isinstance(error, (LLMDeadlineExceeded, LLMTimeoutError)):
+        return HTTPException(status_code=504, detail="A leitura demorou mais que o esperado. Tente novamente.")
+    return HTTPException(status_code=503, detail="O serviço de leitura está indisponível no momento. Tente novamente.")
 
-        #pegar os tokens
-        amount_tokens = await UserTypeSchema.get_token_amount_by_id(db, user_type_id)
-        max_tokens = (amount_tokens) * (card_count + 2)
 
-        reading = await openai_service.gerar_texto(prompt_ajustado=prompt_ajustado, role=role, max_tokens=max_tokens, temperature=0.9)
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-        status_id = await StatusSchema.get_id_by_name(db, "completed")
 
-        # Se draw_data.is_reversed for None, envia lista vazia
-        is_reversed = draw_data.is_reversed if draw_data.is_reversed is not None else []
-        
-        #verifica se a pessoa tem o estilo da carta
-        if draw_data.card_style is not None:
-            accessible_card_styles = await UserTypeSchema.get_accessible_card_styles_by_user_type(
-                db, user_type_id
-            )
-            if draw_data.card_style not in accessible_card_styles:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Card style does not exist or is not accessible to the user."
-                )
-        #agora a gente atribui o valor dele para 1 caso venha None 
-        if draw_data.card_style is None:
-            draw_data.card_style = 1  # Default value if not provided
-        
-        
-        
-
-
-        reading = JsonExtractor.extract_json_from_reading(reading)
-        confirm_service = ConfirmMissionService()
-
-        # se for do tipo mandala astrológica, tem que confirmar a missão do usuário
-        if draw_data.spread_type_id == mandala_id:  # Mandala Astrológica
-            
-            mission_type_id = await MissionTypeSchemaBase.get_id_by_name(db, "Fazer uma leitura do tipo Mandala Astrológica")
-            await confirm_service.confirm_mission(db,  mission_type_id, user_id)
-        
-        id_analitico = await ReadingStyleSchema.get_id_by_name(db, "Analítico")
-        
-        if draw_data.reading_style == id_analitico:
-            # se for do tipo analítico, tem que confirmar a missão do usuário
-            
-            # print("Fazer uma leitura no modo analitico")
-            mission_type_id = await MissionTypeSchemaBase.get_id_by_name(db, "Fazer uma leitura no modo analítico")
-            await confirm_service.confirm_mission(db,  mission_type_id, user_id)
-            
-        
-        ordered_reading = {}
-        ordered_reading["introducao"] = reading.get("introducao", "")
-
-        cards_names = await CardSchema.get_cards_names_by_group_ids(db, draw_data.cards, keep_order=True)
-        # print(f"Cards names reordered: {cards_names}")
-        
-        # Reordena as cartas e renomeia as chaves para carta_1, carta_2, ...
-        carta_idx = 1
-        for card_name in cards_names:
-            # Encontrar a chave original (ex: carta_10) cujo valor corresponde ao nome da carta atual
-            for key, value in reading.items():
-                if key.startswith("carta_") and card_name in value:
-                    ordered_reading[f"carta_{carta_idx}"] = value
-                    carta_idx += 1
-                    break
-                            
-        ordered_reading["conclusao"] = reading.get("conclusao", "")
-        
-        # Only extract JSON if ordered_reading is a string
-        if isinstance(ordered_reading, str):
-            ordered_reading = JsonExtractor.extract_json_from_reading(ordered_reading)
-        
-        # Converte o dicionário ordered_reading para uma string JSON antes de enviar ao banco
-        import json
-        ordered_reading_json = json.dumps(ordered_reading)
-
-        draw = await DrawSchemaBase.update_draw_after_standard_reading(
-            db, 
-            draw_id=id_draw, 
-            user_id=user_id, 
-            spread_type_id=draw_data.spread_type_id,
-            deck_id=draw_data.deck_id,
-            cards=draw_data.cards,
-            context=draw_data.context,
-            status_id=status_id,
-            reading=ordered_reading_json,  # Usa a string JSON aqui
-            topics=list_id_topics,
-            is_reversed=is_reversed,
-            card_style=draw_data.card_style
-        )
-        
-        
-        return {"leitura": ordered_reading, "id": id_draw}
+@router.put(
+    "/update/stream",
+    summary="Atualizar uma tiragem existente com leitura em streaming",
+    description="Mesmo fluxo de /update, mas a leitura é enviada via Server-Sent Events à medida que é gerada. "
+                "Eventos: 'section' ({key, text}) para introducao, cada carta_N e conclusao assim que ficam completas; "
+                "'done' ({leitura, id}) com a leitura final ordenada e já salva; 'error' ({detail}) em caso de falha. "
+                "Os erros de validação são retornados antes do streaming, como em /update.",
+    response_description="Fluxo text/event-stream com as seções da leitura.",
+)
+async def update_draw_stream(
+    request: Request,
+    draw_data: DrawUpdate,
+    db: AsyncSession = Depends(get_session)
+):
+    try:
+        deadline = time.monotonic() + settings.READING_DEADLINE_SECONDS
+        prepared = await _prepare_reading(request, draw_data, db, deadline)
     except HTTPException as e:
         raise e
+    except LLMError as e:
+        raise _llm_http_error(e)
     except Exception as e:
-        print(f"Erro ao atualizar draw: {e}")
-        raise HTTPException(status_code=500, detail="Ocorreu um erro ao buscar os eventos.")
+        print(f"Erro ao preparar draw: {e}")
+        raise HTTPException(status_code=500, detail="Ocorreu um erro ao gerar a leitura.")
+
+    async def sections_parallel():
+        # modo paralelo: cada seção é enviada assim que a sua chamada termina
+        tasks = [_section_task(prepared, key, prompt) for key, prompt in prepared["sections"]]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def sections_streamed(parser: IncrementalJsonParser, chunks: list):
+        async for delta in OpenAIService().gerar_texto_stream(
+            prompt_ajustado=prepared["prompt"],
+            role=prepared["role"],
+            max_tokens=prepared["max_tokens"],
+            temperature=0.9,
+            lane=LLMLane.READING,
+            deadline=prepared["deadline"],
+        ):
+            chunks.append(delta)
+            for key, value in parser.feed(delta):
+                yield key, value
+
+    async def event_stream():
+        parser = IncrementalJsonParser()
+        chunks = []
+        started = time.monotonic()
+        first_card = False
+        try:
+            if draw_data.parallel:
+                sections = sections_parallel()
+            else:
+                sections = sections_streamed(parser, chunks)
+            received = {}
+            async for key, value in sections:
+                received[key] = value
+                if key.startswith("carta_") and not first_card:
+                    first_card = True
+                    metrics.observe("reading.time_to_first_card", time.monotonic() - started)
+                yield _sse("section", {"key": key, "text": value})
+
+            reading = received or JsonExtractor.extract_json_from_reading("".join(chunks))
+            # sessão própria: a da dependência pode ser fechada antes do fim do streaming
+            async with Session() as session:
+                ordered_reading = await _finalize_reading(session, draw_data, prepared, reading)
+            yield _sse("done", {"leitura": ordered_reading, "id": prepared["id_draw"]})
+        except LLMError as e:
+            yield _sse("error", {"detail": _llm_http_error(e).detail})
+        except Exception as e:
+            print(f"Erro ao gerar leitura em streaming: {e}")
+            yield _sse("error", {"detail": "Ocorreu um erro ao gerar a leitura."})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,17 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
-import asyncio
 
 from app.core.deps import get_session
 from app.services.token import TokenInfoSchema
 from app.schemas.user import UserSchemaBase
 from app.schemas.status import StatusSchemaBase
-from app.schemas.event import EventSchemaBase
-from app.schemas.mission import MissionSchemaBase
-from app.schemas.mission_type import RecurrenceMode, MissionTypeSchemaBase
-from app.schemas.transaction import TransactionSchemaBase, TransactionType
+from app.schemas.mission_type import RecurrenceMode
+from app.schemas.transaction import TransactionSchemaBase
+from app.schemas.user_event_progress import UserEventProgressSchemaBase
 from app.services.calendar import Calendar
+from app.services.catalog import mission_catalog
 
 router = APIRouter()
 
@@ -95,8 +94,16 @@ async def get_all_active_events_by_user(
         id_pending = await StatusSchemaBase.get_id_by_name(db, "pending_confirmation")
 
         user_type = await UserSchemaBase.get_user_type_by_id(db, user_id)
-        all_active_events = await EventSchemaBase.get_all_active_events_by_user_type_and_status(
-            db, [user_type], [id_active]
+        # eventos e tipos de missão vêm do catálogo em memória (sem um SELECT por campo)
+        catalog = await mission_catalog.get(db)
+        all_active_events = catalog.events_by([id_active], user_type)
+
+        # progresso do usuário em todas as missões dos eventos (modelo de leitura, uma consulta)
+        # e prêmios já retirados (uma consulta), em vez de consultas por missão e por evento
+        mission_type_ids = {mission_id for event in all_active_events for mission_id in event.missions}
+        progress = await UserEventProgressSchemaBase.get_by_user(db, user_id, mission_type_ids)
+        rewards = await TransactionSchemaBase.get_reward_dates_by_user(
+            db, user_id, id_completed, [event.id for event in all_active_events]
         )
 
         events_data = []
@@ -104,37 +111,27 @@ async def get_all_active_events_by_user(
         now_utc = datetime.now(timezone.utc)
 
         for event in all_active_events or []:
-            recurrence_mode = await EventSchemaBase.get_recurrence_mode_by_id(db, event.id)
-            start_date = await EventSchemaBase.get_start_date_by_id(db, event.id)
+            recurrence_mode = event.recurrence_mode
+            start_date = event.start_date
             period_start = start_date
             period_end = now_utc.replace(tzinfo=None)
 
             if recurrence_mode == RecurrenceMode.EXPIRED_DATE.value:
-                expired_date = await EventSchemaBase.get_expired_date_by_id(db, event.id)
+                expired_date = event.expired_date
                 period_end = expired_date if expired_date is not None else SAFE_MAX_DATE
 
             elif recurrence_mode == RecurrenceMode.CALENDAR.value:
                 calendar = Calendar()
-                recurrence_type, auto_renew = await asyncio.gather(
-                    EventSchemaBase.get_recurrence_type_by_id(db, event.id),
-                    EventSchemaBase.get_auto_renew_by_id(db, event.id)
-                )
-                reset_time = await EventSchemaBase.get_reset_time_by_id(db, event.id)
                 period_start, period_end = calendar.get_current_period(
-                    recurrence_type, start_date, reset_time, auto_renew
+                    event.recurrence_type, start_date, event.reset_time, event.auto_renew
                 )
 
-            missions = await EventSchemaBase.get_all_missions_by_event_id(db, event.id)
+            missions = event.missions
             has_valid_mission = False
 
             for mission_id in missions:
-                user_missions = await MissionSchemaBase.get_list_id_by_user_and_types_and_period_and_status(
-                    session=db,
-                    user_id=user_id,
-                    mission_type_id=mission_id,
-                    start_date=period_start,
-                    end_date=period_end,
-                    status_ids=[id_completed, id_pending]
+                user_missions = UserEventProgressSchemaBase.in_period(
+                    progress.get(mission_id, []), [id_completed, id_pending], period_start, period_end
                 )
                 if user_missions:
                     has_valid_mission = True
@@ -143,26 +140,23 @@ async def get_all_active_events_by_user(
             if recurrence_mode == RecurrenceMode.USER_BASED.value and not has_valid_mission:
                 continue
 
-            reward_transaction_exists = await TransactionSchemaBase.check_reward_transaction_exists(
-                session=db,
-                user_id=user_id,
-                event_id=event.id,
-                status_id=id_completed,
-                start_date=period_start,
-                end_date=period_end,
-                transaction_type=TransactionType.REWARD.value
+            reward_transaction_exists = any(
+                period_start <= created_at <= period_end
+                for created_at in rewards.get(event.id, [])
+                if created_at is not None and period_start is not None and period_end is not None
             )
 
             all_missions_completed = True
 
             for mission_id in missions:
-                recurrence_mode, recurrence_type, reset_time, auto_renew, start_date = await asyncio.gather(
-                    MissionTypeSchemaBase.get_recurrence_mode_by_id(db, mission_id),
-                    MissionTypeSchemaBase.get_recurrence_type_by_id(db, mission_id),
-                    MissionTypeSchemaBase.get_reset_time_by_id(db, mission_id),
-                    MissionTypeSchemaBase.get_auto_renew_by_id(db, mission_id),
-                    MissionTypeSchemaBase.get_start_date_by_id(db, mission_id)
-                )
+                mission_type = catalog.mission_type(mission_id)
+                if mission_type is None:
+                    continue
+                recurrence_mode = mission_type.recurrence_mode
+                recurrence_type = mission_type.recurrence_type
+                reset_time = mission_type.reset_time
+                auto_renew = mission_type.auto_renew
+                start_date = mission_type.start_date
 
                 if recurrence_mode == RecurrenceMode.CALENDAR.value:
                     calendar = Calendar()
@@ -170,7 +164,7 @@ async def get_all_active_events_by_user(
                         recurrence_type, start_date, reset_time, auto_renew
                     )
                 elif recurrence_mode == RecurrenceMode.EXPIRED_DATE.value:
-                    expired_date = await MissionTypeSchemaBase.get_expired_date_by_id(db, mission_id)
+                    expired_date = mission_type.expiration_date
                     period_end = expired_date if expired_date is not None else SAFE_MAX_DATE
                 else:
                     period_end = datetime.now(timezone.utc)
@@ -180,13 +174,8 @@ async def get_all_active_events_by_user(
                 if period_end and period_end.tzinfo:
                     period_end = period_end.replace(tzinfo=None)
 
-                completed_missions = await MissionSchemaBase.get_list_id_by_user_and_types_and_period_and_status(
-                    session=db,
-                    user_id=user_id,
-                    mission_type_id=mission_id,
-                    start_date=period_start,
-                    end_date=period_end,
-                    status_ids=[id_completed]
+                completed_missions = UserEventProgressSchemaBase.in_period(
+                    progress.get(mission_id, []), [id_completed], period_start, period_end
                 )
                 if not completed_missions:
                     all_missions_completed = False
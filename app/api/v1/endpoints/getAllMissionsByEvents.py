@@ -6,11 +6,12 @@ from app.schemas.user import UserSchemaBase
 from datetime import datetime, timezone
 from app.schemas.spread_type import SpreadTypeSchemaBase
 from app.schemas.draw import DrawSchemaBase
-from app.schemas.mission import MissionSchemaBase
 from app.schemas.status import StatusSchemaBase
-from app.schemas.mission_type import MissionTypeSchemaBase, RecurrenceMode
+from app.schemas.mission_type import RecurrenceMode
 from app.schemas.event import EventSchemaBase
+from app.schemas.user_event_progress import UserEventProgressSchemaBase
 from app.services.calendar import Calendar
+from app.services.catalog import mission_catalog
 from app.services.user_based import UserBased
 import asyncio
 
@@ -115,27 +116,35 @@ async def get_all_mission_by_event_id(
             raise HTTPException(status_code=403, detail="User does not have permission to access this event.")
         print(f"User {user_id} has permission for event {event_id}")
 
-        missions = await EventSchemaBase.get_all_missions_by_event_id(db, event_id)
+        # evento e tipos de missão vêm do catálogo em memória (sem um SELECT por campo)
+        catalog = await mission_catalog.get(db)
+        event = catalog.event(event_id)
+        missions = list(event.missions) if event else []
         print("missions___:", missions)
 
         id_pending, id_completed = await asyncio.gather(
             StatusSchemaBase.get_id_by_name(db, "pending_confirmation"),
             StatusSchemaBase.get_id_by_name(db, "completed")
         )
-
-        async def get_mission_detail(mission_id: int):
-            (
-                name, description, recurrence_mode, recurrence_type, 
-                reset_time, auto_renew, start_date
-            ) = await asyncio.gather(
-                MissionTypeSchemaBase.get_name_by_id(db, mission_id),
-                MissionTypeSchemaBase.get_description_by_id(db, mission_id),
-                MissionTypeSchemaBase.get_recurrence_mode_by_id(db, mission_id),
-                MissionTypeSchemaBase.get_recurrence_type_by_id(db, mission_id),
-                MissionTypeSchemaBase.get_reset_time_by_id(db, mission_id),
-                MissionTypeSchemaBase.get_auto_renew_by_id(db, mission_id),
-                MissionTypeSchemaBase.get_start_date_by_id(db, mission_id)
-            )
+        status_map = {
+            id_pending: "pendente",
+            id_completed: "completada"
+        }
+
+        # progresso do usuário nas missões do evento (modelo de leitura, uma consulta)
+        progress = await UserEventProgressSchemaBase.get_by_user(db, user_id, missions)
+
+        def get_mission_detail(mission_id: int):
+            mission_type = catalog.mission_type(mission_id)
+            if mission_type is None:
+                return []
+            name = mission_type.name
+            description = mission_type.description
+            recurrence_mode = mission_type.recurrence_mode
+            recurrence_type = mission_type.recurrence_type
+            reset_time = mission_type.reset_time
+            auto_renew = mission_type.auto_renew
+            start_date = mission_type.start_date
 
             if recurrence_mode == RecurrenceMode.CALENDAR.value:
                 calendar = Calendar()
@@ -145,56 +154,36 @@ async def get_all_mission_by_event_id(
             else:
                 period_start = start_date
                 if recurrence_mode == RecurrenceMode.EXPIRED_DATE.value:
-                    period_end = await MissionTypeSchemaBase.get_expired_date_by_id(db, mission_id)
+                    period_end = mission_type.expiration_date
                 else:
                     period_end = datetime.now(timezone.utc)
 
-            id_missions = await MissionSchemaBase.get_list_id_by_user_and_types_and_period_and_status(
-                session=db,
-                user_id=user_id,
-                mission_type_id=mission_id,
-                start_date=period_start,
-                end_date=period_end,
-                status_ids=[id_pending, id_completed]
+            user_missions = UserEventProgressSchemaBase.in_period(
+                progress.get(mission_id, []), [id_pending, id_completed], period_start, period_end
             )
 
             details = []
-            for id in id_missions:
-                if not id:
-                    continue
-
-                status_id, used_at = await asyncio.gather(
-                    MissionSchemaBase.get_status_by_mission_id(db, id),
-                    MissionSchemaBase.get_used_at_by_id(db, id)
-                )
-                status_name = await StatusSchemaBase.get_name_by_id(db, status_id)
+            for mission in user_missions:
+                used_at = mission["used_at"]
 
                 if recurrence_mode == RecurrenceMode.USER_BASED.value:
-                    created_at = await MissionSchemaBase.get_created_at_by_id(db, id)
-                    relative_days = await MissionTypeSchemaBase.get_relative_days_by_id(db, mission_id)
+                    relative_days = mission_type.relative_days
                     user_based = UserBased()
-                    period_start = created_at
+                    period_start = mission["created_at"]
                     period_end = user_based.calculate_expired_date(start_date, relative_days, reset_time)
 
-                status_map = {
-                    "pending_confirmation": "pendente",
-                    "completed": "completada"
-                }
-
                 details.append({
-                    "id": id,
+                    "id": mission["mission_id"],
                     "name": name,
                     "description": description,
-                    "status": status_map.get(status_name, status_name),
+                    "status": status_map.get(mission["status"], mission["status"]),
                     "used_at": used_at.isoformat() if used_at else None,
                     "start": period_start.isoformat() if period_start else None,
                     "end": period_end.isoformat() if period_end else None
                 })
             return details
 
-        # Executa em paralelo a busca de detalhes das missões
-        mission_tasks = [get_mission_detail(m) for m in missions]
-        results = await asyncio.gather(*mission_tasks)
+        results = [get_mission_detail(m) for m in missions]
         mission_details = [item for sublist in results for item in sublist]  # flatten list
 
         return {"data": mission_details}
@@ -9,7 +9,8 @@ from app.schemas.spread_type import SpreadTypeSchema  # Import SpreadTypeSchema
 from app.schemas.draw import DrawSchemaBase  # Import DrawSchemaBase
 from app.services.token import TokenInfoSchema # Import TokenInfoSchema
 from app.services.extract import JsonExtractor  # Import JsonExtractor
-from app.services.openai import OpenAIService  # Import OpenAIService
+from app.services.openai import OpenAIService
+from app.services.llm_errors import LLMError
 from app.schemas.user_type import UserTypeSchema  # Import UserTypeSchema
 
 
@@ -159,6 +160,12 @@ async def post_new_draw(
         return {"perguntas": extracted_json}
         
 
+    except LLMError as e:
+        print(f"Erro ao gerar texto: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="O serviço de IA está indisponível no momento. Tente novamente."
+        )
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=500, 
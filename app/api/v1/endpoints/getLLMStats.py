@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+
+from app.services.llm_cache import llm_cache
+from app.services.llm_governor import llm_governor
+from app.services.llm_recorder import llm_recorder
+from app.services.openai import OpenAIService
+
+router = APIRouter()
+
+
+@router.get(
+    "/llm-stats",
+    summary="Estado das chamadas ao modelo",
+    description=(
+        "Filas e vazão por lane (governor), acertos do llm_cache, estado do circuit breaker e "
+        "contadores de gravação/reprodução do tráfego. Valores do processo que atendeu a requisição."
+    ),
+)
+async def get_llm_stats():
+    return {
+        "governor": llm_governor.stats(),
+        "cache": llm_cache.stats(),
+        "breaker": OpenAIService.breaker.stats(),
+        "recorder": llm_recorder.stats(),
+    }
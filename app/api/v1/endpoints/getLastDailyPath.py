@@ -21,6 +21,7 @@ from app.schemas.daily_zodiac import DailyZodiacSchemaBase  # Import DailyZodiac
 from app.schemas.daily_path import DailyPathSchemaBase  # Import DailyPathSchemaBase
 
 from app.services.extract import JsonExtractor  # Import JsonExtractor
+from app.services.daily_content import daily_content_service
 from app.services.confirmMissionService import ConfirmMissionService
 from app.schemas.mission_type import MissionTypeSchemaBase  # Import MissionTypeSchemaBase
 
@@ -109,6 +110,9 @@ async def get_daily_zodiac(
                 detail="User does not exist."
             )
 
+        # usuário fora da pré-geração noturna: gera o caminho de hoje na primeira leitura
+        await daily_content_service.ensure_today(db, "path", user_id)
+
         daily_path = await DailyPathSchemaBase.get_daily_path_by_user_id(
             session=db,
             user_id=user_id
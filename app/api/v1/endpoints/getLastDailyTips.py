@@ -8,6 +8,7 @@ from app.schemas.user import UserSchemaBase
 from app.schemas.daily_tips import DailyTipsSchemaBase
 from app.services.token import TokenInfoSchema
 from app.services.extract import JsonExtractor
+from app.services.daily_content import daily_content_service
 
 router = APIRouter()
 
@@ -94,6 +95,10 @@ async def get_daily_tips(
                 detail="User does not exist."
             )
 
+        # Usuário fora da pré-geração noturna: gera as dicas de hoje na primeira leitura
+        if count == 1:
+            await daily_content_service.ensure_today(db, "tips", user_id)
+
         # Busca as dicas diárias do usuário
         daily_tips = await DailyTipsSchemaBase.get_daily_tips_by_user_id(
             session=db,
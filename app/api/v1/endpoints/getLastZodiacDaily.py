@@ -20,6 +20,7 @@ from app.schemas.daily_lucky import DailyLuckySchema  # Import DailyLuckySchema
 from app.schemas.daily_zodiac import DailyZodiacSchemaBase  # Import DailyZodiacSchemaBase
 
 from app.services.extract import JsonExtractor  # Import JsonExtractor
+from app.services.daily_content import daily_content_service
 
 router = APIRouter()
 
@@ -107,6 +108,10 @@ async def get_daily_zodiac(
                 detail="User does not exist."
             )
 
+        # usuário fora da pré-geração noturna: gera o horóscopo de hoje na primeira leitura
+        if count == 1:
+            await daily_content_service.ensure_today(db, "zodiac", user_id)
+
         daily_zodiac = await DailyZodiacSchemaBase.get_daily_zodiac_by_user_id(
             session=db,
             user_id=user_id,
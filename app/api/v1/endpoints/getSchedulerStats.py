@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_session
+from app.schemas.sweep_stats import SweepStatsSchemaBase
+from app.services.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get(
+    "/scheduler-stats",
+    summary="Telemetria das varreduras periódicas",
+    description=(
+        "Duração, linhas afetadas e falhas por etapa, ticks descartados por sobreposição, atrasos e "
+        "intervalo atual das varreduras, como gravados pelo processo líder ao fim da última execução "
+        "(inclui as métricas desse processo). `process_metrics` são as métricas do processo que "
+        "atendeu a requisição."
+    ),
+)
+async def get_scheduler_stats(db: AsyncSession = Depends(get_session)):
+    return {
+        "sweeps": await SweepStatsSchemaBase.get_all(db),
+        "process_metrics": metrics.snapshot(),
+    }
@@ -11,6 +11,7 @@ from app.schemas.user_type import UserTypeSchemaBase, UserTypeSchema  # Import U
 from app.schemas.planet import PlanetSchemaBase  # Import PlanetSchemaBase
 from app.schemas.mission_type import MissionTypeSchemaBase  # Import MissionTypeSchemaBase
 from app.services.openai import OpenAIService
+from app.services.llm_errors import LLMError
 from app.services.confirmMissionService import ConfirmMissionService  # Import ConfirmMissionService
 
 
@@ -105,12 +106,17 @@ async def get_all_planets(
                 "Evite termos vagos e foque em informações úteis para o usuário final."
             )
             openai_service = OpenAIService()
-            leitura = await openai_service.gerar_texto(
-                prompt_ajustado=prompt,
-                role=role,
-                max_tokens=max_tokens,
-                temperature=0.9
-            )
+            try:
+                leitura = await openai_service.gerar_texto(
+                    prompt_ajustado=prompt,
+                    role=role,
+                    max_tokens=max_tokens,
+                    temperature=0.9
+                )
+            except LLMError as e:
+                # sem a IA, usa a descrição padrão do signo
+                print(f"Erro ao gerar descrição do planeta: {e}")
+                leitura = None
 
         # altera aqui sign[0]["zodiac_sign"]
         sign = [
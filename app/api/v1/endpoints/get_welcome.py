@@ -104,11 +104,11 @@ async def get_welcome(
         openai_service = OpenAIService()
         # parâmetros sensatos para uma mensagem curta (máximo 20 palavras)
         ai_message = await openai_service.gerar_texto(
-            prompt_ajustado=prompt, role=role, max_tokens=40, temperature=0.9
+            prompt_ajustado=prompt, role=role, max_tokens=40, temperature=0.9, timeout=10
         )
 
-        # Caso a IA retorne vazio ou erro textual, usamos fallback
-        if not ai_message or ai_message.lower().startswith("erro"):
+        # Caso a IA retorne vazio, usamos fallback (falhas chegam como LLMError)
+        if not ai_message:
             raise Exception("IA retornou conteúdo inválido")
 
         return JSONResponse(content={"message": ai_message.strip(), "category": key, "source": "ai"})
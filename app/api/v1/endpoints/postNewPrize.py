@@ -8,11 +8,11 @@ from app.core.deps import get_session
 from app.services.token import TokenInfoSchema
 from app.schemas.user import UserSchemaBase
 from app.schemas.status import StatusSchemaBase
-from app.schemas.event import EventSchemaBase
-from app.schemas.mission_type import MissionTypeSchemaBase, RecurrenceMode
+from app.schemas.mission_type import RecurrenceMode
 from app.schemas.spread_type import SpreadTypeSchemaBase
 from app.schemas.mission import MissionSchemaBase
 from app.services.calendar import Calendar
+from app.services.catalog import mission_catalog
 from app.schemas.draw import DrawCreate
 from app.schemas.transaction import TransactionSchemaBase
 from app.models.transaction import TransactionType
@@ -71,26 +71,24 @@ async def put_new_prize(
             UserSchemaBase.get_user_type_by_id(db, user_id)
         )
 
-        missions = await EventSchemaBase.get_all_missions_by_event_id(db, event_id)
+        # evento e tipos de missão vêm do catálogo em memória (sem um SELECT por campo)
+        catalog = await mission_catalog.get(db)
+        event = catalog.event(event_id)
+        missions = list(event.missions) if event else []
 
         all_completed = True
         for mission in missions:
             if mission is None:
                 continue
 
-            (
-                recurrence_mode,
-                recurrence_type,
-                reset_time,
-                auto_renew,
-                start_date
-            ) = await asyncio.gather(
-                MissionTypeSchemaBase.get_recurrence_mode_by_id(db, mission),
-                MissionTypeSchemaBase.get_recurrence_type_by_id(db, mission),
-                MissionTypeSchemaBase.get_reset_time_by_id(db, mission),
-                MissionTypeSchemaBase.get_auto_renew_by_id(db, mission),
-                MissionTypeSchemaBase.get_start_date_by_id(db, mission)
-            )
+            mission_type = catalog.mission_type(mission)
+            if mission_type is None:
+                continue
+            recurrence_mode = mission_type.recurrence_mode
+            recurrence_type = mission_type.recurrence_type
+            reset_time = mission_type.reset_time
+            auto_renew = mission_type.auto_renew
+            start_date = mission_type.start_date
 
             if recurrence_mode == RecurrenceMode.CALENDAR.value:
                 calendar = Calendar()
@@ -100,7 +98,7 @@ async def put_new_prize(
             else:
                 period_start = start_date
                 period_end = (
-                    await MissionTypeSchemaBase.get_expired_date_by_id(db, mission)
+                    mission_type.expiration_date
                     if recurrence_mode == RecurrenceMode.EXPIRED_DATE.value
                     else datetime.now(timezone.utc)
                 )
@@ -121,8 +119,8 @@ async def put_new_prize(
                 )
 
         if recurrence_mode != RecurrenceMode.CALENDAR.value:
-            period_start = await EventSchemaBase.get_start_date_by_id(db, event_id)
-            period_end = await EventSchemaBase.get_expired_date_by_id(db, event_id)
+            period_start = event.start_date if event else None
+            period_end = event.expired_date if event else None
 
         reward_transaction_exists = await TransactionSchemaBase.check_reward_transaction_exists(
             session=db,
@@ -144,7 +142,7 @@ async def put_new_prize(
         draw_ids = []
 
         if all_completed and not reward_transaction_exists:
-            gifts = await EventSchemaBase.get_all_gifts_by_event_id(db, event_id)
+            gifts = list(event.gift) if event else []
 
             for gift in gifts:
                 if isinstance(gift, list):
@@ -11,6 +11,7 @@ from app.schemas.daily_lucky import DailyLuckySchemaBase
 from app.schemas.status import StatusSchemaBase, StatusSchema
 from app.schemas.user_type import UserTypeSchema
 from app.services.openai import OpenAIService
+from app.services.llm_errors import LLMError
 from app.services.extract import JsonExtractor  # Import JsonExtractor
 
 from app.services.confirmMissionService import ConfirmMissionService
@@ -153,6 +154,12 @@ async def put_new_daily_lucky(
             "leitura": reading,
         }
         
+    except LLMError as e:
+        print(f"Erro ao gerar texto: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="O serviço de IA está indisponível no momento. Tente novamente."
+        )
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=500, 
@@ -13,6 +13,7 @@ from app.core.configs import settings
 from app.services.email import EmailConfirmationSchema
 from app.services.token import TokenConfirmationSchema
 from app.services.subscription import Subscription
+from app.services.mission_scheduler import mission_scheduler
 
 # Import DailyPathService for creating daily path
 from app.services.daily_path import DailyPathService
@@ -116,6 +117,9 @@ async def receive_confirmation_token_by_email(
                 print(f"Missão de confirmação NÃO foi cumprida para usuário {user_id}")
         except Exception as e:
             print(f"Erro ao confirmar missão para usuário {user_id}: {e}")
+
+        # usuário agora ativo: entra na próxima reconciliação de missões (só ativos recebem missões)
+        await mission_scheduler.notify()
         
         
         # notification = await NotificationSchema.create_notification(db, user_id, message)
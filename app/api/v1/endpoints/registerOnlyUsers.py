@@ -4,6 +4,7 @@ from app.core.deps import get_session
 from app.schemas.user import UserSchema, UserSchemaRegister, UserSchemaRegisterClient
 from app.schemas.mission import MissionSchemaBase
 from app.schemas.mission_type import MissionTypeSchemaBase  # Importar o esquema de tipo de missão
+from app.services.mission_scheduler import mission_scheduler
 
 router = APIRouter()
 
@@ -97,6 +98,8 @@ async def register_user(
 
         await MissionSchemaBase.create_mission(db, mission_type_id_adicionar, response['id'])
 
+        # usuário novo: pede a reconciliação das missões de calendário/relativas sem esperar a varredura periódica
+        await mission_scheduler.notify()
 
         return response
 
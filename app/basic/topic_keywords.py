@@ -0,0 +1,57 @@
+# Palavras-chave extras por tópico (id de app/basic/topic.py) usadas pelo classificador local
+# de tópicos, além do nome e da descrição de cada tópico.
+topic_keywords = {
+    1: "amor namorado namorada namoro crush paixão apaixonado casamento casar noivo noiva marido esposa ex romance beijo ciúmes traição reconciliação alma gêmea",
+    2: "família pai mãe irmão irmã filho filha filhos avó avô tio tia primo parentes sogra sogro herança",
+    3: "trabalho emprego vaga entrevista chefe carreira promoção demissão salário empresa profissão contratação cargo negócio",
+    4: "dinheiro finanças dívida dívidas investimento investir salário empréstimo pagar contas economia renda lucro compra venda aposta",
+    5: "saúde doença médico exame tratamento cirurgia dor corpo recuperação diagnóstico hospital",
+    6: "espiritualidade fé deus anjo oração espiritual universo energia divina guia espiritual",
+    7: "autoconhecimento quem sou personalidade evolução interior crescimento pessoal",
+    8: "autoestima aparência imagem beleza visual identidade",
+    9: "projeto projetos sonho sonhos meta metas objetivo plano planos futuro realização",
+    10: "vida passada karma carma encarnação reencarnação",
+    11: "energia momento agora presente vibração hoje",
+    12: "relacionamento relacionamentos pessoas convivência vínculo",
+    13: "mudança mudanças ciclo recomeço fim término transição novo começo",
+    14: "missão alma chamado",
+    15: "cura emocional trauma mágoa superar feridas perdão",
+    16: "decisão decidir escolha escolher dúvida dilema devo ou",
+    17: "estudo estudos estudar prova concurso vestibular curso aprendizado",
+    18: "casa lar apartamento aluguel mudança de casa imóvel reforma",
+    19: "sexo sexualidade desejo intimidade",
+    20: "liberdade independência autenticidade",
+    21: "pet pets cachorro gato animal animais veterinário",
+    22: "viagem viajar férias passeio turismo",
+    23: "amigo amiga amigos amizade amizades",
+    24: "criatividade arte artista inspiração música pintura escrita",
+    25: "tecnologia internet celular computador redes sociais aplicativo",
+    26: "mudar de cidade mudar de país intercâmbio morar fora imigração",
+    27: "justiça processo advogado contrato judicial tribunal direito",
+    28: "autoaceitação amor próprio aceitar",
+    29: "propósito sentido da vida realização",
+    30: "ansiedade depressão estresse terapia psicólogo mental",
+    31: "rotina hábito hábitos organização dia a dia cotidiano",
+    32: "colega colegas colega de trabalho",
+    33: "tempo prazo prazos agenda produtividade",
+    34: "esgotamento burnout satisfação equilíbrio",
+    35: "trânsito deslocamento ônibus carro metrô caminho",
+    36: "comida comer alimentação dieta almoço jantar cardápio",
+    37: "lazer diversão hobby passatempo festa descanso",
+    38: "autocuidado cuidar de mim descanso",
+    39: "comunicação conversa conversar falar diálogo mensagem",
+    40: "conflito briga discussão desentendimento",
+    41: "vizinho vizinhos vizinhança",
+    42: "comunidade grupo religioso",
+    43: "escola colégio professor professora aluno",
+    44: "faculdade universidade tcc graduação mestrado",
+    45: "liderança líder equipe gestão gerente",
+    46: "igreja missa culto",
+    47: "clube esporte time",
+    48: "academia treino musculação exercício",
+    49: "praça",
+    50: "shopping compras loja",
+    51: "restaurante comer fora jantar fora",
+    52: "bar bares cerveja balada",
+    53: "parque natureza ar livre",
+}
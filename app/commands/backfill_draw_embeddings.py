@@ -0,0 +1,42 @@
+"""
+Preenche o context_embedding das tiragens concluídas que ainda não têm embedding.
+
+Uso: python -m app.commands.backfill_draw_embeddings [--batch-size 500]
+"""
+import argparse
+import asyncio
+
+from app.core.postgresdatabase import Session
+from app.core.schema_upgrades import create_schema
+from app.schemas.draw import DrawSchemaBase
+from app.services.embeddings import embedding_service
+from app.services.openai import OpenAIService
+
+
+async def backfill(batch_size: int) -> int:
+    await create_schema()
+
+    total = 0
+    last_id = 0
+    async with Session() as session:
+        while True:
+            pending = await DrawSchemaBase.get_draws_without_embedding(
+                session, after_id=last_id, limit=batch_size
+            )
+            if not pending:
+                break
+            for draw_id, context in pending:
+                embedding = await embedding_service.embed(context)
+                await DrawSchemaBase.update_context_embedding(session, draw_id, embedding)
+            last_id = pending[-1][0]
+            total += len(pending)
+            print(f"Embeddings gerados: {total}")
+    await OpenAIService.close()
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size))
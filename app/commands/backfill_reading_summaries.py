@@ -0,0 +1,41 @@
+"""
+Gera o reading_summary das tiragens concluídas que ainda não têm resumo.
+
+Uso: python -m app.commands.backfill_reading_summaries [--batch-size 200]
+"""
+import argparse
+import asyncio
+
+from app.core.postgresdatabase import Session
+from app.core.schema_upgrades import create_schema
+from app.schemas.draw import DrawSchemaBase
+from app.services.openai import OpenAIService
+from app.services.reading_summary import reading_summary_service
+
+
+async def backfill(batch_size: int) -> int:
+    await create_schema()
+
+    total = 0
+    last_id = 0
+    async with Session() as session:
+        while True:
+            pending = await DrawSchemaBase.get_draws_without_summary(
+                session, after_id=last_id, limit=batch_size
+            )
+            if not pending:
+                break
+            for draw_id in pending:
+                if await reading_summary_service.summarize_draw(session, draw_id):
+                    total += 1
+            last_id = pending[-1]
+            print(f"Resumos gerados: {total}")
+    await OpenAIService.close()
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size))
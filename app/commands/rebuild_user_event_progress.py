@@ -0,0 +1,28 @@
+"""
+Reconcilia o modelo de leitura user_event_progress com a tabela mission.
+
+Os triggers da tabela mission mantêm o modelo atualizado e a carga inicial é feita quando
+eles são criados; este comando só é necessário para reparar divergências (ex.: triggers
+desativados durante uma manutenção). Percorre toda a tabela mission.
+
+Uso: python -m app.commands.rebuild_user_event_progress
+"""
+import argparse
+import asyncio
+
+from app.core.postgresdatabase import Session
+from app.core.schema_upgrades import create_schema
+from app.schemas.user_event_progress import UserEventProgressSchemaBase
+
+
+async def rebuild() -> tuple[int, int]:
+    await create_schema()
+    async with Session() as session:
+        upserted, deleted = await UserEventProgressSchemaBase.rebuild(session)
+    print(f"user_event_progress: {upserted} linhas inseridas/corrigidas, {deleted} removidas")
+    return upserted, deleted
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    asyncio.run(rebuild())
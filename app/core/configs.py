@@ -25,6 +25,111 @@ class Settings(BaseSettings):
     # Ex.: CORS_ORIGINS=http://localhost:5173,https://minhaapp.com
     CORS_ORIGINS: List[str] = []
 
+    # Cliente Azure OpenAI compartilhado pelo processo (pool HTTP e timeouts)
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_API_VERSION: str = "2023-03-15-preview"
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0  # segundos
+    OPENAI_CONNECT_TIMEOUT: float = 5.0  # segundos
+    OPENAI_TIMEOUT: float = 120.0  # segundos, timeout padrão por chamada
+
+    # Filas de prioridade das chamadas ao modelo: concorrência e tokens por minuto por fila
+    LLM_READING_CONCURRENCY: int = 10
+    LLM_READING_TPM: int = 300000
+    LLM_AUXILIARY_CONCURRENCY: int = 20
+    LLM_AUXILIARY_TPM: int = 100000
+    LLM_BATCH_CONCURRENCY: int = 2
+    LLM_BATCH_TPM: int = 60000
+
+    # Novas tentativas e circuit breaker das chamadas ao modelo
+    LLM_MAX_ATTEMPTS: int = 5
+    LLM_BACKOFF_BASE: float = 1.0  # segundos, dobra a cada tentativa (com jitter)
+    LLM_BACKOFF_MAX: float = 8.0  # segundos, teto do backoff
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # falhas seguidas que abrem o circuito
+    LLM_BREAKER_RESET_SECONDS: float = 30.0  # tempo com o circuito aberto antes de testar de novo
+    READING_DEADLINE_SECONDS: float = 90.0  # prazo total de uma leitura em PutNewDraw
+
+    # Gravação/reprodução do tráfego do modelo para benchmarks reproduzíveis
+    LLM_RECORD_MODE: str = "off"  # "off", "record" (grava em LLM_RECORD_PATH) ou "replay" (não chama o Azure)
+    LLM_RECORD_PATH: str = "llm_traffic.jsonl"
+    LLM_REPLAY_LATENCY_SCALE: float = 1.0  # multiplica a latência gravada (0 = sem espera)
+    LLM_REPLAY_FALLBACK: bool = True  # sem a chave exata, usa uma gravação da mesma lane/role/max_tokens
+
+    # Cache de respostas do modelo (opt-in por chamada via cache_ttl em gerar_texto)
+    LLM_CACHE_MAX_ENTRIES: int = 2048  # entradas no LRU em memória
+    LLM_CACHE_PERSISTENT: bool = True  # também grava na tabela llm_response_cache
+    LLM_CACHE_TTL_CONTEXT: int = 86400  # segundos, classificação de contexto
+    LLM_CACHE_TTL_SUMMARY: int = 2592000  # segundos, resumo de leituras antigas
+
+    # Busca de tiragens parecidas por embedding do contexto
+    EMBEDDING_BACKEND: str = "local"  # "local" (determinístico, offline) ou "azure"
+    EMBEDDING_DIM: int = 256  # dimensão do embedding local
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    SIMILAR_DRAWS_TOP_K: int = 5  # vizinhos mais próximos considerados
+    SIMILAR_DRAWS_MIN_SCORE: float = 0.5  # similaridade de cosseno mínima
+
+    # Orçamento de tokens dos contextos anteriores no prompt da leitura
+    # (context_amount do tipo de usuário x tokens por tiragem, limitado ao máximo)
+    READING_CONTEXT_TOKENS_PER_DRAW: int = 150
+    READING_CONTEXT_MAX_TOKENS: int = 1200
+    READING_CONTEXT_COMPACT_CHARS: int = 160  # tamanho dos textos na versão compacta de um contexto
+
+    # Classificador local de tópicos do contexto (o modelo só é usado abaixo da confiança mínima)
+    TOPIC_CLASSIFIER_MIN_CONFIDENCE: float = 0.15  # similaridade de cosseno do melhor tópico
+    TOPIC_CLASSIFIER_HISTORY_LIMIT: int = 5000  # tiragens antigas usadas para treinar na inicialização
+
+    # Papel do processo: a API também executa os jobs em segundo plano, a menos que
+    # RUN_BACKGROUND_JOBS=false (modo só API, com os jobs em `python -m app.worker`)
+    RUN_BACKGROUND_JOBS: bool = True
+
+    # Agendadores: só o processo líder (advisory lock no Postgres) executa os jobs
+    SCHEDULER_LEADER_ELECTION: bool = True  # False = todo processo executa (uma única instância)
+    LEADER_RETRY_SECONDS: float = 15.0  # intervalo de tentativa/renovação da liderança
+
+    # Jobs noturnos por usuário (horóscopo, caminho diário, dicas, presentes)
+    BATCH_RUNNER_CONCURRENCY: int = 4  # workers, cada um com a sua sessão do banco
+    BATCH_RUNNER_MAX_ATTEMPTS: int = 3  # tentativas por usuário
+    BATCH_RUNNER_PROGRESS_SECONDS: float = 30.0  # intervalo do relatório de progresso
+
+    # Presentes diários: usuários por lote (uma transação do banco por lote)
+    DAILY_GIFT_CHUNK_SIZE: int = 500
+
+    # Retenção (job diário): quantas entradas manter por usuário em cada tabela
+    RETENTION_DAILY_ZODIAC_KEEP: int = 7
+    RETENTION_DAILY_TIPS_KEEP: int = 7
+    RETENTION_DAILY_PATH_KEEP: int = 1
+    RETENTION_DAILY_TRANSACTIONS_KEEP: int = 2  # transações DAILY_LOGIN
+    RETENTION_CHUNK_USERS: int = 1000  # faixa de ids de usuário por DELETE
+
+    # Conteúdo diário (horóscopo, caminho, dicas): pré-geração noturna só para usuários ativos
+    # nos últimos DAILY_PRECOMPUTE_ACTIVE_DAYS dias (0 = todos); os demais geram na primeira leitura do dia
+    DAILY_PRECOMPUTE_ACTIVE_DAYS: int = 7
+    DAILY_LAZY_GENERATION: bool = True
+    ACTIVITY_FLUSH_SECONDS: float = 60.0  # intervalo de gravação do last_active_at
+    DAILY_LAZY_DEADLINE_SECONDS: float = 30.0  # prazo da geração sob demanda (fila AUXILIARY)
+    DAILY_LAZY_FAILURE_TTL_SECONDS: float = 300.0  # após uma falha, não tenta de novo para o usuário nesse intervalo
+
+    # Varredura sequencial do minuto (assinaturas e, sem o MissionDeadlineScheduler, missões/eventos)
+    SWEEP_INTERVAL_SECONDS: float = 60.0  # intervalo base
+    SWEEP_MAX_INTERVAL_SECONDS: float = 600.0  # teto do intervalo sob carga
+    SWEEP_BACKOFF_FACTOR: float = 2.0  # multiplica/divide o intervalo ao recuar/voltar
+    SWEEP_LOAD_RATIO: float = 0.5  # fração do intervalo que um tick pode ocupar antes de recuar
+
+    # Missões e eventos: o MissionDeadlineScheduler dorme até a próxima fronteira (reset_time,
+    # expiração, fim de período, relative_days) em vez de varrer tudo a cada minuto
+    MISSION_DEADLINE_SCHEDULER: bool = True  # False = varredura completa a cada minuto (comportamento antigo)
+    MISSION_SCHEDULER_MAX_SLEEP_SECONDS: float = 600.0  # intervalo máximo entre varreduras completas
+    MISSION_SCHEDULER_MIN_FULL_SWEEP_SECONDS: float = 30.0  # intervalo mínimo entre varreduras pedidas por notify()
+    MISSION_SCHEDULER_GRACE_SECONDS: float = 0.5  # folga após a fronteira antes de processar
+
+    # Catálogo em memória de tipos de missão e eventos (recarregado após mudanças de status
+    # neste processo, ou após este intervalo para enxergar mudanças feitas por outro processo)
+    CATALOG_SNAPSHOT_TTL_SECONDS: float = 60.0
+
+    # Dicas diárias: quantidade de variações geradas por orçamento de tokens (tipo de usuário)
+    DAILY_TIPS_VARIANTS: int = 1
+
     class Config:
         env_file = ".env"  # Arquivo de onde as variáveis serão carregadas
         extra = "ignore"  # Ignora variáveis extras no .env que não estão definidas aqui
@@ -1,8 +1,8 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.postgresdatabase import engine, Session
-from app.core.base import Base
+from app.core.postgresdatabase import Session
+from app.core.schema_upgrades import create_schema
 import asyncio
 import datetime
 
@@ -23,6 +23,7 @@ from app.schemas.card_styles import CardStylesSchema
 from app.schemas.zodiac import ZodiacSchemaBase
 
 from app.schemas.daily_path import DailyPathSchemaBase
+from app.schemas.llm_cache import LLMCacheSchemaBase
 
 
 from app.services.dailyScheduler import DailyScheduler
@@ -33,16 +34,25 @@ from app.services.calendar import Calendar
 from app.services.zodiac import DailyZodiacService
 from app.services.daily_path import DailyPathService
 from app.services.dailyTips import DailyTipsService
+from app.services.retention import retention_service
+from app.services.openai import OpenAIService
+from app.services.topic_classifier import topic_classifier
+from app.services.leader_election import scheduler_leader
+from app.services.activity import activity_tracker
+from app.services.mission_scheduler import mission_scheduler
+from app.core.configs import settings
 
 
 from contextlib import asynccontextmanager
-from app.services.scheduler import start_jobs
+from app.services.scheduler import scheduler, start_jobs
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+async def init_database():
+    """
+    Cria as tabelas, aplica as atualizações de schema e sincroniza os catálogos.
+    Usado tanto pela API quanto pelo worker (python -m app.worker).
+    """
     # Criação das tabelas
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await create_schema()
 
     # Inicialização dos dados
     async with Session() as session:
@@ -59,39 +69,89 @@ async def lifespan(app: FastAPI):
         await PlanetSchemaBase.sync_planets(db)
         await ZodiacSchemaBase.sync_zodiacs(db)
         await CardStylesSchema.sync_card_styles(db)
+        # Remove respostas expiradas do cache persistente do modelo
+        await LLMCacheSchemaBase.delete_expired(db)
 
 
-
+def start_background_jobs() -> list[asyncio.Task]:
+    """
+    Inicia a eleição de líder, a varredura de 1 minuto (APScheduler) e os jobs diários.
+    Retorna as tarefas criadas para que possam ser canceladas no encerramento.
+    """
+    tasks = []
+    # Eleição de líder: só um processo do cluster executa os agendadores
+    tasks.append(asyncio.create_task(scheduler_leader.run()))
 
     # Inicia o agendador
     start_jobs()
+    # Missões e eventos: reconciliação nas fronteiras (reset_time, expiração, fim de período)
+    if settings.MISSION_DEADLINE_SCHEDULER:
+        tasks.append(asyncio.create_task(mission_scheduler.run()))
     # Agenda a tarefa para rodar daqui a 30 segundos a partir de agora
     provide_daily_gifts = DailyScheduler(
         scheduled_time=(datetime.datetime.now() + datetime.timedelta(seconds=30)).time(),
         functions=[Subscription().create_daily_gift_for_all_users]
     )
-    
-    now = datetime.datetime.now()
+
     next_run = datetime.time(hour=0, minute=30)
     provide_daily_horoscope = DailyScheduler(
         scheduled_time=next_run,
         functions=[DailyZodiacService().create_daily_zodiac_for_all_users]
     )
-    
-    # Agenda a tarefa para rodar daqui a 30 segundos a partir de agora
+
     provide_daily_path = DailyScheduler(
         scheduled_time=datetime.time(hour=1, minute=30),
         functions=[DailyPathService().create_daily_path_for_all_users]
     )
-    
+
     provide_daily_tips = DailyScheduler(
         scheduled_time=datetime.time(hour=2, minute=30),
         functions=[DailyTipsService().create_daily_tips_for_all_users]
     )
-    
-    asyncio.create_task(provide_daily_path.start())
-    asyncio.create_task(provide_daily_gifts.start())
-    asyncio.create_task(provide_daily_horoscope.start())
-    asyncio.create_task(provide_daily_tips.start())
 
-    yield
\ No newline at end of file
+    # Retenção depois dos jobs diários: um DELETE por tabela em vez de um por usuário
+    enforce_retention = DailyScheduler(
+        scheduled_time=datetime.time(hour=3, minute=30),
+        functions=[retention_service.enforce_all]
+    )
+
+    tasks.append(asyncio.create_task(provide_daily_path.start()))
+    tasks.append(asyncio.create_task(provide_daily_gifts.start()))
+    tasks.append(asyncio.create_task(provide_daily_horoscope.start()))
+    tasks.append(asyncio.create_task(provide_daily_tips.start()))
+    tasks.append(asyncio.create_task(enforce_retention.start()))
+    return tasks
+
+
+async def stop_background_jobs(tasks: list[asyncio.Task]):
+    await mission_scheduler.stop()
+    # Libera a liderança para outro processo assumir imediatamente
+    await scheduler_leader.stop()
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    for task in tasks:
+        task.cancel()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_database()
+
+    async with Session() as session:
+        # Treina o classificador local de tópicos com o histórico de tiragens
+        await topic_classifier.fit_history(session, limit=settings.TOPIC_CLASSIFIER_HISTORY_LIMIT)
+
+    # Modo só API (RUN_BACKGROUND_JOBS=false): os jobs rodam em `python -m app.worker`
+    tasks = start_background_jobs() if settings.RUN_BACKGROUND_JOBS else []
+    # Grava periodicamente o last_active_at dos usuários autenticados (processo da API)
+    activity_task = asyncio.create_task(activity_tracker.run())
+
+    yield
+
+    if settings.RUN_BACKGROUND_JOBS:
+        await stop_background_jobs(tasks)
+    activity_task.cancel()
+    await activity_tracker.stop()
+
+    # Encerra o pool HTTP compartilhado do cliente OpenAI
+    await OpenAIService.close()
@@ -0,0 +1,108 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.base import Base
+from app.core.postgresdatabase import engine
+from app.models import __all_models  # registra todas as tabelas no metadata do create_all
+from app.services.leader_election import advisory_lock_key
+
+
+# O create_all só cria tabelas novas; colunas adicionadas a tabelas existentes
+# entram aqui como comandos idempotentes executados na inicialização.
+SCHEMA_UPGRADES: list[str] = [
+    "ALTER TABLE draws ADD COLUMN IF NOT EXISTS context_embedding DOUBLE PRECISION[]",
+    "ALTER TABLE draws ADD COLUMN IF NOT EXISTS reading_summary TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_active_at TIMESTAMP",
+    # reconciliação de missões em conjunto (por tipo, usuário e período)
+    'CREATE INDEX IF NOT EXISTS ix_mission_type_user_created ON mission (mission_type, "user", created_at)',
+    # user_event_progress: missões pendentes/concluídas por usuário, mantidas por triggers de
+    # comando (com tabelas de transição) para acompanhar os UPDATEs em conjunto da reconciliação
+    """
+    CREATE OR REPLACE FUNCTION sync_user_event_progress() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM user_event_progress p USING old_missions o WHERE p.mission_id = o.id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO user_event_progress (mission_id, user_id, mission_type, status, created_at, used_at)
+            SELECT n.id, n."user", n.mission_type, n.status, n.created_at, n.used_at
+            FROM new_missions n
+            JOIN status s ON s.id = n.status
+            WHERE s.name IN ('pending_confirmation', 'completed')
+            ON CONFLICT (mission_id) DO UPDATE SET
+                user_id = EXCLUDED.user_id,
+                mission_type = EXCLUDED.mission_type,
+                status = EXCLUDED.status,
+                created_at = EXCLUDED.created_at,
+                used_at = EXCLUDED.used_at;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # triggers criados (e a carga inicial feita) só na primeira vez: recriá-los a cada inicialização
+    # travaria a tabela mission (ACCESS EXCLUSIVE) em todo boot de cada processo. Para reparar
+    # divergências depois: python -m app.commands.rebuild_user_event_progress
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger WHERE tgname = 'trg_user_event_progress_insert' AND tgrelid = 'mission'::regclass
+        ) THEN
+            CREATE TRIGGER trg_user_event_progress_insert AFTER INSERT ON mission
+            REFERENCING NEW TABLE AS new_missions
+            FOR EACH STATEMENT EXECUTE FUNCTION sync_user_event_progress();
+
+            DROP TRIGGER IF EXISTS trg_user_event_progress_update ON mission;
+            CREATE TRIGGER trg_user_event_progress_update AFTER UPDATE ON mission
+            REFERENCING OLD TABLE AS old_missions NEW TABLE AS new_missions
+            FOR EACH STATEMENT EXECUTE FUNCTION sync_user_event_progress();
+
+            DROP TRIGGER IF EXISTS trg_user_event_progress_delete ON mission;
+            CREATE TRIGGER trg_user_event_progress_delete AFTER DELETE ON mission
+            REFERENCING OLD TABLE AS old_missions
+            FOR EACH STATEMENT EXECUTE FUNCTION sync_user_event_progress();
+
+            INSERT INTO user_event_progress (mission_id, user_id, mission_type, status, created_at, used_at)
+            SELECT m.id, m."user", m.mission_type, m.status, m.created_at, m.used_at
+            FROM mission m
+            JOIN status s ON s.id = m.status
+            WHERE s.name IN ('pending_confirmation', 'completed')
+            ON CONFLICT (mission_id) DO NOTHING;
+        END IF;
+    END;
+    $$
+    """,
+]
+
+
+async def lock_schema_upgrades(conn: AsyncConnection) -> None:
+    """
+    Serializa a criação/atualização do schema entre os processos (API, workers e worker separado
+    iniciando juntos): advisory lock da transação, liberado no commit/rollback.
+    """
+    await conn.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": advisory_lock_key("tarot:schema_upgrades")}
+    )
+
+
+async def apply_schema_upgrades(conn: AsyncConnection) -> None:
+    """
+    Aplica os comandos de SCHEMA_UPGRADES (todos idempotentes) na conexão informada,
+    sob o lock de lock_schema_upgrades.
+    """
+    await lock_schema_upgrades(conn)
+    for statement in SCHEMA_UPGRADES:
+        await conn.execute(text(statement))
+
+
+async def create_schema() -> None:
+    """
+    Cria as tabelas novas (create_all) e aplica SCHEMA_UPGRADES, um processo por vez.
+    Mesma sequência usada na inicialização (init_database) e pelos comandos de backfill.
+    """
+    async with engine.begin() as conn:
+        # create_all e os comandos de SCHEMA_UPGRADES concorrentes conflitam
+        await lock_schema_upgrades(conn)
+        await conn.run_sync(Base.metadata.create_all)
+        await apply_schema_upgrades(conn)
@@ -3,6 +3,7 @@ from fastapi import HTTPException, Request
 from jose import JWTError, jwt, ExpiredSignatureError
 from app.core.configs import settings
 from app.services.token import TokenAccessSchema, TokenInfoSchema
+from app.services.activity import activity_tracker
 
 # Token configurations
 SECRET_KEY = settings.ACCESS_SECRET_KEY
@@ -49,6 +50,8 @@ def verify_jwt(request: Request):
         request.state.token_info = (
             token_info  # Save the information globally in the request
         )
+        # Last activity is only kept in memory here and flushed in bulk
+        activity_tracker.touch(getattr(token_info, "id", None))
 
     except ExpiredSignatureError:
         raise HTTPException(
@@ -0,0 +1,283 @@
+"""
+Servidor local que imita o Azure OpenAI (chat completions, com e sem streaming, e embeddings)
+para benchmarks e testes de carga sem credenciais reais.
+
+Uso:
+    python -m app.devtools.fake_azure_openai --port 8099 --profile realistic
+    AZURE_ENDPOINT=http://127.0.0.1:8099 AZURE_API_KEY=fake uvicorn app.main:app
+
+Perfis (--profile) definem a latência até o primeiro token, a vazão de tokens de saída
+e a taxa de falhas 429/5xx. As respostas são fixas e seguem o formato esperado pelos
+prompts de readings, daily_zodiac, daily_tips, comparador, analise_contexto e resumo_leitura.
+"""
+import argparse
+import ast
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+# latency: (distribuição, parâmetros) em segundos até o primeiro token
+# tokens_per_second: vazão de saída; rate_429 / rate_5xx: probabilidade de falha por requisição
+PROFILES: dict[str, dict] = {
+    "instant": {"latency": ("fixed", (0.0,)), "tokens_per_second": 0, "rate_429": 0.0, "rate_5xx": 0.0},
+    "fast": {"latency": ("uniform", (0.05, 0.15)), "tokens_per_second": 400, "rate_429": 0.0, "rate_5xx": 0.0},
+    "realistic": {"latency": ("lognormal", (0.6, 0.5)), "tokens_per_second": 60, "rate_429": 0.01, "rate_5xx": 0.005},
+    "slow": {"latency": ("lognormal", (2.0, 0.6)), "tokens_per_second": 25, "rate_429": 0.02, "rate_5xx": 0.01},
+    "throttled": {"latency": ("lognormal", (0.6, 0.5)), "tokens_per_second": 60, "rate_429": 0.3, "rate_5xx": 0.0},
+    "flaky": {"latency": ("uniform", (0.2, 1.0)), "tokens_per_second": 80, "rate_429": 0.05, "rate_5xx": 0.2},
+}
+
+
+class FakeAzureOpenAI:
+    def __init__(self, profile: dict, seed: int | None = None, retry_after: float = 1.0):
+        self.profile = profile
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.failures = {"429": 0, "5xx": 0}
+
+    def sample_latency(self) -> float:
+        kind, params = self.profile["latency"]
+        if kind == "uniform":
+            return self.random.uniform(*params)
+        if kind == "lognormal":
+            median, sigma = params
+            return self.random.lognormvariate(math.log(median), sigma)
+        return params[0]
+
+    def token_delay(self) -> float:
+        tps = self.profile["tokens_per_second"]
+        return 1.0 / tps if tps else 0.0
+
+    def injected_failure(self) -> JSONResponse | None:
+        roll = self.random.random()
+        if roll < self.profile["rate_429"]:
+            self.failures["429"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": str(self.retry_after)},
+                content={"error": {"code": "429", "message": "Requests to the deployment have exceeded the rate limit (fake)."}},
+            )
+        if roll < self.profile["rate_429"] + self.profile["rate_5xx"]:
+            self.failures["5xx"] += 1
+            status = self.random.choice([500, 502, 503])
+            return JSONResponse(
+                status_code=status,
+                content={"error": {"code": str(status), "message": "Internal server error (fake)."}},
+            )
+        return None
+
+
+def _stable_fraction(text: str) -> float:
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 0xFFFFFFFF
+
+
+def canned_response(system: str, prompt: str) -> str:
+    """
+    Resposta fixa com o mesmo formato que o prompt real espera.
+    """
+    if "Formato final DEVE ser JSON" in prompt:
+        match = re.search(r"utilizando as cartas (\[.*?\])", prompt, re.DOTALL)
+        try:
+            cards = ast.literal_eval(match.group(1)) if match else []
+        except Exception:
+            cards = []
+        reading = {"introducao": "Esta leitura observa o momento presente com calma e clareza."}
+        for index, card in enumerate(cards or ["A carta"], start=1):
+            reading[f"carta_{index}"] = f"{card}: indica um passo prático e consciente para os próximos dias."
+        reading["conclusao"] = "Confie no processo e aja com serenidade; o caminho se abre aos poucos."
+        return "```json\n" + json.dumps(reading, ensure_ascii=False) + "\n```"
+
+    if "Escreva SOMENTE a interpretação da carta" in prompt:
+        match = re.search(r"de \d+: '(.+?)'", prompt)
+        card = match.group(1) if match else "A carta"
+        return f"{card}: indica um passo prático e consciente para os próximos dias."
+    if "Escreva SOMENTE a introdução" in prompt:
+        return "Esta leitura observa o momento presente com calma e clareza."
+    if "Escreva SOMENTE a conclusão" in prompt:
+        return "Confie no processo e aja com serenidade; o caminho se abre aos poucos."
+
+    if '"espiritualidade"' in prompt:
+        return json.dumps({
+            "diario": "Um dia para organizar prioridades e agir com foco.",
+            "amor": "Conversas sinceras aproximam quem importa.",
+            "trabalho": "Boas ideias surgem ao revisar o que já foi feito.",
+            "saude": "Pausas curtas renovam a energia.",
+            "financas": "Prudência com gastos por impulso.",
+            "espiritualidade": "O silêncio traz respostas que a pressa esconde.",
+        }, ensure_ascii=False)
+
+    if '"tips"' in prompt:
+        return json.dumps({"tips": [
+            "contato com pessoas que te fazem rir",
+            "alongar o corpo ao acordar",
+            "pular refeições ou comer com pressa",
+            "sinais de cansaço no meio do dia",
+            "compromissos que não agregam valor",
+            "quanto tempo passa no celular à noite",
+        ]}, ensure_ascii=False)
+
+    if "Contexto 1:" in prompt and "Contexto 2:" in prompt:
+        return f"{_stable_fraction(prompt):.2f}"
+
+    if "Os tópicos disponíveis são:" in prompt:
+        match = re.search(r"Os tópicos disponíveis são: (\[.*?\])", prompt, re.DOTALL)
+        try:
+            topics = ast.literal_eval(match.group(1)) if match else []
+        except Exception:
+            topics = []
+        return str(topics[:1])
+
+    if "Resuma a leitura" in prompt:
+        return "Leitura sobre escolhas conscientes e paciência no momento atual."
+
+    return "Texto de teste gerado pelo servidor local do Azure OpenAI."
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+def create_app(fake: FakeAzureOpenAI) -> FastAPI:
+    app = FastAPI(title="Fake Azure OpenAI")
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def chat_completions(deployment: str, request: Request):
+        body = await request.json()
+        fake.requests += 1
+        await asyncio.sleep(fake.sample_latency())
+        failure = fake.injected_failure()
+        if failure is not None:
+            return failure
+
+        messages = body.get("messages", [])
+        system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        prompt = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        text = canned_response(system, prompt)
+        max_tokens = body.get("max_tokens")
+        words = _words(text)
+        if max_tokens:
+            # aproximação: um token por palavra ao truncar
+            words = words[:max_tokens]
+        text = "".join(words)
+        prompt_tokens = _count_tokens(system + prompt)
+        completion_tokens = _count_tokens(text)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            async def events():
+                for word in words:
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": deployment,
+                        "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    await asyncio.sleep(fake.token_delay())
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": deployment,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(fake.token_delay() * len(words))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": deployment,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/openai/deployments/{deployment}/embeddings")
+    async def embeddings(deployment: str, request: Request):
+        # importado aqui: só o endpoint de embeddings depende das configurações da aplicação (.env)
+        from app.services.embeddings import EmbeddingService
+
+        body = await request.json()
+        fake.requests += 1
+        await asyncio.sleep(fake.sample_latency())
+        failure = fake.injected_failure()
+        if failure is not None:
+            return failure
+        inputs = body.get("input", "")
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        tokens = sum(_count_tokens(str(item)) for item in inputs)
+        vectors = [EmbeddingService.local_embedding(str(item), 256) for item in inputs]
+        if body.get("encoding_format") == "base64":
+            # o SDK pede base64 por padrão: float32 little-endian
+            vectors = [base64.b64encode(struct.pack(f"<{len(v)}f", *v)).decode("ascii") for v in vectors]
+        return {
+            "object": "list",
+            "model": deployment,
+            "data": [
+                {"object": "embedding", "index": index, "embedding": vector}
+                for index, vector in enumerate(vectors)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/fake/stats")
+    async def stats():
+        return {"requests": fake.requests, "failures": fake.failures, "profile": fake.profile}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Servidor local que imita o Azure OpenAI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--seed", type=int, default=None, help="semente para latências e falhas reprodutíveis")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="valor do header Retry-After nas respostas 429")
+    parser.add_argument("--rate-429", type=float, default=None, help="sobrescreve a taxa de 429 do perfil")
+    parser.add_argument("--rate-5xx", type=float, default=None, help="sobrescreve a taxa de 5xx do perfil")
+    parser.add_argument("--tokens-per-second", type=float, default=None, help="sobrescreve a vazão do perfil")
+    args = parser.parse_args()
+
+    profile = dict(PROFILES[args.profile])
+    if args.rate_429 is not None:
+        profile["rate_429"] = args.rate_429
+    if args.rate_5xx is not None:
+        profile["rate_5xx"] = args.rate_5xx
+    if args.tokens_per_second is not None:
+        profile["tokens_per_second"] = args.tokens_per_second
+
+    uvicorn.run(create_app(FakeAzureOpenAI(profile, seed=args.seed, retry_after=args.retry_after)), host=args.host, port=args.port)
@@ -17,4 +17,8 @@ from app.models.review import ReviewModel  # Importando o ReviewModel
 from app.models.planet import PlanetModel  # Importando o PlanetModel
 from app.models.zodiac import ZodiacModel  # Importando o ZodiacSignModel
 from app.models.personalSign import PersonalSign # Importando o PersonalSignModel
-from app.models.card_styles import CardStyleModel  # Importando o CardStyleModel
\ No newline at end of file
+from app.models.card_styles import CardStyleModel  # Importando o CardStyleModel
+from app.models.llm_cache import LLMCacheModel  # Importando o LLMCacheModel
+from app.models.job_ledger import JobRunModel, JobItemModel  # Importando o JobRunModel e o JobItemModel
+from app.models.user_event_progress import UserEventProgressModel  # Importando o UserEventProgressModel
+from app.models.sweep_stats import SweepStatsModel  # Importando o SweepStatsModel
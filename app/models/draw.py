@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, DateTime, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, Boolean, Float, ForeignKey
 from sqlalchemy.dialects.postgresql import JSON, ARRAY
 from typing import Optional, List
 from datetime import datetime
@@ -23,4 +23,10 @@ class DrawModel(Base, SQLModel, table=True):
     is_reversed: list[bool] = Field(default=None, sa_column=Column(ARRAY(Boolean), nullable=True))
     card_style: Optional[int] = Field(
         default=None, sa_column=Column(Integer, ForeignKey("card_style.id", ondelete="SET NULL"), nullable=True)
-    )
\ No newline at end of file
+    )
+    # embedding normalizado do contexto, gravado quando a tiragem é concluída
+    context_embedding: Optional[list[float]] = Field(
+        default=None, sa_column=Column(ARRAY(Float), nullable=True)
+    )
+    # resumo curto da leitura, gerado uma vez em segundo plano após a conclusão
+    reading_summary: Optional[str] = None
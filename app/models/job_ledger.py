@@ -0,0 +1,42 @@
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from typing import Optional
+from app.core.base import Base  # Importando o Base correto
+from datetime import date, datetime
+
+
+class JobRunModel(Base, SQLModel, table=True):
+    __tablename__ = "job_runs"
+    __table_args__ = (UniqueConstraint("job_name", "run_date", name="uq_job_runs_job_date"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_name: str = Field(sa_column=Column(String(64), nullable=False))
+    run_date: date = Field(sa_column=Column(Date, nullable=False))
+    # running, completed ou partial (terminou com itens com falha; a próxima execução retoma)
+    status: str = Field(sa_column=Column(String(20), nullable=False, default="running"))
+    total: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    processed: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    failed: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    started_at: datetime = Field(sa_column=Column(DateTime, nullable=False, default=datetime.now))
+    finished_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, nullable=True))
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+class JobItemModel(Base, SQLModel, table=True):
+    __tablename__ = "job_items"
+    __table_args__ = (UniqueConstraint("run_id", "item_id", name="uq_job_items_run_item"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: int = Field(sa_column=Column(Integer, ForeignKey("job_runs.id", ondelete="CASCADE"), nullable=False, index=True))
+    # id do item processado (normalmente o id do usuário)
+    item_id: int = Field(sa_column=Column(Integer, nullable=False))
+    # done ou failed
+    status: str = Field(sa_column=Column(String(20), nullable=False))
+    attempts: int = Field(default=0, sa_column=Column(Integer, nullable=False, default=0))
+    error: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    updated_at: datetime = Field(sa_column=Column(DateTime, nullable=False, default=datetime.now))
+
+    class Config:
+        arbitrary_types_allowed = True
@@ -0,0 +1,17 @@
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, String, Text, DateTime
+from app.core.base import Base  # Importando o Base correto
+from datetime import datetime
+
+
+class LLMCacheModel(Base, SQLModel, table=True):
+    __tablename__ = "llm_response_cache"
+
+    # sha256 do prompt, role, modelo e parâmetros da chamada
+    key: str = Field(sa_column=Column(String(64), primary_key=True))
+    response: str = Field(sa_column=Column(Text, nullable=False))
+    created_at: datetime = Field(sa_column=Column(DateTime, nullable=False, default=datetime.now))
+    expires_at: datetime = Field(sa_column=Column(DateTime, nullable=False, index=True))
+
+    class Config:
+        arbitrary_types_allowed = True
@@ -0,0 +1,21 @@
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.dialects.postgresql import JSON
+from app.core.base import Base  # Importando o Base correto
+from datetime import datetime
+
+
+class SweepStatsModel(Base, SQLModel, table=True):
+    """
+    Última telemetria de cada varredura periódica (SweepRunner.snapshot()), gravada pelo processo
+    líder para que /dev/scheduler-stats funcione em qualquer processo (API só API + worker).
+    """
+    __tablename__ = "sweep_stats"
+
+    name: str = Field(sa_column=Column(String(64), primary_key=True))
+    # snapshot da varredura + métricas do processo que a executou
+    stats: dict = Field(sa_column=Column(JSON, nullable=False))
+    updated_at: datetime = Field(sa_column=Column(DateTime, nullable=False))
+
+    class Config:
+        arbitrary_types_allowed = True
@@ -3,6 +3,7 @@ from sqlalchemy import Column, String, Integer, DateTime
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.mutable import MutableList, MutableDict
 from typing import Optional, List
+from datetime import datetime
 from app.core.base import Base  # Importando o Base correto
 
 
@@ -36,3 +37,7 @@ class UserModel(Base, SQLModel, table=True):
     created_at: DateTime = Field(
         sa_column=Column(DateTime, nullable=False)
     )  # Data de criação obrigatória
+    # última requisição autenticada (gravada em lote pelo activity_tracker)
+    last_active_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime, nullable=True)
+    )
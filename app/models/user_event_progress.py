@@ -0,0 +1,25 @@
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Column, DateTime, Index, Integer
+from typing import Optional
+from app.core.base import Base  # Importando o Base correto
+from datetime import datetime
+
+
+class UserEventProgressModel(Base, SQLModel, table=True):
+    """
+    Modelo de leitura do progresso dos usuários nas missões: uma linha por missão pendente
+    ou concluída. Mantido por triggers na tabela mission (ver SCHEMA_UPGRADES), nunca
+    escrito pela aplicação.
+    """
+    __tablename__ = "user_event_progress"
+    __table_args__ = (Index("ix_user_event_progress_user_type", "user_id", "mission_type"),)
+
+    mission_id: int = Field(sa_column=Column(Integer, primary_key=True, autoincrement=False))
+    user_id: int = Field(sa_column=Column(Integer, nullable=False))
+    mission_type: int = Field(sa_column=Column(Integer, nullable=False))
+    status: int = Field(sa_column=Column(Integer, nullable=False))
+    created_at: datetime = Field(sa_column=Column(DateTime, nullable=False))
+    used_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, nullable=True))
+
+    class Config:
+        arbitrary_types_allowed = True
@@ -52,3 +52,35 @@ role = (
     "- Para perguntas do cotidiano (comida, lugares, atividades): responda como um tarólogo real, integrando sugestão real e prática dentro da conclusão, sem parecer robótico.\n\n"
     "Seja claro, honesto e construtivo, nunca alarmista. Frases curtas, diretas e cheias de presença."
 )
+
+
+# Modo paralelo: introdução, cada carta e conclusão geradas em chamadas separadas,
+# todas partindo do mesmo preâmbulo de contexto.
+prompt_preambulo_paralelo_template = (
+    "Leitura de tarot com as cartas {cards_names} (nesta ordem), para o contexto '{context}'.\n"
+    "Consulente: '{user_name}'. Tipo de tiragem: '{spreadname}'. Baralho: '{deckname}'.\n"
+    "É OBRIGATÓRIO aplicar o estilo de leitura '{reading_style_name}' usando a seguinte descrição: '{reading_style_description}'.\n"
+    "Seja direto para que o consulente saiba como agir. Priorize clareza, empatia e ações práticas. "
+    "Nunca use listas, bullets ou enumerações.\n\n"
+)
+
+prompt_secao_introducao_template = (
+    "Escreva SOMENTE a introdução desta leitura: curta, contextualizando a consulta, "
+    "citando o nome do consulente, o tipo de tiragem e o baralho.\n"
+    "Responda apenas com o texto da introdução, sem JSON, sem título e sem aspas."
+)
+
+prompt_secao_carta_template = (
+    "Escreva SOMENTE a interpretação da carta na posição {position} de {card_count}: '{card_name}' ({orientation}).\n"
+    "Comece citando o nome da carta e relacione-a ao contexto e à sua posição na tiragem. "
+    "Se estiver invertida, destaque como o significado se transforma em relação à posição normal.\n"
+    "Responda apenas com o texto da interpretação, sem JSON, sem título e sem aspas."
+)
+
+prompt_secao_conclusao_template = (
+    "Escreva SOMENTE a conclusão desta leitura, considerando todas as cartas em conjunto.\n"
+    "Conclusão obrigatória: síntese natural da leitura, uma orientação prática suave, um risco/armadilha a evitar, "
+    "uma intenção a cultivar e uma frase final de encorajamento.\n"
+    "Só comece com 'Sim' ou 'Não' se a pergunta for claramente dicotômica.\n"
+    "Responda apenas com o texto da conclusão, sem JSON, sem título e sem aspas."
+)
@@ -66,6 +66,18 @@ class CardSchemaBase(BaseModel):
         else:
             return [name for _, name in cards]
         
+    @staticmethod
+    async def get_cards_names_map(session: AsyncSession, card_ids: list[int]) -> dict[int, str]:
+        """
+        Retorna {id: nome} de todas as cartas informadas em uma única consulta.
+        """
+        if not card_ids:
+            return {}
+        result = await session.execute(
+            select(CardModel.id, CardModel.name).where(CardModel.id.in_(set(card_ids)))
+        )
+        return {card_id: name for card_id, name in result.all()}
+
     @staticmethod
     async def get_card_by_deck_id(session: AsyncSession, deck_id: int) -> list:
         """
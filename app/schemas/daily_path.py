@@ -12,6 +12,21 @@ class DailyPathSchemaBase(BaseModel):
         "arbitrary_types_allowed": True,  # Allows arbitrary types like SQLAlchemy's DateTime
         "validate_assignment": True
     }
+
+    @staticmethod
+    async def get_user_ids_with_entry_since(session, user_ids: list[int], since: datetime) -> set[int]:
+        """
+        Return which of the given users already have a daily path entry created at or after `since`
+        (used by the nightly job to never insert twice for the same day).
+        """
+        if not user_ids:
+            return set()
+        result = await session.execute(
+            select(DailyPathModel.user)
+            .where(DailyPathModel.user.in_(user_ids), DailyPathModel.created_at >= since)
+            .distinct()
+        )
+        return set(result.scalars().all())
     
     @staticmethod
     async def get_daily_path_by_user_id(session, user_id: int, count: int = 1):
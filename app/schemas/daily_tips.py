@@ -13,6 +13,21 @@ class DailyTipsSchemaBase(BaseModel):
         "validate_assignment": True
     }
 
+    @staticmethod
+    async def get_user_ids_with_entry_since(session, user_ids: list[int], since: datetime) -> set[int]:
+        """
+        Return which of the given users already have a daily tips entry created at or after `since`
+        (used by the nightly job to never insert twice for the same day).
+        """
+        if not user_ids:
+            return set()
+        result = await session.execute(
+            select(DailyTipsModel.user)
+            .where(DailyTipsModel.user.in_(user_ids), DailyTipsModel.created_at >= since)
+            .distinct()
+        )
+        return set(result.scalars().all())
+
     @staticmethod
     async def delete_daily_tips_by_user_id(session, user_id: int):
         """
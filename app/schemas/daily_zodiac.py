@@ -13,6 +13,21 @@ class DailyZodiacSchemaBase(BaseModel):
         "validate_assignment": True
     }
 
+    @staticmethod
+    async def get_user_ids_with_entry_since(session, user_ids: list[int], since: datetime) -> set[int]:
+        """
+        Return which of the given users already have a daily zodiac entry created at or after `since`
+        (used by the nightly job to never insert twice for the same day).
+        """
+        if not user_ids:
+            return set()
+        result = await session.execute(
+            select(DailyZodiacModel.user)
+            .where(DailyZodiacModel.user.in_(user_ids), DailyZodiacModel.created_at >= since)
+            .distinct()
+        )
+        return set(result.scalars().all())
+
 
     # deleta todos os registros de daily zodiac do usuário, pq ele mudou a data de nascimento então não é mais válido
     @staticmethod
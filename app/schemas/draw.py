@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from app.models.draw import DrawModel  # Import DrawsModel and SpreadTypeModel from the appropriate module
 from app.schemas.status import StatusSchemaBase  # Import StatusSchemaBase from the appropriate module
 from sqlalchemy.sql import text  # Import text from sqlalchemy
+from sqlalchemy import insert
 from app.models.spread_types import SpreadTypeModel  # Import SpreadTypeModel from the appropriate module
 
 class DrawSchemaBase(BaseModel):
@@ -66,7 +67,9 @@ class DrawSchemaBase(BaseModel):
                 reading, 
                 deck_id, 
                 spread_type_id,
-                is_reversed
+                is_reversed,
+                context,
+                reading_summary
                 FROM draws
                 WHERE id = :draw_id
             """)    
@@ -78,7 +81,9 @@ class DrawSchemaBase(BaseModel):
                 "reading": row.reading,
                 "deck_id": row.deck_id,
                 "spread_type_id": row.spread_type_id,
-                "is_reversed": row.is_reversed
+                "is_reversed": row.is_reversed,
+                "context": row.context,
+                "reading_summary": row.reading_summary
             }
         return None
 
@@ -137,6 +142,164 @@ class DrawSchemaBase(BaseModel):
         ids = [row.id for row in rows] if rows else []
         return ids
     
+    @staticmethod
+    async def get_similar_draws(
+        session,
+        user_id: int,
+        embedding: list[float],
+        spread_type_id: int | None = None,
+        exclude_draw_id: int | None = None,
+        top_k: int = 5,
+        min_score: float = 0.5,
+        ) -> list[dict]:
+        """
+        Nearest-neighbour search over all of the user's embedded draws.
+        Embeddings are normalised, so the dot product is the cosine similarity.
+        Returns up to top_k dicts {id, context, score} ordered by score, above min_score.
+        """
+        if not embedding:
+            return []
+        base_query = """
+                    SELECT id, context, score
+                    FROM (
+                        SELECT d.id, d.context,
+                            (SELECT SUM(a * b)
+                             FROM unnest(d.context_embedding, CAST(:embedding AS DOUBLE PRECISION[])) AS t(a, b)
+                            ) AS score
+                        FROM draws d
+                        WHERE d.user_id = :user_id
+                        AND d.context_embedding IS NOT NULL
+                        AND array_length(d.context_embedding, 1) = :dim
+                    """
+        params = {
+                    "user_id": user_id,
+                    "embedding": embedding,
+                    "dim": len(embedding),
+                    "min_score": min_score,
+                    "limit": top_k,
+                }
+        if spread_type_id is not None:
+                    base_query += " AND d.spread_type_id = :spread_type_id"
+                    params["spread_type_id"] = spread_type_id
+        if exclude_draw_id is not None:
+                    base_query += " AND d.id <> :exclude_draw_id"
+                    params["exclude_draw_id"] = exclude_draw_id
+
+        base_query += """
+                    ) AS candidates
+                    WHERE score >= :min_score
+                    ORDER BY score DESC
+                    LIMIT :limit
+                    """
+
+        result = await session.execute(text(base_query), params)
+        return [
+            {"id": row.id, "context": row.context, "score": float(row.score)}
+            for row in result.fetchall()
+        ]
+
+    @staticmethod
+    async def update_context_embedding(
+        session, draw_id: int, embedding: list[float]
+    ) -> None:
+        """
+        Store the normalised context embedding of a draw.
+        """
+        try:
+            await session.execute(
+                text("UPDATE draws SET context_embedding = :embedding WHERE id = :draw_id"),
+                {"embedding": embedding, "draw_id": draw_id},
+            )
+            await session.commit()
+        except Exception as e:
+            print(f"Erro ao salvar embedding do draw {draw_id}: {e}")
+            await session.rollback()
+
+    @staticmethod
+    async def get_draws_without_embedding(
+        session, after_id: int = 0, limit: int = 500
+    ) -> list[tuple[int, str]]:
+        """
+        Return (id, context) of completed draws with id > after_id that still have
+        no context embedding, ordered by id.
+        """
+        result = await session.execute(
+            text("""
+                SELECT id, context
+                FROM draws
+                WHERE id > :after_id
+                AND context_embedding IS NULL
+                AND context IS NOT NULL
+                AND reading IS NOT NULL
+                ORDER BY id
+                LIMIT :limit
+            """),
+            {"after_id": after_id, "limit": limit},
+        )
+        return [(row.id, row.context) for row in result.fetchall()]
+
+    @staticmethod
+    async def update_reading_summary(
+        session, draw_id: int, summary: str
+    ) -> None:
+        """
+        Store the reading summary of a completed draw.
+        """
+        try:
+            await session.execute(
+                text("UPDATE draws SET reading_summary = :summary WHERE id = :draw_id"),
+                {"summary": summary, "draw_id": draw_id},
+            )
+            await session.commit()
+        except Exception as e:
+            print(f"Erro ao salvar resumo do draw {draw_id}: {e}")
+            await session.rollback()
+
+    @staticmethod
+    async def get_draws_without_summary(
+        session, after_id: int = 0, limit: int = 200
+    ) -> list[int]:
+        """
+        Return ids (> after_id) of completed draws that still have no reading summary.
+        """
+        result = await session.execute(
+            text("""
+                SELECT id
+                FROM draws
+                WHERE id > :after_id
+                AND reading_summary IS NULL
+                AND reading IS NOT NULL
+                ORDER BY id
+                LIMIT :limit
+            """),
+            {"after_id": after_id, "limit": limit},
+        )
+        return [row.id for row in result.fetchall()]
+
+    @staticmethod
+    async def get_contexts_with_topics(session, limit: int = 5000) -> list[tuple[str, list[int]]]:
+        """
+        Return (context, topics) of the most recent draws that have both, used to fit the topic classifier.
+        """
+        try:
+            result = await session.execute(
+                text("""
+                    SELECT context, topics
+                    FROM draws
+                    WHERE context IS NOT NULL
+                    AND topics IS NOT NULL
+                    AND cardinality(topics) > 0
+                    ORDER BY id DESC
+                    LIMIT :limit
+                """),
+                {"limit": limit},
+            )
+            return [(row.context, row.topics) for row in result.fetchall()]
+        except Exception as e:
+            print(f"Erro ao buscar contextos com tópicos: {e}")
+            await session.rollback()
+            return []
+
     @staticmethod
     async def verify_draw_belongs_to_user(
         session, draw_id: int, user_id: int
@@ -377,6 +540,57 @@ class DrawSchemaBase(BaseModel):
         row = result.fetchone()
         return row[0] if row else None
 
+    @staticmethod
+    async def get_draws_with_status(session, draw_ids: list[int], status_id: int) -> list[dict]:
+        """
+        Return id, user_id and spread_type_id of the given draws that have `status_id`, in one query.
+        """
+        if not draw_ids:
+            return []
+        result = await session.execute(
+            text("""
+                SELECT id, user_id, spread_type_id
+                FROM draws
+                WHERE id = ANY(:draw_ids)
+                AND status_id = :status_id
+            """),
+            {"draw_ids": list(draw_ids), "status_id": status_id},
+        )
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    @staticmethod
+    async def bulk_update_created_at(session, draw_ids: list[int]) -> None:
+        """
+        Set created_at = now for many draws in one statement (does not commit).
+        """
+        if not draw_ids:
+            return
+        await session.execute(
+            text("UPDATE draws SET created_at = :created_at WHERE id = ANY(:draw_ids)"),
+            {"created_at": datetime.now(), "draw_ids": list(draw_ids)},
+        )
+
+    @staticmethod
+    async def bulk_create_draws(
+        session, entries: list[tuple[int, int]], status_id: int
+    ) -> list[tuple[int, int]]:
+        """
+        Insert many draws in one statement (does not commit).
+        `entries` is a list of (user_id, spread_type_id). Returns (draw_id, user_id) of the new rows.
+        """
+        if not entries:
+            return []
+        now = datetime.now()
+        result = await session.execute(
+            insert(DrawModel)
+            .values([
+                {"user_id": user_id, "spread_type_id": spread_type_id, "status_id": status_id, "created_at": now}
+                for user_id, spread_type_id in entries
+            ])
+            .returning(DrawModel.id, DrawModel.user_id)
+        )
+        return [(draw_id, user_id) for draw_id, user_id in result.all()]
+
     @staticmethod
     async def create_draw(session, user_id: int, spread_type_id: int):
         """
@@ -413,6 +627,8 @@ class DrawUpdate(DrawSchemaBase):
     #opcional, saber se a carta esta normal ou invertida
     is_reversed: list[bool] | None = None
     card_style: int | None = None  # Optional field for card style ID
+    # opcional, gera introdução, cada carta e conclusão em chamadas paralelas
+    parallel: bool = False
 
 class DrawSchema(DrawSchemaBase):
     id: int
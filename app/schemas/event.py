@@ -11,6 +11,7 @@ from app.schemas.recurrence_type import RecurrenceType
 from sqlalchemy import or_
 from app.basic.event import event  # Import the event data
 from app.models.event import EventModel  # Import EventModel to fix the error
+from app.services.catalog import mission_catalog
 
 class EventSchemaBase(BaseModel):
     class Config:
@@ -139,41 +140,11 @@ class EventSchemaBase(BaseModel):
         """
         Returns True when the mission is not tied to any event or when at least one
         active (and not expired) event contains the mission. Prevents creating new
-        missions for expired events.
+        missions for expired events. Answered from the in-memory catalog snapshot.
         """
         try:
-            from sqlalchemy.dialects.postgresql import array
-
-            now = datetime.now()
-
-            result = await session.execute(
-                select(EventModel).where(
-                    EventModel.missions.op("&&")(array([mission_type_id]))
-                )
-            )
-            events = result.scalars().all()
-
-            # Mission is not related to any event
-            if not events:
-                return True
-
-            for ev in events:
-                expiration = ev.expired_date
-                if expiration and ev.reset_time:
-                    expiration = expiration.replace(
-                        hour=ev.reset_time.hour,
-                        minute=ev.reset_time.minute,
-                        second=ev.reset_time.second,
-                        microsecond=ev.reset_time.microsecond,
-                    )
-
-                if expiration and now >= expiration:
-                    continue
-
-                if ev.status == active_status_id:
-                    return True
-
-            return False
+            snapshot = await mission_catalog.get(session)
+            return snapshot.has_active_event_for_mission(mission_type_id, active_status_id)
         except Exception as e:
             print(
                 f"Error checking active event for mission_type_id {mission_type_id}: {e}"
@@ -298,6 +269,7 @@ class EventSchemaBase(BaseModel):
             if event:
                 event.status = new_status
                 await session.commit()
+                mission_catalog.invalidate()
                 print(f"Event {event_id} status updated to {new_status}.")
             else:
                 print(f"Event {event_id} not found.")
@@ -0,0 +1,93 @@
+from datetime import date, datetime
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job_ledger import JobItemModel, JobRunModel
+
+
+class JobLedgerSchemaBase(BaseModel):
+    model_config = {
+        "from_attributes": True,
+        "arbitrary_types_allowed": True,
+    }
+
+    @staticmethod
+    async def get_or_create_run(session: AsyncSession, job_name: str, run_date: date) -> dict:
+        """
+        Retorna a execução (job_name, run_date), criando-a se ainda não existir.
+        """
+        await session.execute(
+            insert(JobRunModel)
+            .values(job_name=job_name, run_date=run_date, status="running", started_at=datetime.now())
+            .on_conflict_do_nothing(index_elements=[JobRunModel.job_name, JobRunModel.run_date])
+        )
+        await session.commit()
+        result = await session.execute(
+            select(JobRunModel).where(JobRunModel.job_name == job_name, JobRunModel.run_date == run_date)
+        )
+        run = result.scalars().one()
+        return {"id": run.id, "status": run.status, "started_at": run.started_at}
+
+    @staticmethod
+    async def get_run(session: AsyncSession, job_name: str, run_date: date) -> JobRunModel | None:
+        result = await session.execute(
+            select(JobRunModel).where(JobRunModel.job_name == job_name, JobRunModel.run_date == run_date)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_done_item_ids(session: AsyncSession, run_id: int) -> set[int]:
+        """
+        Ids dos itens já concluídos na execução (pulados ao retomar).
+        """
+        result = await session.execute(
+            select(JobItemModel.item_id).where(JobItemModel.run_id == run_id, JobItemModel.status == "done")
+        )
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def mark_items(
+        session: AsyncSession, run_id: int, item_ids: list[int], status: str, error: str | None = None
+    ) -> None:
+        """
+        Registra o resultado de um ou mais itens (idempotente: atualiza o registro existente).
+        """
+        if not item_ids:
+            return
+        now = datetime.now()
+        stmt = insert(JobItemModel).values([
+            {"run_id": run_id, "item_id": item_id, "status": status, "attempts": 1, "error": error, "updated_at": now}
+            for item_id in item_ids
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobItemModel.run_id, JobItemModel.item_id],
+            set_={
+                "status": stmt.excluded.status,
+                "error": stmt.excluded.error,
+                "attempts": JobItemModel.attempts + 1,
+                "updated_at": now,
+            },
+        )
+        try:
+            await session.execute(stmt)
+            await session.commit()
+        except Exception as e:
+            print(f"Erro ao registrar itens do job {run_id}: {e}")
+            await session.rollback()
+
+    @staticmethod
+    async def finish_run(
+        session: AsyncSession, run_id: int, status: str, total: int, processed: int, failed: int
+    ) -> None:
+        try:
+            await session.execute(
+                update(JobRunModel)
+                .where(JobRunModel.id == run_id)
+                .values(status=status, total=total, processed=processed, failed=failed, finished_at=datetime.now())
+            )
+            await session.commit()
+        except Exception as e:
+            print(f"Erro ao finalizar o job {run_id}: {e}")
+            await session.rollback()
@@ -0,0 +1,64 @@
+from datetime import datetime
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.llm_cache import LLMCacheModel
+
+
+class LLMCacheSchemaBase(BaseModel):
+    model_config = {
+        "from_attributes": True,
+        "arbitrary_types_allowed": True,
+    }
+
+    @staticmethod
+    async def get_valid(session: AsyncSession, key: str) -> tuple[str, datetime] | None:
+        """
+        Retorna (response, expires_at) de uma entrada ainda válida, ou None.
+        """
+        result = await session.execute(
+            select(LLMCacheModel.response, LLMCacheModel.expires_at).where(
+                LLMCacheModel.key == key,
+                LLMCacheModel.expires_at > datetime.now(),
+            )
+        )
+        row = result.first()
+        return (row[0], row[1]) if row else None
+
+    @staticmethod
+    async def upsert(session: AsyncSession, key: str, response: str, expires_at: datetime) -> None:
+        """
+        Grava (ou renova) a resposta associada à chave.
+        """
+        now = datetime.now()
+        stmt = insert(LLMCacheModel).values(
+            key=key, response=response, created_at=now, expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LLMCacheModel.key],
+            set_={"response": response, "created_at": now, "expires_at": expires_at},
+        )
+        try:
+            await session.execute(stmt)
+            await session.commit()
+        except Exception as e:
+            print(f"Erro ao gravar cache de LLM: {e}")
+            await session.rollback()
+
+    @staticmethod
+    async def delete_expired(session: AsyncSession) -> int:
+        """
+        Remove as entradas expiradas. Retorna a quantidade removida.
+        """
+        try:
+            result = await session.execute(
+                delete(LLMCacheModel).where(LLMCacheModel.expires_at <= datetime.now())
+            )
+            await session.commit()
+            return result.rowcount or 0
+        except Exception as e:
+            print(f"Erro ao limpar cache de LLM: {e}")
+            await session.rollback()
+            return 0
@@ -1,13 +1,17 @@
 import asyncio
 from pydantic import BaseModel
-from sqlalchemy import func, update
+from sqlalchemy import func, text, update
 from sqlalchemy import select  # Import the select function
 from sqlalchemy.ext.asyncio import AsyncSession  # Import AsyncSession
 from sqlalchemy.exc import IntegrityError  # Import IntegrityError
 from app.models.mission import MissionModel  # Import MissionModel to fix NameError
 from app.schemas.status import StatusSchemaBase  # Import StatusSchemaBase to fix NameError
 from app.schemas.event import EventSchemaBase
-from datetime import datetime  # Import datetime to fix NameError
+from datetime import datetime, time  # Import datetime to fix NameError
+
+# missões dos usuários com o status informado (filtro comum das operações em conjunto)
+_ACTIVE_USERS_FILTER = 'm."user" IN (SELECT u.id FROM users u WHERE u.status = :user_status_id)'
+
 
 class MissionSchemaBase(BaseModel):
 
@@ -445,21 +449,24 @@ class MissionSchemaBase(BaseModel):
     @staticmethod
     async def update_missions_status_by_type_and_status(
         session: AsyncSession, mission_type_id: int, status_ids: list[int], new_status: int
-    ) -> None:
-        """Atualiza o status de todas as missões de um tipo que possuem um dos status fornecidos em uma única query."""
+    ) -> int:
+        """Atualiza o status de todas as missões de um tipo que possuem um dos status fornecidos em uma única query.
+        Retorna a quantidade de missões atualizadas."""
         try:
             stmt = update(MissionModel).where(
                 MissionModel.mission_type == mission_type_id,
                 MissionModel.status.in_(status_ids)
             ).values(status=new_status)
             
-            await session.execute(stmt)
+            result = await session.execute(stmt)
             await session.commit()
+            return result.rowcount
         except Exception as e:
             await session.rollback()
             print(
                 f'Erro ao atualizar missões do tipo {mission_type_id} com status {status_ids} para {new_status}: {e}'
             )
+            return 0
 
     @staticmethod
     async def modify_mission_status(
@@ -491,6 +498,218 @@ class MissionSchemaBase(BaseModel):
             await session.rollback()
             print(f'Erro inesperado ao atualizar missão ID {mission_id}: {e}')
 
+    @staticmethod
+    async def get_oldest_created_at_by_types(
+        session: AsyncSession, mission_type_ids: list[int], status_id: int
+    ) -> dict[int, datetime]:
+        """
+        Retorna {mission_type_id: menor created_at} das missões com o status informado, em uma consulta.
+        Usado para saber quando vence a próxima missão relativa (USER_BASED) de cada tipo.
+        """
+        if not mission_type_ids:
+            return {}
+        try:
+            result = await session.execute(
+                select(MissionModel.mission_type, func.min(MissionModel.created_at))
+                .where(
+                    MissionModel.mission_type.in_(mission_type_ids),
+                    MissionModel.status == status_id,
+                )
+                .group_by(MissionModel.mission_type)
+            )
+            return {mission_type_id: created_at for mission_type_id, created_at in result.all()}
+        except Exception as e:
+            await session.rollback()
+            print(f'Erro ao buscar a missão mais antiga dos tipos {mission_type_ids}: {e}')
+            return {}
+
+    # Operações em conjunto da reconciliação de missões (Calendar, Expired, UserBased):
+    # cada uma atinge todos os usuários com `user_status_id` em um único comando e não faz commit.
+
+    @staticmethod
+    async def bulk_expire_missions(
+        session: AsyncSession,
+        mission_type_id: int,
+        user_status_id: int,
+        status_ids: list[int],
+        expired_status_id: int,
+        created_before: datetime | None = None,
+    ) -> int:
+        """
+        Expira as missões do tipo com um dos `status_ids` (opcionalmente só as criadas antes de `created_before`).
+        Retorna a quantidade de missões expiradas.
+        """
+        sql = (
+            "UPDATE mission m SET status = :expired_status_id, used_at = NULL "
+            "WHERE m.mission_type = :mission_type_id AND m.status = ANY(:status_ids) AND "
+            + _ACTIVE_USERS_FILTER
+        )
+        params = {
+            "expired_status_id": expired_status_id,
+            "mission_type_id": mission_type_id,
+            "status_ids": list(status_ids),
+            "user_status_id": user_status_id,
+        }
+        if created_before is not None:
+            sql += " AND m.created_at < :created_before"
+            params["created_before"] = created_before
+        result = await session.execute(text(sql), params)
+        return result.rowcount
+
+    @staticmethod
+    async def bulk_renew_missions(
+        session: AsyncSession,
+        mission_type_id: int,
+        user_status_id: int,
+        pending_status_id: int,
+        period_start: datetime,
+    ) -> int:
+        """
+        Renova (created_at = period_start) as missões pendentes do tipo criadas antes do período atual.
+        """
+        result = await session.execute(
+            text(
+                "UPDATE mission m SET created_at = :period_start "
+                "WHERE m.mission_type = :mission_type_id AND m.status = :pending_status_id "
+                "AND m.created_at < :period_start AND " + _ACTIVE_USERS_FILTER
+            ),
+            {
+                "period_start": period_start,
+                "mission_type_id": mission_type_id,
+                "pending_status_id": pending_status_id,
+                "user_status_id": user_status_id,
+            },
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def bulk_expire_relative_missions(
+        session: AsyncSession,
+        mission_type_id: int,
+        user_status_id: int,
+        pending_status_id: int,
+        expired_status_id: int,
+        relative_days: int,
+        reset_time: time | None,
+        now: datetime,
+    ) -> int:
+        """
+        Expira as missões pendentes cujo prazo (created_at + relative_days, no horário de reset_time
+        quando informado) já passou. Mesma regra de UserBased.calculate_expired_date.
+        """
+        if reset_time:
+            deadline = "(CAST(m.created_at AS DATE) + CAST(:relative_days AS INTEGER)) + CAST(:reset_time AS TIME)"
+        else:
+            deadline = "m.created_at + make_interval(days => :relative_days)"
+        params = {
+            "expired_status_id": expired_status_id,
+            "mission_type_id": mission_type_id,
+            "pending_status_id": pending_status_id,
+            "user_status_id": user_status_id,
+            "relative_days": relative_days,
+            "now": now,
+        }
+        if reset_time:
+            params["reset_time"] = reset_time
+        result = await session.execute(
+            text(
+                "UPDATE mission m SET status = :expired_status_id, used_at = NULL "
+                "WHERE m.mission_type = :mission_type_id AND m.status = :pending_status_id "
+                f"AND {deadline} <= :now AND " + _ACTIVE_USERS_FILTER
+            ),
+            params,
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def bulk_create_missing_missions(
+        session: AsyncSession,
+        mission_type_id: int,
+        user_status_id: int,
+        pending_status_id: int,
+        existing_status_ids: list[int],
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> int:
+        """
+        Cria uma missão pendente do tipo para cada usuário com `user_status_id` que ainda não tem
+        missão com um dos `existing_status_ids` (opcionalmente com created_at entre start_date e end_date).
+        Não verifica eventos: quem chama usa EventSchemaBase.has_active_event_for_mission uma vez por tipo.
+        """
+        conditions = [
+            'm."user" = u.id',
+            "m.mission_type = :mission_type_id",
+            "m.status = ANY(:existing_status_ids)",
+        ]
+        params = {
+            "mission_type_id": mission_type_id,
+            "user_status_id": user_status_id,
+            "pending_status_id": pending_status_id,
+            "existing_status_ids": list(existing_status_ids),
+            "created_at": datetime.now(),
+        }
+        if start_date is not None:
+            conditions.append("m.created_at >= :start_date")
+            params["start_date"] = start_date
+        if end_date is not None:
+            conditions.append("m.created_at <= :end_date")
+            params["end_date"] = end_date
+        result = await session.execute(
+            text(
+                'INSERT INTO mission (mission_type, "user", status, created_at, used_at) '
+                # tipos explícitos: no INSERT ... SELECT o Postgres não infere o tipo dos parâmetros
+                "SELECT CAST(:mission_type_id AS INTEGER), u.id, CAST(:pending_status_id AS INTEGER), "
+                "CAST(:created_at AS TIMESTAMP), NULL "
+                "FROM users u WHERE u.status = :user_status_id "
+                f"AND NOT EXISTS (SELECT 1 FROM mission m WHERE {' AND '.join(conditions)})"
+            ),
+            params,
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def bulk_expire_duplicate_missions(
+        session: AsyncSession,
+        mission_type_id: int,
+        user_status_id: int,
+        pending_status_id: int,
+        completed_status_id: int,
+        expired_status_id: int,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> int:
+        """
+        Deixa no máximo uma missão por usuário no período: se houver uma concluída, todas as pendentes
+        expiram; senão, só a pendente mais antiga (menor id) continua.
+        """
+        result = await session.execute(
+            text(
+                "UPDATE mission SET status = :expired_status_id, used_at = NULL "
+                "WHERE id IN ("
+                "  SELECT id FROM ("
+                "    SELECT m.id, m.status, ROW_NUMBER() OVER ("
+                '      PARTITION BY m."user" ORDER BY (m.status = :completed_status_id) DESC, m.id'
+                "    ) AS position"
+                "    FROM mission m"
+                "    WHERE m.mission_type = :mission_type_id"
+                "      AND m.status IN (:pending_status_id, :completed_status_id)"
+                "      AND m.created_at >= :start_date AND m.created_at <= :end_date"
+                "      AND " + _ACTIVE_USERS_FILTER +
+                "  ) ranked WHERE ranked.position > 1 AND ranked.status = :pending_status_id"
+                ")"
+            ),
+            {
+                "expired_status_id": expired_status_id,
+                "completed_status_id": completed_status_id,
+                "pending_status_id": pending_status_id,
+                "mission_type_id": mission_type_id,
+                "user_status_id": user_status_id,
+                "start_date": start_date,
+                "end_date": end_date,
+            },
+        )
+        return result.rowcount
+
 class MissionSchema(MissionSchemaBase):
     """
     Schema for SpreadType.
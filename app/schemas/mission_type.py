@@ -9,6 +9,7 @@ from app.models.mission_type import MissionTypeModel  # Import here to avoid cir
 from app.schemas.recurrence_mode import RecurrenceMode
 from app.schemas.recurrence_type import RecurrenceType
 from sqlalchemy import or_
+from app.services.catalog import mission_catalog
 
 class MissionTypeSchemaBase(BaseModel):
 
@@ -82,6 +83,7 @@ class MissionTypeSchemaBase(BaseModel):
             if mission_type:
                 mission_type.status = status_id
                 await db.commit()
+                mission_catalog.invalidate()
                 return True
             return False
         except Exception as e:
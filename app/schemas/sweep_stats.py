@@ -0,0 +1,45 @@
+from datetime import datetime
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sweep_stats import SweepStatsModel
+
+
+class SweepStatsSchemaBase(BaseModel):
+    model_config = {
+        "from_attributes": True,
+        "arbitrary_types_allowed": True,
+    }
+
+    @staticmethod
+    async def upsert(session: AsyncSession, name: str, stats: dict) -> None:
+        """
+        Grava (ou substitui) a telemetria da varredura `name`.
+        """
+        now = datetime.now()
+        stmt = insert(SweepStatsModel).values(name=name, stats=stats, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SweepStatsModel.name],
+            set_={"stats": stats, "updated_at": now},
+        )
+        try:
+            await session.execute(stmt)
+            await session.commit()
+        except Exception as e:
+            print(f"Erro ao gravar a telemetria da varredura {name}: {e}")
+            await session.rollback()
+
+    @staticmethod
+    async def get_all(session: AsyncSession) -> dict[str, dict]:
+        """
+        Telemetria gravada de todas as varreduras, com a data da última gravação.
+        """
+        result = await session.execute(
+            select(SweepStatsModel.name, SweepStatsModel.stats, SweepStatsModel.updated_at)
+        )
+        return {
+            name: {**stats, "updated_at": updated_at.isoformat()}
+            for name, stats, updated_at in result.all()
+        }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from sqlalchemy import func
+from sqlalchemy import func, insert
 from app.models.spread_types import SpreadTypeModel  # Import the SpreadTypeModel
 from sqlalchemy import select  # Import the select function
 from sqlalchemy.ext.asyncio import AsyncSession  # Import AsyncSession
@@ -60,6 +60,48 @@ class TransactionSchemaBase(BaseModel):
         except Exception as e:
             print(f"Error deleting old daily transactions for user {user_id}: {e}")
 
+    @staticmethod
+    async def get_last_daily_draws_by_user_ids(
+        session: AsyncSession, user_ids: list[int]
+    ) -> dict[int, list[int]]:
+        """
+        Return {user_id: draws} of the most recent DAILY_LOGIN transaction of each user, in one query.
+        """
+        if not user_ids:
+            return {}
+        stmt = (
+            select(TransactionModel.user_id, TransactionModel.draws)
+            .where(TransactionModel.user_id.in_(user_ids))
+            .where(TransactionModel.transaction_type == TransactionType.DAILY_LOGIN)
+            .order_by(TransactionModel.user_id, TransactionModel.created_at.desc())
+            .distinct(TransactionModel.user_id)
+        )
+        result = await session.execute(stmt)
+        return {user_id: draws or [] for user_id, draws in result.all()}
+
+    @staticmethod
+    async def bulk_create_daily_transactions(
+        session: AsyncSession, draws_by_user: dict[int, list[int]], status_id: int
+    ) -> None:
+        """
+        Insert one DAILY_LOGIN transaction per user in a single statement (does not commit).
+        """
+        if not draws_by_user:
+            return
+        now = datetime.now()
+        await session.execute(
+            insert(TransactionModel).values([
+                {
+                    "user_id": user_id,
+                    "draws": draws,
+                    "transaction_type": TransactionType.DAILY_LOGIN,
+                    "status": status_id,
+                    "created_at": now,
+                }
+                for user_id, draws in draws_by_user.items()
+            ])
+        )
+
     @staticmethod
     async def get_draws_by_transaction_id(
         session: AsyncSession, transaction_id: int
@@ -133,6 +175,35 @@ class TransactionSchemaBase(BaseModel):
         except Exception as e:
             print(f"Error checking for existing reward transaction: {e}")
             return False
+
+    @staticmethod
+    async def get_reward_dates_by_user(
+        session: AsyncSession,
+        user_id: int,
+        status_id: int,
+        event_ids: list[int],
+    ) -> dict[int, list[datetime]]:
+        """
+        Datas das transações de prêmio (REWARD) do usuário, agrupadas por evento, em uma
+        única consulta. Substitui um check_reward_transaction_exists por evento.
+        """
+        if not event_ids:
+            return {}
+        try:
+            stmt = select(TransactionModel.event, TransactionModel.created_at).where(
+                TransactionModel.user_id == user_id,
+                TransactionModel.status == status_id,
+                TransactionModel.transaction_type == TransactionType.REWARD.value,
+                TransactionModel.event.in_(event_ids),
+            )
+            result = await session.execute(stmt)
+            rewards: dict[int, list[datetime]] = {}
+            for event_id, created_at in result.all():
+                rewards.setdefault(event_id, []).append(created_at)
+            return rewards
+        except Exception as e:
+            print(f"Error fetching reward transactions: {e}")
+            return {}
         
     @staticmethod
     async def create_transaction(
@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, Field, ValidationError
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import or_, text
 
 # Removed the top-level import of UserModel to avoid circular import issues
 from app.core.security import pwd_context
@@ -198,12 +199,28 @@ class UserSchemaBase(BaseModel):
         return {"message": "Tipo de usuário atualizado com sucesso"}
     
     
+    @staticmethod
+    async def has_birth_info(db: AsyncSession, user_id: int) -> bool:
+        """
+        Indica se o usuário tem birth_date, birth_time e birth_place preenchidos
+        (mesmo critério de get_all_id_by_status com require_birth_info=True).
+        """
+        query = select(UserModel.id).where(
+            UserModel.id == user_id,
+            UserModel.birth_date.isnot(None),
+            UserModel.birth_time.isnot(None),
+            UserModel.birth_place.isnot(None),
+        )
+        result = await db.execute(query)
+        return result.scalar_one_or_none() is not None
+
     @staticmethod
     async def get_all_id_by_status(
         db: AsyncSession,
         status_id: int | list[int] = None,
         user_type: int | list[int] = None,
         require_birth_info: bool = False,
+        active_since: datetime | None = None,
     ) -> list[int]:
         """
         Obtém todos os IDs de usuários com status e/ou tipo de usuário fornecidos.
@@ -211,6 +228,7 @@ class UserSchemaBase(BaseModel):
         Se apenas um for fornecido, retorna usuários que satisfaçam esse critério.
         Se nenhum for fornecido, retorna lista vazia.
         Se require_birth_info=True, retorna apenas usuários que possuem birth_date, birth_time e birth_place preenchidos.
+        Se active_since for informado, retorna apenas usuários ativos (ou criados) a partir dessa data.
         """
         query = select(UserModel.id)
         filters = []
@@ -232,6 +250,9 @@ class UserSchemaBase(BaseModel):
             filters.append(UserModel.birth_time.isnot(None))
             filters.append(UserModel.birth_place.isnot(None))
 
+        if active_since is not None:
+            filters.append(or_(UserModel.last_active_at >= active_since, UserModel.created_at >= active_since))
+
         if not filters:
             return []
 
@@ -245,6 +266,26 @@ class UserSchemaBase(BaseModel):
 
         return user_ids
         
+    @staticmethod
+    async def bulk_update_last_active(db: AsyncSession, last_seen: dict[int, datetime]) -> None:
+        """
+        Atualiza last_active_at de vários usuários em um único UPDATE (nunca volta no tempo).
+        """
+        if not last_seen:
+            return
+        user_ids = list(last_seen)
+        await db.execute(
+            text("""
+                UPDATE users
+                SET last_active_at = seen.at
+                FROM unnest(CAST(:user_ids AS INTEGER[]), CAST(:seen_at AS TIMESTAMP[])) AS seen(id, at)
+                WHERE users.id = seen.id
+                AND (users.last_active_at IS NULL OR users.last_active_at < seen.at)
+            """),
+            {"user_ids": user_ids, "seen_at": [last_seen[user_id] for user_id in user_ids]},
+        )
+        await db.commit()
+
     @staticmethod
     async def get_user_name_by_id(db: AsyncSession, id: int) -> str:
         """
@@ -280,6 +321,18 @@ class UserSchemaBase(BaseModel):
         return user_type
 
 
+    @staticmethod
+    async def get_user_types_by_ids(db: AsyncSession, ids: list[int]) -> dict[int, int]:
+        """
+        Obtém o tipo de usuário de vários usuários em uma única consulta.
+        Retorna um dicionário {user_id: user_type_id}.
+        """
+        if not ids:
+            return {}
+        query = select(UserModel.id, UserModel.user_type).where(UserModel.id.in_(ids))
+        result = await db.execute(query)
+        return {user_id: user_type for user_id, user_type in result.all()}
+
     @staticmethod
     # verificar se o usuario existe
     async def user_exists(db: AsyncSession, id: int) -> bool:
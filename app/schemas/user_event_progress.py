@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Iterable
+
+from pydantic import BaseModel
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user_event_progress import UserEventProgressModel
+
+
+class UserEventProgressSchemaBase(BaseModel):
+    """
+    Leitura do modelo user_event_progress (missões pendentes e concluídas de cada usuário).
+    A tabela é mantida por triggers na tabela mission; aqui só há consultas e o reparo manual
+    (rebuild, usado por python -m app.commands.rebuild_user_event_progress).
+    """
+
+    class Config:
+        orm_mode = True
+        arbitrary_types_allowed = True
+
+    @staticmethod
+    async def get_by_user(
+        session: AsyncSession,
+        user_id: int,
+        mission_type_ids: Iterable[int] | None = None,
+    ) -> dict[int, list[dict]]:
+        """
+        Missões pendentes/concluídas do usuário em uma única consulta (índice user_id, mission_type),
+        agrupadas por tipo de missão e ordenadas por created_at.
+        Cada item tem mission_id, status, created_at e used_at.
+        """
+        try:
+            stmt = select(
+                UserEventProgressModel.mission_id,
+                UserEventProgressModel.mission_type,
+                UserEventProgressModel.status,
+                UserEventProgressModel.created_at,
+                UserEventProgressModel.used_at,
+            ).where(UserEventProgressModel.user_id == user_id)
+            if mission_type_ids is not None:
+                stmt = stmt.where(UserEventProgressModel.mission_type.in_(list(mission_type_ids)))
+            stmt = stmt.order_by(UserEventProgressModel.created_at, UserEventProgressModel.mission_id)
+
+            result = await session.execute(stmt)
+            progress: dict[int, list[dict]] = {}
+            for row in result.mappings().all():
+                progress.setdefault(row["mission_type"], []).append(dict(row))
+            return progress
+        except Exception as e:
+            print(f"Erro ao buscar o progresso do usuário {user_id}: {e}")
+            return {}
+
+    @staticmethod
+    async def rebuild(session: AsyncSession) -> tuple[int, int]:
+        """
+        Reconcilia o modelo de leitura com a tabela mission (idempotente): insere as missões
+        pendentes/concluídas que faltam, corrige as linhas divergentes e remove as que não valem mais.
+        Percorre toda a tabela mission; não roda na inicialização. Retorna (inseridas/corrigidas, removidas).
+        """
+        try:
+            upserted = await session.execute(text("""
+                INSERT INTO user_event_progress (mission_id, user_id, mission_type, status, created_at, used_at)
+                SELECT m.id, m."user", m.mission_type, m.status, m.created_at, m.used_at
+                FROM mission m
+                JOIN status s ON s.id = m.status
+                WHERE s.name IN ('pending_confirmation', 'completed')
+                ON CONFLICT (mission_id) DO UPDATE SET
+                    user_id = EXCLUDED.user_id,
+                    mission_type = EXCLUDED.mission_type,
+                    status = EXCLUDED.status,
+                    created_at = EXCLUDED.created_at,
+                    used_at = EXCLUDED.used_at
+                WHERE (user_event_progress.user_id, user_event_progress.mission_type, user_event_progress.status,
+                       user_event_progress.created_at, user_event_progress.used_at)
+                    IS DISTINCT FROM
+                      (EXCLUDED.user_id, EXCLUDED.mission_type, EXCLUDED.status, EXCLUDED.created_at, EXCLUDED.used_at)
+            """))
+            deleted = await session.execute(text("""
+                DELETE FROM user_event_progress p
+                WHERE NOT EXISTS (
+                    SELECT 1
+                    FROM mission m
+                    JOIN status s ON s.id = m.status
+                    WHERE m.id = p.mission_id AND s.name IN ('pending_confirmation', 'completed')
+                )
+            """))
+            await session.commit()
+            return upserted.rowcount or 0, deleted.rowcount or 0
+        except Exception as e:
+            print(f"Erro ao reconstruir user_event_progress: {e}")
+            await session.rollback()
+            raise
+
+    @staticmethod
+    def in_period(
+        missions: list[dict],
+        status_ids: Iterable[int],
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> list[dict]:
+        """
+        Mesmo filtro de MissionSchemaBase.get_list_id_by_user_and_types_and_period_and_status,
+        aplicado em memória: status em `status_ids` e created_at entre as datas (opcionais).
+        """
+        statuses = set(status_ids)
+        start_date = start_date.replace(tzinfo=None) if start_date and start_date.tzinfo else start_date
+        end_date = end_date.replace(tzinfo=None) if end_date and end_date.tzinfo else end_date
+        return [
+            mission for mission in missions
+            if mission["status"] in statuses
+            and (start_date is None or mission["created_at"] >= start_date)
+            and (end_date is None or mission["created_at"] <= end_date)
+        ]
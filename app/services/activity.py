@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.core.configs import settings
+from app.core.postgresdatabase import Session
+from app.schemas.user import UserSchemaBase
+
+
+class ActivityTracker:
+    """
+    Registra a última atividade de cada usuário sem escrever no banco a cada requisição:
+    `touch` só guarda o horário em memória e `run` grava tudo em um UPDATE a cada `flush_seconds`.
+    O last_active_at define quem recebe o conteúdo diário pré-gerado à noite.
+    """
+
+    def __init__(self, flush_seconds: float = 60.0):
+        self.flush_seconds = flush_seconds
+        self._pending: dict[int, datetime] = {}
+        self._stopped = False
+
+    def touch(self, user_id: int | None):
+        if user_id is not None:
+            self._pending[user_id] = datetime.now()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            async with Session() as db:
+                await UserSchemaBase.bulk_update_last_active(db, pending)
+        except Exception as e:
+            print(f"Erro ao gravar atividade de {len(pending)} usuários: {e}")
+            # devolve para a próxima tentativa sem sobrescrever acessos mais novos
+            for user_id, seen_at in pending.items():
+                self._pending.setdefault(user_id, seen_at)
+
+    async def run(self):
+        while not self._stopped:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def stop(self):
+        self._stopped = True
+        await self.flush()
+
+
+def precompute_active_since() -> datetime | None:
+    """
+    Início da janela de atividade usada pelos jobs noturnos de conteúdo diário (None = todos os usuários).
+    """
+    if settings.DAILY_PRECOMPUTE_ACTIVE_DAYS <= 0:
+        return None
+    return datetime.now() - timedelta(days=settings.DAILY_PRECOMPUTE_ACTIVE_DAYS)
+
+
+# Instância global
+activity_tracker = ActivityTracker(flush_seconds=settings.ACTIVITY_FLUSH_SECONDS)
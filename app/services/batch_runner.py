@@ -0,0 +1,151 @@
+import asyncio
+import time
+from datetime import date
+from typing import Awaitable, Callable, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.configs import settings
+from app.core.postgresdatabase import Session
+from app.schemas.job_ledger import JobLedgerSchemaBase
+from app.services.metrics import metrics
+
+
+class BatchRunner:
+    """
+    Executa um handler `async (db, item)` para cada item com `concurrency` workers.
+    Cada worker usa a sua própria AsyncSession (uma sessão nunca é compartilhada entre tarefas),
+    cada item tem até `max_attempts` tentativas com backoff exponencial e o progresso
+    (itens processados, vazão e estimativa de término) é impresso a cada `progress_seconds`.
+
+    Com `ledger=True` a execução é registrada em job_runs/job_items por (name, data):
+    uma execução interrompida retoma apenas os itens que ainda não foram concluídos
+    e uma execução já concluída no dia não é repetida.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int | None = None,
+        max_attempts: int | None = None,
+        retry_delay: float = 2,
+        backoff: float = 2,
+        progress_seconds: float | None = None,
+        ledger: bool = False,
+    ):
+        self.name = name
+        self.ledger = ledger
+        self.concurrency = max(1, concurrency or settings.BATCH_RUNNER_CONCURRENCY)
+        self.max_attempts = max(1, max_attempts or settings.BATCH_RUNNER_MAX_ATTEMPTS)
+        self.retry_delay = retry_delay
+        self.backoff = backoff
+        self.progress_seconds = progress_seconds or settings.BATCH_RUNNER_PROGRESS_SECONDS
+
+    async def _process(
+        self, db: AsyncSession, item, handler: Callable[[AsyncSession, object], Awaitable]
+    ) -> Exception | None:
+        for attempt in range(self.max_attempts):
+            try:
+                await handler(db, item)
+                return None
+            except Exception as e:
+                # a sessão pode ter ficado em estado inválido; limpa antes de tentar de novo
+                await db.rollback()
+                if attempt == self.max_attempts - 1:
+                    print(f"[{self.name}] All attempts failed for {item}: {e}")
+                    return e
+                wait = self.retry_delay * (self.backoff ** attempt)
+                print(f"[{self.name}] Attempt {attempt+1} failed for {item}: {e}. Retrying in {wait}s...")
+                await asyncio.sleep(wait)
+
+    def _report(self, done: int, total: int, started: float):
+        elapsed = time.monotonic() - started
+        throughput = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / throughput if throughput > 0 else float("inf")
+        print(
+            f"[{self.name}] {done}/{total} items, {throughput:.2f} items/s, "
+            f"elapsed {elapsed:.0f}s, eta {eta:.0f}s"
+        )
+
+    async def run(
+        self,
+        items: Iterable,
+        handler: Callable[[AsyncSession, object], Awaitable],
+        run_date: date | None = None,
+    ) -> dict:
+        items = list(items)
+        run_id = None
+        already_done: set = set()
+        if self.ledger:
+            async with Session() as db:
+                run = await JobLedgerSchemaBase.get_or_create_run(db, self.name, run_date or date.today())
+                if run["status"] == "completed":
+                    print(f"[{self.name}] Run for {run_date or date.today()} already completed, skipping")
+                    return {"processed": 0, "total": len(items), "errors": [], "skipped": True}
+                run_id = run["id"]
+                already_done = await JobLedgerSchemaBase.get_done_item_ids(db, run_id)
+            if already_done:
+                print(f"[{self.name}] Resuming run {run_id}: {len(already_done)} items already done")
+
+        pending = [item for item in items if item not in already_done]
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in pending:
+            queue.put_nowait(item)
+
+        started = time.monotonic()
+        processed = 0
+        errors = []
+
+        async def worker():
+            nonlocal processed
+            async with Session() as db:
+                while True:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    error = await self._process(db, item, handler)
+                    if error is None:
+                        processed += 1
+                    else:
+                        errors.append({"item": item, "error": str(error)})
+                    if run_id is not None:
+                        await JobLedgerSchemaBase.mark_items(
+                            db, run_id, [item], "done" if error is None else "failed",
+                            error=None if error is None else str(error),
+                        )
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(self.progress_seconds)
+                self._report(processed + len(errors), len(pending), started)
+
+        print(f"[{self.name}] Starting {len(pending)} items with {self.concurrency} workers")
+        progress = asyncio.create_task(reporter())
+        try:
+            await asyncio.gather(*[worker() for _ in range(min(self.concurrency, len(pending)))])
+        finally:
+            progress.cancel()
+
+        elapsed = time.monotonic() - started
+        self._report(processed + len(errors), len(pending), started)
+        if run_id is not None:
+            async with Session() as db:
+                await JobLedgerSchemaBase.finish_run(
+                    db, run_id,
+                    status="completed" if not errors else "partial",
+                    total=len(items),
+                    processed=len(already_done) + processed,
+                    failed=len(errors),
+                )
+        metrics.observe(f"batch.{self.name}.seconds", elapsed)
+        metrics.increment(f"batch.{self.name}.processed", processed)
+        metrics.increment(f"batch.{self.name}.errors", len(errors))
+        return {
+            "processed": processed,
+            "resumed": len(already_done),
+            "total": len(items),
+            "errors": errors,
+            "elapsed": round(elapsed, 2),
+            "throughput": round(processed / elapsed, 2) if elapsed > 0 else None,
+        }
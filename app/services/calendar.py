@@ -1,14 +1,11 @@
 from datetime import datetime, timedelta, time
-import asyncio
 from app.core.postgresdatabase import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.status import StatusSchemaBase
 from app.schemas.recurrence_mode import RecurrenceMode
 from app.schemas.recurrence_type import RecurrenceType
-from app.schemas.user import UserSchemaBase
-from app.schemas.mission_type import MissionTypeSchemaBase
 from app.schemas.mission import MissionSchemaBase
-from app.schemas.user_type import UserTypeSchemaBase
+from app.services.catalog import mission_catalog
 
 
 class Calendar:
@@ -80,7 +77,12 @@ class Calendar:
             print(f"Erro em get_current_period: {e}")
             raise
 
-    async def calendar(self):
+    async def calendar(self, mission_type_ids: set[int] | None = None):
+        """
+        Reconcilia as missões de calendário: o período atual é calculado uma vez por tipo de missão
+        e as missões de todos os usuários ativos são renovadas, expiradas e criadas em comandos em conjunto.
+        `mission_type_ids` limita a varredura a esses tipos (usado pelo MissionDeadlineScheduler); None = todos.
+        """
         async with Session() as session:
             db: AsyncSession = session
 
@@ -88,92 +90,44 @@ class Calendar:
             id_pending = await StatusSchemaBase.get_id_by_name(db, "pending_confirmation")
             id_completed = await StatusSchemaBase.get_id_by_name(db, "completed")
             id_expired = await StatusSchemaBase.get_id_by_name(db, "expired")
-            # id_premium = await UserTypeSchemaBase.get_id_by_name(db, "premium")
-
-            all_active_users = await UserSchemaBase.get_all_id_by_status(db, id_active)
-            # print(f"Total de usuários ativos: {(all_active_users)}")
-            all_active_mission_types = await MissionTypeSchemaBase.get_all_id_by_status_and_recurrence_mode(db, id_active, self.id_calendar)
-
-            for user_id in all_active_users:
-                for mission_type_id in all_active_mission_types:
-                    # Dados estáticos por missão
-                    start_date, recurrence_type, reset_time_str, auto_renew = await asyncio.gather(
-                        MissionTypeSchemaBase.get_start_date_by_id(db, mission_type_id),
-                        MissionTypeSchemaBase.get_recurrence_type_by_id(db, mission_type_id),
-                        MissionTypeSchemaBase.get_reset_time_by_id(db, mission_type_id),
-                        MissionTypeSchemaBase.get_auto_renew_by_id(db, mission_type_id)
-                    )
-                    period_start, period_end = self.get_current_period(recurrence_type, start_date, reset_time_str, auto_renew)
-
-                    id_missions = await MissionSchemaBase.get_list_id_by_user_and_types_and_period_and_status(
-                        session=db,
-                        user_id=user_id,
-                        mission_type_id=mission_type_id,
-                        start_date=None,
-                        end_date=period_start,
-                        status_ids=[id_pending]
-                    )
 
-                    status_mission_type = await MissionTypeSchemaBase.get_status_by_id(db, mission_type_id)
+            catalog = await mission_catalog.get(db)
+            mission_types = catalog.mission_types_by(id_active, self.id_calendar)
+            if mission_type_ids is not None:
+                mission_types = [entry for entry in mission_types if entry.id in mission_type_ids]
+
+            rows = 0
+            for mission_type in mission_types:
+                type_rows = 0
+                try:
+                    period_start, period_end = self.get_current_period(
+                        mission_type.recurrence_type, mission_type.start_date, mission_type.reset_time, mission_type.auto_renew
+                    )
+                    event_active = catalog.has_active_event_for_mission(mission_type.id, id_active)
 
-                    for mission_id in id_missions:
-                        created_at, status_instance = await asyncio.gather(
-                            MissionSchemaBase.get_created_at_by_id(db, mission_id),
-                            MissionSchemaBase.get_status_by_mission_id(db, mission_id)
+                    # Missões pendentes de períodos anteriores: renovadas (auto_renew) ou expiradas
+                    if mission_type.auto_renew:
+                        type_rows += await MissionSchemaBase.bulk_renew_missions(
+                            db, mission_type.id, id_active, id_pending, period_start
                         )
-
-                        # Lógica ajustada para expirar missões e instâncias pendentes
-                        if created_at is None or not (period_start <= created_at < period_end) or status_mission_type == id_expired:
-                            if status_mission_type == id_expired:
-                                # Se a missão estiver expirada, todas as instâncias pendentes devem ser expiradas
-                                if status_instance == id_pending:
-                                    await MissionSchemaBase.update_mission_status(db, mission_id, id_expired)
-
-                            elif auto_renew:
-                                if status_instance == id_pending:
-                                    await MissionSchemaBase.modified_created_at(db, mission_id, period_start)
-                                elif status_instance == id_completed:
-                                    exists_next = await MissionSchemaBase.get_id_by_user_and_types_and_period_and_status(
-                                        session=db,
-                                        user_id=user_id,
-                                        mission_type_id=mission_type_id,
-                                        start_date=period_end,
-                                        end_date=None,
-                                        status_ids=[id_pending, id_completed]
-                                    )
-                                    if not exists_next:
-                                        await MissionSchemaBase.create_mission(db, mission_type_id, user_id)
-                            else:
-                                if status_instance == id_pending:
-                                    await MissionSchemaBase.update_mission_status(db, mission_id, id_expired)
-
-                    # Só verifica missões no período atual se o tipo de missão estiver ativo
-                    if status_mission_type == id_active:
-                        id_current = await MissionSchemaBase.get_list_id_by_user_and_types_and_period_and_status(
-                            session=db,
-                            user_id=user_id,
-                            mission_type_id=mission_type_id,
-                            start_date=period_start,
-                            end_date=period_end,
-                            status_ids=[id_pending, id_completed]
+                    else:
+                        type_rows += await MissionSchemaBase.bulk_expire_missions(
+                            db, mission_type.id, id_active, [id_pending], id_expired, created_before=period_start
                         )
 
-                        if not id_current:
-                            await MissionSchemaBase.create_mission(db, mission_type_id, user_id)
-
-                        elif len(id_current) > 1:
-                            # Otimiza as chamadas agrupando os resultados
-                            status_map = {
-                                mission_id: await MissionSchemaBase.get_status_by_mission_id(db, mission_id)
-                                for mission_id in id_current
-                            }
-
-                            completed = [m for m, s in status_map.items() if s == id_completed]
-                            pending = [m for m, s in status_map.items() if s == id_pending]
-
-                            if completed:
-                                for m in pending:
-                                    await MissionSchemaBase.update_mission_status(db, m, id_expired)
-                            elif len(pending) > 1:
-                                for m in pending[1:]:
-                                    await MissionSchemaBase.update_mission_status(db, m, id_expired)
+                    # Uma missão por usuário no período atual
+                    if event_active:
+                        type_rows += await MissionSchemaBase.bulk_create_missing_missions(
+                            db, mission_type.id, id_active, id_pending, [id_pending, id_completed],
+                            start_date=period_start, end_date=period_end,
+                        )
+                    type_rows += await MissionSchemaBase.bulk_expire_duplicate_missions(
+                        db, mission_type.id, id_active, id_pending, id_completed, id_expired,
+                        period_start, period_end,
+                    )
+                    await db.commit()
+                    rows += type_rows
+                except Exception as e:
+                    await db.rollback()
+                    print(f"Erro ao reconciliar missões de calendário do tipo {mission_type.id}: {e}")
+            return rows
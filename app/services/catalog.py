@@ -0,0 +1,179 @@
+import asyncio
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.configs import settings
+from app.models.event import EventModel
+from app.models.mission_type import MissionTypeModel
+
+
+class _Frozen:
+    """Base imutável e compacta (sem __dict__) das entradas do catálogo."""
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} é imutável")
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+
+class MissionTypeEntry(_Frozen):
+    __slots__ = (
+        "id", "name", "description", "status", "recurrence_type", "recurrence_mode",
+        "reset_time", "expiration_date", "relative_days", "auto_renew", "start_date",
+    )
+
+
+class EventEntry(_Frozen):
+    __slots__ = (
+        "id", "name", "description", "missions", "status", "start_date", "expired_date",
+        "gift", "user_type", "recurrence_type", "recurrence_mode", "auto_renew", "reset_time",
+    )
+
+    def expiration(self) -> datetime | None:
+        """Data de expiração com o horário de reset_time aplicado (mesma regra dos agendadores)."""
+        if self.expired_date and self.reset_time:
+            return self.expired_date.replace(
+                hour=self.reset_time.hour,
+                minute=self.reset_time.minute,
+                second=self.reset_time.second,
+                microsecond=self.reset_time.microsecond,
+            )
+        return self.expired_date
+
+
+class CatalogSnapshot(_Frozen):
+    """
+    Fotografia imutável dos tipos de missão e eventos. Substitui os get_*_by_id de
+    MissionTypeSchemaBase/EventSchemaBase (um SELECT por campo) por buscas em dicionário.
+    """
+    __slots__ = ("version", "loaded_at", "mission_types", "events", "events_by_mission")
+
+    def mission_type(self, mission_type_id: int) -> MissionTypeEntry | None:
+        return self.mission_types.get(mission_type_id)
+
+    def event(self, event_id: int) -> EventEntry | None:
+        return self.events.get(event_id)
+
+    def mission_types_by(
+        self, status_ids: int | Iterable[int], recurrence_modes: int | Iterable[int]
+    ) -> list[MissionTypeEntry]:
+        """Tipos de missão com um dos status e um dos modos de recorrência informados."""
+        statuses = {status_ids} if isinstance(status_ids, int) else set(status_ids)
+        modes = {recurrence_modes} if isinstance(recurrence_modes, int) else set(recurrence_modes)
+        return [
+            entry for entry in self.mission_types.values()
+            if entry.status in statuses and entry.recurrence_mode in modes
+        ]
+
+    def events_by(self, status_ids: Iterable[int], user_type: int | None = None) -> list[EventEntry]:
+        """
+        Eventos com um dos status; com user_type, só os liberados para esse tipo de usuário
+        (user_type vazio no evento = todos), como get_all_active_events_by_user_type_and_status.
+        """
+        statuses = set(status_ids)
+        return [
+            entry for entry in self.events.values()
+            if entry.status in statuses
+            and (user_type is None or not entry.user_type or user_type in entry.user_type)
+        ]
+
+    def has_active_event_for_mission(
+        self, mission_type_id: int, active_status_id: int, now: datetime | None = None
+    ) -> bool:
+        """
+        Mesma regra de EventSchemaBase.has_active_event_for_mission: True quando a missão não
+        pertence a nenhum evento ou quando algum evento ativo (e não expirado) a contém.
+        """
+        events = self.events_by_mission.get(mission_type_id, ())
+        if not events:
+            return True
+        now = now or datetime.now()
+        for event in events:
+            expiration = event.expiration()
+            if expiration and now >= expiration:
+                continue
+            if event.status == active_status_id:
+                return True
+        return False
+
+
+class CatalogService:
+    """
+    Mantém o CatalogSnapshot do processo. A fotografia é recarregada (uma consulta por tabela) quando:
+    - `invalidate()` incrementa a versão (chamado após qualquer atualização de status);
+    - passam `ttl_seconds` desde a carga, para enxergar mudanças feitas por outro processo (API x worker).
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self.version += 1
+
+    def _is_fresh(self, snapshot: CatalogSnapshot | None) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and time.monotonic() - snapshot.loaded_at < self.ttl_seconds
+        )
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            if not self._is_fresh(self._snapshot):
+                self._snapshot = await self._load(db, self.version)
+            return self._snapshot
+
+    @staticmethod
+    async def _load(db: AsyncSession, version: int) -> CatalogSnapshot:
+        # colunas em vez de entidades: nada entra no identity map da sessão de quem chamou
+        mission_rows = (await db.execute(select(*MissionTypeModel.__table__.c))).mappings().all()
+        event_rows = (await db.execute(select(*EventModel.__table__.c))).mappings().all()
+
+        mission_types = {
+            row["id"]: MissionTypeEntry(**{name: row[name] for name in MissionTypeEntry.__slots__})
+            for row in mission_rows
+        }
+        events = {}
+        events_by_mission: dict[int, list[EventEntry]] = {}
+        for row in event_rows:
+            values = {name: row[name] for name in EventEntry.__slots__}
+            for name in ("missions", "gift", "user_type"):
+                values[name] = tuple(values[name] or ())
+            entry = EventEntry(**values)
+            events[entry.id] = entry
+            for mission_type_id in entry.missions:
+                events_by_mission.setdefault(mission_type_id, []).append(entry)
+
+        return CatalogSnapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            mission_types=MappingProxyType(mission_types),
+            events=MappingProxyType(events),
+            events_by_mission=MappingProxyType(
+                {mission_type_id: tuple(entries) for mission_type_id, entries in events_by_mission.items()}
+            ),
+        )
+
+
+# Instância global
+mission_catalog = CatalogService(ttl_seconds=settings.CATALOG_SNAPSHOT_TTL_SECONDS)
@@ -1,7 +1,7 @@
 from app.schemas.mission import MissionSchemaBase
 from app.schemas.recurrence_mode import RecurrenceMode
 from app.schemas.status import StatusSchemaBase
-from app.schemas.mission_type import MissionTypeSchemaBase
+from app.services.catalog import mission_catalog
 from datetime import datetime
 from app.services.calendar import Calendar
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -36,25 +36,19 @@ class ConfirmMissionService:
                 *(StatusSchemaBase.get_id_by_name(db, name) for name in status_names)
             )
 
-            print(f"Getting recurrence_mode for mission_type_id: {mission_type_id}")
-            recurrence_mode = await MissionTypeSchemaBase.get_recurrence_mode_by_id(db, mission_type_id)
-            print(f"recurrence_mode: {recurrence_mode}")
-
-            print(f"Getting start_date for mission_type_id: {mission_type_id}")
-            start_date = await MissionTypeSchemaBase.get_start_date_by_id(db, mission_type_id)
-            print(f"start_date: {start_date}")
-
-            print(f"Getting reset_time_str for mission_type_id: {mission_type_id}")
-            reset_time_str = await MissionTypeSchemaBase.get_reset_time_by_id(db, mission_type_id)
-            print(f"reset_time_str: {reset_time_str}")
-
-            print(f"Getting auto_renew for mission_type_id: {mission_type_id}")
-            auto_renew = await MissionTypeSchemaBase.get_auto_renew_by_id(db, mission_type_id)
-            print(f"auto_renew: {auto_renew}")
+            # dados estáticos do tipo de missão vêm do catálogo em memória
+            catalog = await mission_catalog.get(db)
+            mission_type = catalog.mission_type(mission_type_id)
+            if mission_type is None:
+                print(f"Mission type {mission_type_id} not found")
+                return False
 
-            print(f"Getting recurrence_type for mission_type_id: {mission_type_id}")
-            recurrence_type = await MissionTypeSchemaBase.get_recurrence_type_by_id(db, mission_type_id)
-            print(f"recurrence_type: {recurrence_type}")
+            recurrence_mode = mission_type.recurrence_mode
+            start_date = mission_type.start_date
+            reset_time_str = mission_type.reset_time
+            auto_renew = mission_type.auto_renew
+            recurrence_type = mission_type.recurrence_type
+            print(f"Mission type {mission_type_id}: recurrence_mode={recurrence_mode}, recurrence_type={recurrence_type}, start_date={start_date}, reset_time={reset_time_str}, auto_renew={auto_renew}")
 
             if recurrence_mode == self.id_calendar:
                 print(f"Recurrence mode: {recurrence_mode}, Start date: {start_date}")
@@ -67,7 +61,7 @@ class ConfirmMissionService:
                 print(f"Recurrence mode: {recurrence_mode}, Start date: {start_date}, End date: {end_date}")
             elif recurrence_mode == self.id_expired_date:
                 print(f"Recurrence mode: {recurrence_mode}, Start date: {start_date}, to aqui 1")
-                end_date = await MissionTypeSchemaBase.get_expired_date_by_id(db, mission_type_id)
+                end_date = mission_type.expiration_date
                 if not end_date:
                     end_date = now.replace(hour=23, minute=59, second=59, microsecond=999999)
                 if end_date and reset_time_str:
@@ -98,7 +92,7 @@ class ConfirmMissionService:
 
             await MissionSchemaBase.update_mission_status(db, mission_id, id_completed)
 
-            mission_type_name = await MissionTypeSchemaBase.get_name_by_id(db, mission_type_id)
+            mission_type_name = mission_type.name
             message = f" Missão {mission_type_name} concluida com sucesso!"
             notification = await NotificationSchema.create_notification(db, user_id, message)
             await ws_manager.send_notification(str(user_id), message, notification.id)
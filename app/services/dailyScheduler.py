@@ -4,33 +4,49 @@ import asyncio
 import datetime
 from typing import Callable, Awaitable, Optional
 
+from app.services.leader_election import scheduler_leader, try_advisory_lock
+
 class DailyScheduler:
     def __init__(
         self,
         scheduled_time: datetime.time,
         functions: list[Callable[[], Awaitable[None]]],
+        catch_up: bool = True,
     ):
         """
         Agendador que executa funções assíncronas diariamente em um horário específico.
         :param scheduled_time: Horário para execução (hh:mm)
         :param functions: Lista de funções async a serem executadas
+        :param catch_up: Se o processo iniciar (ou virar líder) depois do horário, executa uma vez no dia.
+            As funções consultam o job ledger, então uma execução já concluída no dia não é
+            repetida e uma interrompida é retomada.
+        Só o processo líder (scheduler_leader) executa as funções.
         """
         self.scheduled_time = scheduled_time
         self.functions = functions
+        self.catch_up = catch_up
         self.last_execution_date: Optional[datetime.date] = None
 
-    async def _run_functions(self):
-        for func in self.functions:
-            await func()
+    async def _run_functions(self) -> bool:
+        # o lock por horário impede duas execuções simultâneas durante uma troca de líder
+        async with try_advisory_lock(f"tarot:daily:{self.scheduled_time.strftime('%H:%M')}") as acquired:
+            if not acquired:
+                print(f"⏭️ Execução das {self.scheduled_time.strftime('%H:%M')} já está rodando em outro processo")
+                return False
+            for func in self.functions:
+                await func()
+        return True
 
     async def start(self):
         print(f"🕒 Scheduler started for {self.scheduled_time.strftime('%H:%M')}")
         while True:
             now = datetime.datetime.now()
-            if (now.hour, now.minute) == (self.scheduled_time.hour, self.scheduled_time.minute):
-                if self.last_execution_date != now.date():
-                    print(f"🚀 Executando funções agendadas para {self.scheduled_time.strftime('%H:%M')}")
-                    await self._run_functions()
+            due = (now.hour, now.minute) == (self.scheduled_time.hour, self.scheduled_time.minute)
+            # catch_up: o processo iniciou (ou virou líder) depois do horário e ainda não executou hoje
+            due = due or (self.catch_up and now.time() > self.scheduled_time)
+            if due and self.last_execution_date != now.date() and scheduler_leader.is_leader:
+                print(f"🚀 Executando funções agendadas para {self.scheduled_time.strftime('%H:%M')}")
+                if await self._run_functions():
                     self.last_execution_date = now.date()
             await asyncio.sleep(30)
             
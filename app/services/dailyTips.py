@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.postgresdatabase import Session
 from app.schemas.status import StatusSchemaBase
@@ -6,7 +6,12 @@ from app.schemas.user_type import UserTypeSchemaBase, UserTypeSchema
 from app.schemas.user import UserSchemaBase
 from app.schemas.daily_tips import DailyTipsSchemaBase
 from app.services.openai import OpenAIService
+from app.services.activity import precompute_active_since
+from app.services.llm_governor import LLMLane
 from app.services.extract import JsonExtractor
+from app.services.single_flight import SingleFlight
+from app.services.batch_runner import BatchRunner
+from app.core.configs import settings
 from app.prompts.daily_tips import build_daily_tips_prompt, build_daily_tips_role
 import asyncio
 
@@ -18,13 +23,65 @@ class DailyTipsService:
         self.retry_delay = 2  # seconds
         self.backoff = 2  # exponential backoff multiplier
 
+    @staticmethod
+    def _requested_max_tokens(token_amount: int) -> int:
+        # Cap the requested tokens to avoid exceeding model limits and high costs
+        # Use a conservative multiplier for tips (they're shorter than zodiac readings)
+        return min(int(token_amount) * 5, 2000)
+
+    @staticmethod
+    def _seconds_until_midnight() -> int:
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return max(1, int((midnight - now).total_seconds()))
+
+    async def _generate_tips(
+        self,
+        prompt: str,
+        role: str,
+        max_tokens: int,
+        cache_ttl: int | None = None,
+        max_attempts: int | None = None,
+        lane: LLMLane = LLMLane.BATCH,
+        deadline: float | None = None,
+    ) -> str:
+        """
+        Generate one daily tips text, retrying with exponential backoff.
+        `cache_ttl` lets users with the same token budget share one text through the llm_cache.
+        `max_attempts` overrides self.max_retries (1 when the caller already retries, e.g. BatchRunner).
+        """
+        openai_service = OpenAIService()
+        max_attempts = max_attempts or self.max_retries
+        for attempt in range(max_attempts):
+            try:
+                return await openai_service.gerar_texto(
+                    prompt_ajustado=prompt,
+                    role=role,
+                    max_tokens=max_tokens,
+                    temperature=0.8,
+                    lane=lane,
+                    cache_ttl=cache_ttl,
+                    deadline=deadline,
+                )
+            except Exception as e:
+                wait = self.retry_delay * (self.backoff ** attempt)
+                print(f"Attempt {attempt+1} to generate daily tips failed: {e}. Retrying in {wait}s...")
+                if attempt < max_attempts - 1:
+                    await asyncio.sleep(wait)
+                else:
+                    raise
+
     async def create_daily_tips_for_user(
         self,
         db: AsyncSession,
-        user_id: int
+        user_id: int,
+        lane: LLMLane = LLMLane.BATCH,
+        deadline: float | None = None,
     ):
         """
         Create daily tips for a specific user.
+        With a `deadline` (on-demand generation) the text is generated in a single attempt:
+        gerar_texto already retries within the deadline.
         """
         try:
             print(f"Creating daily tips for user {user_id}...")
@@ -35,19 +92,14 @@ class DailyTipsService:
 
             # Get user type and max tokens
             user_type_id = await UserSchemaBase.get_user_type_by_id(db, user_id)
-            max_tokens = int(await UserTypeSchema.get_token_amount_by_id(db, user_type_id))
-
-            # Cap the requested tokens to avoid exceeding model limits and high costs
-            # Use a conservative multiplier for tips (they're shorter than zodiac readings)
-            requested_max_tokens = min(max_tokens * 5, 2000)
-
-            # Generate tips using OpenAI
-            openai_service = OpenAIService()
-            response = await openai_service.gerar_texto(
-                prompt_ajustado=prompt,
-                role=role,
-                max_tokens=requested_max_tokens,
-                temperature=0.8,
+            max_tokens = await UserTypeSchema.get_token_amount_by_id(db, user_type_id)
+            requested_max_tokens = self._requested_max_tokens(max_tokens)
+
+            # Generate tips using OpenAI; the prompt does not depend on the user, so the text
+            # is shared (until midnight) with every user of the same budget
+            response = await self._generate_tips(
+                prompt, role, requested_max_tokens, cache_ttl=self._seconds_until_midnight(),
+                max_attempts=1 if deadline is not None else None, lane=lane, deadline=deadline,
             )
 
             print(f"Response from OpenAI for user {user_id}: {response[:100]}...")
@@ -76,6 +128,12 @@ class DailyTipsService:
     async def create_daily_tips_for_all_users(self):
         """
         Create daily tips for all active users.
+
+        Users are processed by a BatchRunner (concurrency cap, retries, progress and job
+        ledger resume, like zodiac and path). The prompt does not depend on the user, so
+        identical (prompt, role, max_tokens, variant) requests are generated only once per
+        run through a SingleFlight: one completion per user type token budget (times
+        DAILY_TIPS_VARIANTS), shared by every user of that group.
         """
         async with Session() as session:
             db: AsyncSession = session
@@ -93,7 +151,8 @@ class DailyTipsService:
                 db=db, 
                 status_id=id_active, 
                 user_type=[id_standard, id_premium, id_admin],
-                require_birth_info=False  # Daily tips don't require birth info
+                require_birth_info=False,  # Daily tips don't require birth info
+                active_since=precompute_active_since(),  # inactive users get theirs on first read
             )
 
             if not active_users:
@@ -101,42 +160,48 @@ class DailyTipsService:
                 return {"processed": 0, "total": 0, "errors": []}
 
             print(f"Active users: {len(active_users)}")
-            errors = []
-            processed = 0
-
-            for user in active_users:
-                # Retry loop for creating daily tips per user
-                last_exc = None
-                for attempt in range(self.max_retries):
-                    try:
-                        await self.create_daily_tips_for_user(db=db, user_id=user)
-                        processed += 1
-                        last_exc = None
-                        break
-                    except Exception as e:
-                        last_exc = e
-                        wait = self.retry_delay * (self.backoff ** attempt)
-                        print(f"Attempt {attempt+1} failed for user {user}: {e}. Retrying in {wait}s...")
-                        if attempt < self.max_retries - 1:
-                            await asyncio.sleep(wait)
-                        else:
-                            print(f"All attempts failed for user {user}: {e}")
-                            errors.append({"user": user, "error": str(e)})
-
-                # Retry deleting old entries (best-effort, keep only last 7 days)
-                if last_exc is None:  # Only try to delete if creation was successful
-                    for attempt in range(max(1, self.max_retries - 1)):
-                        try:
-                            await DailyTipsSchemaBase.delete_old_entries(session=db, user_id=user, count=7)
-                            break
-                        except Exception as e:
-                            wait = self.retry_delay * (self.backoff ** attempt)
-                            print(f"Attempt {attempt+1} to delete old entries failed for user {user}: {e}. Retrying in {wait}s...")
-                            if attempt < max(1, self.max_retries - 1) - 1:
-                                await asyncio.sleep(wait)
-                            else:
-                                print(f"Delete attempts failed for user {user}: {e}")
-                                errors.append({"user": user, "error_delete": str(e)})
-
-            print(f"Processed {processed} of {len(active_users)} users. Errors: {len(errors)}")
-            return {"processed": processed, "total": len(active_users), "errors": errors}
+
+            # users that already received today's tips (interrupted run) are not inserted twice
+            start_of_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            already_created = await DailyTipsSchemaBase.get_user_ids_with_entry_since(db, active_users, start_of_day)
+            pending_users = [user for user in active_users if user not in already_created]
+
+            # One token budget lookup per user type instead of per user
+            user_types = await UserSchemaBase.get_user_types_by_ids(db, pending_users)
+            budgets = {}
+            for user_type_id in set(user_types.values()):
+                token_amount = await UserTypeSchema.get_token_amount_by_id(db, user_type_id)
+                budgets[user_type_id] = self._requested_max_tokens(token_amount)
+
+        prompt = build_daily_tips_prompt()
+        role = build_daily_tips_role()
+        variants = max(1, settings.DAILY_TIPS_VARIANTS)
+        flight = SingleFlight(keep_results=True)
+        groups = set()
+
+        async def handler(db: AsyncSession, user: int):
+            # users with the same request share one completion (failures are not memoized,
+            # so the runner's next attempt for any user of the group generates again)
+            key = (budgets[user_types[user]], user % variants)
+            groups.add(key)
+            # the first variant is cached until midnight under the same key as the on-demand
+            # path, so users skipped tonight get the night's text; the other variants skip the
+            # cache, otherwise they would all read the first one back
+            cache_ttl = self._seconds_until_midnight() if key[1] == 0 else None
+            reading = await flight.do(
+                key,
+                lambda: self._generate_tips(prompt, role, key[0], cache_ttl=cache_ttl, max_attempts=1),
+            )
+            await DailyTipsSchemaBase.create_daily_tips(db=db, user_id=user, reading=reading, status=id_active)
+
+        runner = BatchRunner(
+            "daily_tips",
+            max_attempts=self.max_retries,
+            retry_delay=self.retry_delay,
+            backoff=self.backoff,
+            ledger=True,
+        )
+        report = await runner.run(pending_users, handler)
+        report["llm_calls"] = len(groups)
+        print(f"Daily tips: {len(groups)} completions for {report['processed']} users. Errors: {len(report['errors'])}")
+        return report
@@ -0,0 +1,96 @@
+import time
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.configs import settings
+from app.core.postgresdatabase import Session
+from app.schemas.daily_path import DailyPathSchemaBase
+from app.schemas.daily_tips import DailyTipsSchemaBase
+from app.schemas.daily_zodiac import DailyZodiacSchemaBase
+from app.schemas.user import UserSchemaBase
+from app.services.daily_path import DailyPathService
+from app.services.dailyTips import DailyTipsService
+from app.services.llm_governor import LLMLane
+from app.services.single_flight import SingleFlight
+from app.services.zodiac import DailyZodiacService
+
+
+class DailyContentService:
+    """
+    Geração sob demanda do conteúdo diário: quando o usuário pede o horóscopo, o caminho
+    ou as dicas e ainda não existe a entrada de hoje (usuário fora da janela de pré-geração
+    noturna), gera na hora. Requisições simultâneas do mesmo usuário compartilham uma única geração.
+
+    A geração roda na fila AUXILIARY (o usuário está esperando) com o prazo DAILY_LAZY_DEADLINE_SECONDS;
+    uma falha fica memorizada por DAILY_LAZY_FAILURE_TTL_SECONDS para não chamar o modelo a cada leitura.
+    Os geradores (create_*_for_user) recebem `lane` e `deadline` e os repassam a gerar_texto; o job
+    noturno usa os padrões (BATCH, sem prazo).
+    """
+
+    def __init__(self):
+        self._flight = SingleFlight()
+        # (kind, user_id) -> time.monotonic() até quando não tentar de novo
+        self._failed_until: dict[tuple[str, int], float] = {}
+        zodiac = DailyZodiacService()
+        daily_path = DailyPathService()
+        daily_tips = DailyTipsService()
+        self._kinds = {
+            "zodiac": (DailyZodiacSchemaBase, zodiac.create_daily_zodiac_for_user),
+            "path": (DailyPathSchemaBase, daily_path.create_daily_path_for_user),
+            "tips": (DailyTipsSchemaBase, daily_tips.create_daily_tips_for_user),
+        }
+
+    @staticmethod
+    def _start_of_day() -> datetime:
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    async def _has_today(self, db: AsyncSession, kind: str, user_id: int) -> bool:
+        schema, _ = self._kinds[kind]
+        return user_id in await schema.get_user_ids_with_entry_since(db, [user_id], self._start_of_day())
+
+    def _recently_failed(self, kind: str, user_id: int) -> bool:
+        until = self._failed_until.get((kind, user_id))
+        if until is None:
+            return False
+        if time.monotonic() < until:
+            return True
+        del self._failed_until[(kind, user_id)]
+        return False
+
+    async def _generate(self, kind: str, user_id: int, deadline: float):
+        _, create_for_user = self._kinds[kind]
+        # sessão própria: a geração é compartilhada por requisições com sessões diferentes
+        async with Session() as db:
+            if await self._has_today(db, kind, user_id):
+                return
+            print(f"Generating {kind} on demand for user {user_id}")
+            await create_for_user(db=db, user_id=user_id, lane=LLMLane.AUXILIARY, deadline=deadline)
+
+    async def ensure_today(self, db: AsyncSession, kind: str, user_id: int) -> None:
+        """
+        Garante a entrada de hoje de `kind` ("zodiac", "path" ou "tips") para o usuário.
+        Falhas são apenas registradas: a rota continua servindo a entrada mais recente.
+        """
+        if not settings.DAILY_LAZY_GENERATION or self._recently_failed(kind, user_id):
+            return
+        if await self._has_today(db, kind, user_id):
+            return
+        # o job noturno só gera horóscopo para quem tem os dados de nascimento
+        if kind == "zodiac" and not await UserSchemaBase.has_birth_info(db, user_id):
+            return
+        deadline = time.monotonic() + settings.DAILY_LAZY_DEADLINE_SECONDS
+        try:
+            await self._flight.do(
+                (kind, user_id, self._start_of_day()), lambda: self._generate(kind, user_id, deadline)
+            )
+        except Exception as e:
+            print(f"Error generating {kind} on demand for user {user_id}: {e}")
+            now = time.monotonic()
+            # descarta as entradas vencidas para o dicionário não crescer indefinidamente
+            self._failed_until = {key: until for key, until in self._failed_until.items() if until > now}
+            self._failed_until[(kind, user_id)] = now + settings.DAILY_LAZY_FAILURE_TTL_SECONDS
+
+
+# Instância global
+daily_content_service = DailyContentService()
@@ -17,7 +17,10 @@ from app.schemas.daily_zodiac import DailyZodiacSchemaBase  # Add this import
 from app.schemas.daily_path import DailyPathSchemaBase  # Add this import
 from app.services.planet import PlanetSignCalculator  # Add this import
 from app.services.openai import OpenAIService
+from app.services.activity import precompute_active_since
+from app.services.llm_governor import LLMLane
 from app.services.extract import JsonExtractor
+from app.services.batch_runner import BatchRunner
 import random
 
 
@@ -26,10 +29,14 @@ class DailyPathService:
     async def create_daily_path_for_user(
         self,
         db: AsyncSession,
-        user_id: int
+        user_id: int,
+        lane: LLMLane = LLMLane.BATCH,
+        deadline: float | None = None,
     ):
         """
         Create a daily path for a specific user.
+        The prompt mixes the birth info with a fresh seed, number and challenge on every call,
+        so the text is never shared through the llm_cache.
         """
         try:
             print(f"Creating daily path for user {user_id}...")
@@ -135,7 +142,9 @@ class DailyPathService:
                 prompt_ajustado=prompt,
                 role=role,
                 max_tokens=max_tokens*10,
-                temperature=0.9
+                temperature=0.9,
+                lane=lane,
+                deadline=deadline,
             )
             # print(f"Response from OpenAI: {response}")  # Debugging line to check the response
             
@@ -155,18 +164,21 @@ class DailyPathService:
             # salvar a leitura do signo (implementação omitida)
 
         except Exception as e:
-            print(f"Error creating daily zodiac for user {user_id}: {e}")
+            print(f"Error creating daily path for user {user_id}: {e}")
+            raise
 
     # Esta função será chamada uma vez por dia
 
     async def create_daily_path_for_all_users(self):
         """
         Create a daily path for all active users.
+        Users are processed concurrently by a BatchRunner (one session per worker);
+        the run is tracked in the job ledger so a restart resumes only the missing users.
         """
         async with Session() as session:
             db: AsyncSession = session
 
-            print("Creating daily zodiacs for all users...")
+            print("Creating daily paths for all users...")
 
             id_active = await StatusSchemaBase.get_id_by_name(db=session, name="active")
             id_standard = await UserTypeSchemaBase.get_id_by_name(session=session, name="STANDARD")
@@ -174,20 +186,21 @@ class DailyPathService:
             id_admin = await UserTypeSchemaBase.get_id_by_name(session=session, name="ADM")
 
             active_users = await UserSchemaBase.get_all_id_by_status(
-                db=db, status_id=id_active, user_type=[id_standard, id_premium, id_admin]
+                db=db, status_id=id_active, user_type=[id_standard, id_premium, id_admin],
+                active_since=precompute_active_since(),
             )
 
             if not active_users:
                 print("No active users found.")
                 return
 
-            print(f"Active users: {active_users}")
-            for user in active_users:
-                # verificar se ele tem informações de nascimento
-                await self.create_daily_path_for_user(
-                    db=db, user_id=user
-                )
-                await DailyPathSchemaBase.delete_old_entries(session=db, user_id=user, count=1)
+            # usuários que já receberam o caminho hoje (execução anterior interrompida) não recebem outro
+            start_of_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            already_created = await DailyPathSchemaBase.get_user_ids_with_entry_since(db, active_users, start_of_day)
+            active_users = [user for user in active_users if user not in already_created]
 
-            
-            # agora por ultimo vamos fazer uma funcão que so mantem os 7 ultimos dias de leitura salvos
+        report = await BatchRunner("daily_path", ledger=True).run(
+            active_users, lambda db, user: self.create_daily_path_for_user(db=db, user_id=user)
+        )
+        print(f"Processed {report['processed']} of {report['total']} users. Errors: {report['errors']}")
+        return report
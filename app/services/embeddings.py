@@ -0,0 +1,70 @@
+import hashlib
+import math
+import re
+import unicodedata
+
+from app.core.configs import settings
+from app.services.llm_governor import LLMLane, llm_governor
+from app.services.openai import OpenAIService
+
+
+class EmbeddingService:
+    """
+    Gera embeddings normalizados (norma 1) para os contextos das tiragens, de forma que
+    o produto escalar entre dois vetores seja a similaridade de cosseno.
+
+    EMBEDDING_BACKEND:
+    - "local": hashing determinístico de palavras e trigramas, sem chamadas externas
+      (mesmo texto => mesmo vetor); permite testar todo o fluxo offline.
+    - "azure": modelo de embeddings do Azure OpenAI (OPENAI_EMBEDDING_MODEL).
+    """
+
+    def __init__(self, backend: str | None = None, dim: int | None = None):
+        self.backend = (backend or settings.EMBEDDING_BACKEND).lower()
+        self.dim = dim or settings.EMBEDDING_DIM
+
+    @staticmethod
+    def _normalize(vector: list[float]) -> list[float]:
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            return vector
+        return [v / norm for v in vector]
+
+    @staticmethod
+    def _tokens(text: str) -> list[str]:
+        text = unicodedata.normalize("NFKD", (text or "").lower())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        return [w for w in re.findall(r"[a-z0-9]+", text) if len(w) > 1]
+
+    @classmethod
+    def local_embedding(cls, text: str, dim: int) -> list[float]:
+        """
+        Embedding determinístico por hashing: cada palavra (peso 1.0) e cada trigrama
+        de caracteres (peso 0.5) soma ±peso em um índice derivado do seu hash.
+        """
+        vector = [0.0] * dim
+        for word in cls._tokens(text):
+            features = [(word, 1.0)]
+            padded = f"#{word}#"
+            features += [(padded[i:i + 3], 0.5) for i in range(len(padded) - 2)]
+            for feature, weight in features:
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "big")
+                sign = 1.0 if value & 1 else -1.0
+                vector[(value >> 1) % dim] += sign * weight
+        return cls._normalize(vector)
+
+    async def embed(self, text: str) -> list[float]:
+        if self.backend == "azure":
+            async with llm_governor.slot(LLMLane.AUXILIARY, len(text or "") // 4 + 1) as report:
+                response = await OpenAIService.get_client().embeddings.create(
+                    model=settings.OPENAI_EMBEDDING_MODEL,
+                    input=text or "",
+                )
+                report(response.usage.total_tokens if response.usage else None)
+            return self._normalize(list(response.data[0].embedding))
+        return self.local_embedding(text, self.dim)
+
+
+# Instância global
+embedding_service = EmbeddingService()
@@ -7,7 +7,7 @@ from app.schemas.status import StatusSchemaBase
 from app.schemas.recurrence_mode import RecurrenceMode
 from app.schemas.event import EventSchemaBase
 from app.schemas.mission import MissionSchemaBase
-from app.schemas.mission_type import MissionTypeSchemaBase
+from app.services.catalog import mission_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -23,23 +23,47 @@ class EventService:
         event_id: int,
         status_ids: list[int],
         id_expired: int
-    ) -> None:
-        """Expira as missões de um evento para os status fornecidos."""
+    ) -> int:
+        """Expira as missões de um evento para os status fornecidos; retorna quantas foram atualizadas."""
+        rows = 0
         try:
-            mission_types = await MissionTypeSchemaBase.get_all_mission_types_by_event_id(db, event_id)
+            catalog = await mission_catalog.get(db)
+            event = catalog.event(event_id)
+            mission_types = event.missions if event else ()
             
             for mission_type_id in mission_types:
-                await MissionSchemaBase.update_missions_status_by_type_and_status(
+                rows += await MissionSchemaBase.update_missions_status_by_type_and_status(
                     db, mission_type_id, status_ids, id_expired
                 )
             
             logger.info(f"Event {event_id}: {len(mission_types)} mission types invalidated with statuses {status_ids}")
+            return rows
         except Exception as e:
             logger.error(f"Error expiring missions for event {event_id}: {e}")
             raise
         
+    @staticmethod
+    def activation_time(event) -> datetime | None:
+        """When a pending event becomes active (start_date at reset_time, or one day after start_date)."""
+        start_date = event.start_date
+        reset_time = event.reset_time
+        if start_date is not None and reset_time:
+            return start_date.replace(
+                hour=reset_time.hour,
+                minute=reset_time.minute,
+                second=reset_time.second,
+                microsecond=reset_time.microsecond
+            )
+        if start_date is not None:
+            return start_date + timedelta(days=1)
+        return None
+
     # Function that will "activate" and "deactivate" events
-    async def update_status_events(self):
+    async def update_status_events(self, event_ids: set[int] | None = None):
+        """
+        Activates pending events and expires active ones.
+        `event_ids` limits the sweep to those events (used by MissionDeadlineScheduler); None = all.
+        """
         async with Session() as session:
             db: AsyncSession = session
 
@@ -51,57 +75,37 @@ class EventService:
                 *(StatusSchemaBase.get_id_by_name(db, name) for name in status_names)
             )
             
-            # Get all pending events
-            all_pending_events = await EventSchemaBase.get_all_active_events_by_user_type_and_status(
-                db, list(range(0, 10)), [id_pending]  # List all user types, pending status
-            )
+            # Get all pending events (from the catalog snapshot)
+            catalog = await mission_catalog.get(db)
+            all_pending_events = catalog.events_by([id_pending])
+            # events activated/expired + missions expired (sweep telemetry)
+            changes = 0
+            if event_ids is not None:
+                all_pending_events = [event for event in all_pending_events if event.id in event_ids]
             
             # For all pending events, check if it's time to activate them
             for event in all_pending_events:
                 # print(f"Checking event {event.id} for activation...")
-                start_date = event.start_date
-                reset_time = event.reset_time
-                
-                if start_date is not None and reset_time:
-                    start_date = (
-                        start_date.replace(
-                            hour=reset_time.hour,
-                            minute=reset_time.minute,
-                            second=reset_time.second,
-                            microsecond=reset_time.microsecond
-                        )
-                    )
-                elif start_date is not None:
-                    start_date = start_date + timedelta(days=1)
-                else:
-                    start_date = None
-                
+                start_date = self.activation_time(event)
+
                 # Check if current date is >= start_date, if so, change event status to active
                 if start_date and now >= start_date:
                     # print(f"Event {event.id} is ready to be activated.")
                     await EventSchemaBase.update_event_status(db, event.id, id_active)
+                    changes += 1
                 
 
             # Now get all active events and check if they are in the expiration period
-            all_active_events = await EventSchemaBase.get_all_active_events_by_user_type_and_status(
-                db, list(range(0, 10)), [id_active]  # List all user types, active status
-            )
-            
+            # (activations above invalidate the catalog, so this snapshot already includes them)
+            catalog = await mission_catalog.get(db)
+            all_active_events = catalog.events_by([id_active])
+            if event_ids is not None:
+                all_active_events = [event for event in all_active_events if event.id in event_ids]
+
             for event in all_active_events:
-                reset_time = event.reset_time
                 auto_renew = event.auto_renew
-                expiration_date = event.expired_date
-                # print(f"Checking event {event.id} for expiration...")
-                # print(f"Reset time: {reset_time}, Expiration date: {expiration_date}")
-                
-                if expiration_date and reset_time:
-                    expiration_date = expiration_date.replace(
-                        hour=reset_time.hour,
-                        minute=reset_time.minute,
-                        second=reset_time.second,
-                        microsecond=reset_time.microsecond
-                    )
-            
+                expiration_date = event.expiration()
+
                 # print(f"Current time: {now}, Expiration date: {expiration_date}")
                 if expiration_date and now >= expiration_date:
                     try:
@@ -109,16 +113,18 @@ class EventService:
                             if auto_renew:
                                 # Event will be renewed automatically - expire ALL missions from the previous event
                                 logger.info(f"Event {event.id} expired (auto_renew=True). Expiring all previous missions.")
-                                await self._expire_event_missions(
+                                changes += await self._expire_event_missions(
                                     db, event.id, [id_active, id_pending, id_completed], id_expired
                                 )
                             else:
                                 # If not auto_renew, change the event status to expired
                                 logger.info(f"Event {event.id} expired (auto_renew=False). Marking as expired.")
                                 await EventSchemaBase.update_event_status(db, event.id, id_expired)
-                                
+                                changes += 1
+
                                 # Invalidate only completed missions related to this expired event
-                                await self._expire_event_missions(db, event.id, [id_completed], id_expired)
+                                changes += await self._expire_event_missions(db, event.id, [id_completed], id_expired)
                     except Exception as e:
                         logger.error(f"Error processing event {event.id} expiration: {e}")
                         await db.rollback()
+            return changes
@@ -3,15 +3,18 @@ from app.core.postgresdatabase import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.status import StatusSchemaBase
 from app.schemas.recurrence_mode import RecurrenceMode
-from app.schemas.user import UserSchemaBase
-from app.schemas.mission_type import MissionTypeSchemaBase
 from app.schemas.mission import MissionSchemaBase
+from app.services.catalog import mission_catalog
 
 class Expired:
     def __init__(self):
         self.id_expired_date = RecurrenceMode.EXPIRED_DATE.value
 
-    async def expired(self):
+    async def expired(self, mission_type_ids: set[int] | None = None):
+        """
+        Reconcilia as missões com data de expiração fixa, com comandos em conjunto por tipo de missão.
+        `mission_type_ids` limita a varredura a esses tipos (usado pelo MissionDeadlineScheduler); None = todos.
+        """
         async with Session() as session:
             db: AsyncSession = session
 
@@ -21,52 +24,49 @@ class Expired:
             id_completed = await StatusSchemaBase.get_id_by_name(db, "completed")
             id_expired = await StatusSchemaBase.get_id_by_name(db, "expired")
 
-            # Buscar todos os usuários ativos
-            all_active_users = await UserSchemaBase.get_all_id_by_status(db, id_active)
-            # print(f"Usuários ativos encontrados: {all_active_users}")
-
-            # Buscar todos os tipos de missão ativos com modo EXPIRED_DATE
-            all_active_mission_types = await MissionTypeSchemaBase.get_all_id_by_status_and_recurrence_mode(
-                db, [id_active, id_expired], self.id_expired_date
-            )
-
-            for mission_type_id in all_active_mission_types:
-                start_date = await MissionTypeSchemaBase.get_start_date_by_id(db, mission_type_id)
-                expired_date = await MissionTypeSchemaBase.get_expired_date_by_id(db, mission_type_id)
-                reset_time = await MissionTypeSchemaBase.get_reset_time_by_id(db, mission_type_id)
-                mission_type_status = await MissionTypeSchemaBase.get_status_by_id(db, mission_type_id)
-                # Ajustar hora da data de expiração
-                if expired_date and reset_time:
-                    expired_date = expired_date.replace(
-                        hour=reset_time.hour,
-                        minute=reset_time.minute,
-                        second=reset_time.second,
-                        microsecond=reset_time.microsecond
-                    )
-
-                for user_id in all_active_users:
-                    # Buscar missões existentes do tipo dentro do período
-                    existing_missions_ids = await MissionSchemaBase.get_list_id_by_user_and_types_and_period_and_status(
-                        session=db,
-                        user_id=user_id,
-                        mission_type_id=mission_type_id,
-                        start_date=None,
-                        end_date=None,
-                        status_ids=[id_pending, id_completed]
-                    )
-                    
-                    for mission_id in existing_missions_ids:
-                        # Verificar e atualizar status se necessário
-                        status_current = await MissionSchemaBase.get_status_by_mission_id(db, mission_id)
-
-                        if (datetime.now() >= expired_date and status_current == id_pending) or mission_type_status == id_expired:
-                            await MissionSchemaBase.update_mission_status(db, mission_id, id_expired)
-                            # print(f"Missão {mission_id} do usuário {user_id} marcada como expirada.")
-
-                    # Criar missão se não existir e estiver dentro do intervalo
-                    if not existing_missions_ids and start_date and expired_date and start_date <= datetime.now() < expired_date and id_expired != mission_type_status:
-                        await MissionSchemaBase.create_mission(db, mission_type_id, user_id)
-                        # print(f"Missão criada para usuário {user_id}, tipo {mission_type_id}")
-                    # Fim do código 
+            # Buscar todos os tipos de missão ativos (ou expirados) com modo EXPIRED_DATE
+            catalog = await mission_catalog.get(db)
+            mission_types = catalog.mission_types_by([id_active, id_expired], self.id_expired_date)
+            if mission_type_ids is not None:
+                mission_types = [entry for entry in mission_types if entry.id in mission_type_ids]
 
+            rows = 0
+            for mission_type in mission_types:
+                type_rows = 0
+                try:
+                    now = datetime.now()
+                    start_date = mission_type.start_date
+                    expired_date = mission_type.expiration_date
+                    reset_time = mission_type.reset_time
+                    # Ajustar hora da data de expiração
+                    if expired_date and reset_time:
+                        expired_date = expired_date.replace(
+                            hour=reset_time.hour,
+                            minute=reset_time.minute,
+                            second=reset_time.second,
+                            microsecond=reset_time.microsecond
+                        )
 
+                    if mission_type.status == id_expired:
+                        # tipo expirado: todas as instâncias (pendentes ou concluídas) expiram
+                        type_rows += await MissionSchemaBase.bulk_expire_missions(
+                            db, mission_type.id, id_active, [id_pending, id_completed], id_expired
+                        )
+                    elif expired_date and now >= expired_date:
+                        type_rows += await MissionSchemaBase.bulk_expire_missions(
+                            db, mission_type.id, id_active, [id_pending], id_expired
+                        )
+                    # Criar missão para quem ainda não tem, se estiver dentro do intervalo
+                    elif (
+                        start_date and expired_date and start_date <= now < expired_date
+                        and catalog.has_active_event_for_mission(mission_type.id, id_active)
+                    ):
+                        type_rows += await MissionSchemaBase.bulk_create_missing_missions(
+                            db, mission_type.id, id_active, id_pending, [id_pending, id_completed]
+                        )
+                    await db.commit()
+                    rows += type_rows
+                except Exception as e:
+                    await db.rollback()
+                    print(f"Erro ao reconciliar missões com expiração do tipo {mission_type.id}: {e}")
+            return rows
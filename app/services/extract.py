@@ -68,3 +68,95 @@ class JsonExtractor:
             print("JsonExtractor unexpected error:", e)
 
         return None
+
+
+class IncrementalJsonParser:
+    """Parser incremental para o objeto JSON da leitura enquanto ele chega em partes (streaming).
+
+    Alimentado com os trechos de texto via `feed`, devolve cada membro de primeiro nível
+    cujo valor é string assim que a string termina (ex.: ("introducao", "..."), ("carta_1", "...")).
+    Ignora qualquer texto antes do primeiro '{' (como o prefixo ```json) e valores que não são string.
+    """
+
+    def __init__(self):
+        self._state = "seek_object"
+        self._raw = []
+        self._escape = False
+        self._key = None
+        self._depth = 0
+        self._in_string = False
+        self.values = {}
+
+    @staticmethod
+    def _decode(raw):
+        text = "".join(raw)
+        try:
+            return json.loads(f'"{text}"')
+        except Exception:
+            return text
+
+    def feed(self, chunk):
+        completed = []
+        for char in chunk or "":
+            state = self._state
+            if state == "seek_object":
+                if char == "{":
+                    self._state = "seek_key"
+            elif state == "seek_key":
+                if char == '"':
+                    self._raw, self._escape = [], False
+                    self._state = "in_key"
+                elif char == "}":
+                    self._state = "done"
+            elif state in ("in_key", "in_value"):
+                if self._escape:
+                    self._raw.append(char)
+                    self._escape = False
+                elif char == "\\":
+                    self._raw.append(char)
+                    self._escape = True
+                elif char == '"':
+                    if state == "in_key":
+                        self._key = self._decode(self._raw)
+                        self._state = "seek_colon"
+                    else:
+                        value = self._decode(self._raw)
+                        self.values[self._key] = value
+                        completed.append((self._key, value))
+                        self._state = "seek_key"
+                else:
+                    self._raw.append(char)
+            elif state == "seek_colon":
+                if char == ":":
+                    self._state = "seek_value"
+            elif state == "seek_value":
+                if char == '"':
+                    self._raw, self._escape = [], False
+                    self._state = "in_value"
+                elif not char.isspace():
+                    # valor que não é string (número, lista, objeto...): apenas pula
+                    self._depth = 1 if char in "[{" else 0
+                    self._in_string = False
+                    self._escape = False
+                    self._state = "in_other" if self._depth else "seek_key"
+            elif state == "in_other":
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif char == "\\":
+                        self._escape = True
+                    elif char == '"':
+                        self._in_string = False
+                elif char == '"':
+                    self._in_string = True
+                elif char in "[{":
+                    self._depth += 1
+                elif char in "]}":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._state = "seek_key"
+        return completed
+
+    def result(self):
+        """Retorna o dicionário com os membros já concluídos, ou None se nada foi lido."""
+        return dict(self.values) if self.values else None
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+
+from app.core.configs import settings
+from app.core.postgresdatabase import engine
+
+
+def advisory_lock_key(name: str) -> int:
+    """Chave bigint (com sinal) estável para o nome do lock."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+@asynccontextmanager
+async def try_advisory_lock(name: str):
+    """
+    Tenta obter o advisory lock `name` sem esperar. Retorna True se obteve.
+    O lock é de sessão do Postgres: fica preso à conexão usada aqui e é liberado
+    ao sair do bloco (ou automaticamente se o processo morrer e a conexão cair).
+    """
+    key = advisory_lock_key(name)
+    async with engine.connect() as conn:
+        acquired = bool((await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar())
+        await conn.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                await conn.commit()
+
+
+class LeaderElection:
+    """
+    Eleição de líder entre todos os processos (workers e instâncias) via advisory lock do Postgres.
+    Um único processo mantém o lock numa conexão dedicada e é o líder; os demais tentam de novo
+    a cada `retry_seconds`. Se o líder morrer, a conexão cai, o Postgres solta o lock e outro
+    processo assume. Os agendadores só executam jobs quando `is_leader` é True.
+    """
+
+    def __init__(self, name: str, retry_seconds: float = 15.0, enabled: bool = True):
+        self.name = name
+        self.key = advisory_lock_key(name)
+        self.retry_seconds = retry_seconds
+        self.enabled = enabled
+        self._is_leader = False
+        self._conn = None
+        self._stopped = False
+
+    @property
+    def is_leader(self) -> bool:
+        # sem eleição (uma única instância) todo processo é líder
+        return self._is_leader or not self.enabled
+
+    async def _release(self):
+        self._is_leader = False
+        if self._conn is not None:
+            try:
+                await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                await self._conn.close()
+            except Exception as e:
+                print(f"Erro ao liberar liderança '{self.name}': {e}")
+            self._conn = None
+
+    async def _tick(self):
+        if self._conn is None:
+            self._conn = await engine.connect()
+        if self._is_leader:
+            # mantém a conexão viva e detecta se ela caiu (e com ela o lock)
+            await self._conn.execute(text("SELECT 1"))
+            await self._conn.commit()
+            return
+        acquired = bool(
+            (await self._conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})).scalar()
+        )
+        await self._conn.commit()
+        if acquired:
+            self._is_leader = True
+            print(f"👑 Processo assumiu a liderança '{self.name}'")
+
+    async def run(self):
+        if not self.enabled:
+            return
+        while not self._stopped:
+            try:
+                await self._tick()
+            except Exception as e:
+                print(f"Erro na eleição de líder '{self.name}': {e}")
+                await self._release()
+            await asyncio.sleep(self.retry_seconds)
+
+    async def stop(self):
+        self._stopped = True
+        await self._release()
+
+
+# Instância global
+scheduler_leader = LeaderElection(
+    "tarot:scheduler-leader",
+    retry_seconds=settings.LEADER_RETRY_SECONDS,
+    enabled=settings.SCHEDULER_LEADER_ELECTION,
+)
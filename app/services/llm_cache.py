@@ -0,0 +1,101 @@
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from app.core.configs import settings
+from app.core.postgresdatabase import Session
+from app.schemas.llm_cache import LLMCacheSchemaBase
+
+
+class LLMResponseCache:
+    """
+    Cache de respostas do modelo endereçado pelo conteúdo da chamada.
+    Dois níveis: LRU em memória (por processo) e tabela llm_response_cache no Postgres
+    (compartilhada entre processos e reinícios). Cada entrada expira após o TTL informado.
+    """
+
+    def __init__(self, max_entries: int, persistent: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.persistent = persistent
+        self._entries: OrderedDict[str, tuple[str, datetime]] = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(prompt: str, role: str, model: str, max_tokens, temperature) -> str:
+        payload = json.dumps(
+            {
+                "prompt": prompt,
+                "role": role,
+                "model": model,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, response: str, expires_at: datetime):
+        self._entries[key] = (response, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            response, expires_at = entry
+            if expires_at > datetime.now():
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return response
+            del self._entries[key]
+
+        if self.persistent:
+            try:
+                async with Session() as session:
+                    stored = await LLMCacheSchemaBase.get_valid(session, key)
+            except Exception as e:
+                print(f"Erro ao ler cache de LLM: {e}")
+                stored = None
+            if stored is not None:
+                response, expires_at = stored
+                self._remember(key, response, expires_at)
+                self.db_hits += 1
+                return response
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, response: str, ttl: int):
+        expires_at = datetime.now() + timedelta(seconds=ttl)
+        self._remember(key, response, expires_at)
+        self.stores += 1
+        if self.persistent:
+            try:
+                async with Session() as session:
+                    await LLMCacheSchemaBase.upsert(session, key, response, expires_at)
+            except Exception as e:
+                print(f"Erro ao gravar cache de LLM: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_ratio": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Instância global
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    persistent=settings.LLM_CACHE_PERSISTENT,
+)
@@ -0,0 +1,87 @@
+import time
+
+
+class LLMError(Exception):
+    """Falha ao gerar texto com o modelo (nunca deve ser gravada como leitura)."""
+
+
+class LLMTimeoutError(LLMError):
+    """A chamada ao modelo excedeu o tempo limite da tentativa."""
+
+
+class LLMRateLimitError(LLMError):
+    """O provedor recusou a chamada por limite de taxa (429) em todas as tentativas."""
+
+
+class LLMProviderError(LLMError):
+    """Erro do provedor (5xx, conexão) ou resposta inválida."""
+
+
+class LLMDeadlineExceeded(LLMError):
+    """O prazo total da requisição acabou antes de uma resposta válida."""
+
+
+class LLMCircuitOpenError(LLMError):
+    """O circuit breaker está aberto: o provedor está degradado e a chamada falha imediatamente."""
+
+
+class LLMReplayMissError(LLMError):
+    """Modo replay do LLMRecorder: a chamada não existe na gravação (não há fallback para o provedor)."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples por processo.
+    - closed: chamadas passam; `failure_threshold` falhas seguidas abrem o circuito.
+    - open: chamadas falham imediatamente por `reset_timeout` segundos.
+    - half_open: depois do reset_timeout, uma chamada de teste é liberada; sucesso fecha, falha reabre.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        # um teste que não terminou (ex.: requisição cancelada) expira após reset_timeout
+        probe_pending = (
+            self._probe_in_flight
+            and time.monotonic() - self._probe_started < self.reset_timeout
+        )
+        if state == "open" or (state == "half_open" and probe_pending):
+            self.rejected += 1
+            raise LLMCircuitOpenError("Provedor de IA indisponível no momento (circuit breaker aberto).")
+        if state == "half_open":
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_neutral(self):
+        """Chamada terminou sem indicar degradação do provedor (ex.: 429): só libera o teste."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
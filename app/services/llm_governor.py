@@ -0,0 +1,150 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from enum import Enum
+
+from app.core.configs import settings
+
+
+class LLMLane(str, Enum):
+    """
+    Filas de prioridade para chamadas ao modelo.
+    READING: leitura principal que o usuário está aguardando.
+    AUXILIARY: chamadas curtas e interativas (classificação, resumo, boas-vindas...).
+    BATCH: jobs noturnos; só avançam quando não há chamadas interativas aguardando.
+    """
+    READING = "reading"
+    AUXILIARY = "auxiliary"
+    BATCH = "batch"
+
+
+class _TokenBucket:
+    """Balde de tokens por minuto (TPM) com reposição contínua."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = max(1, tokens_per_minute)
+        self.rate = self.capacity / 60.0  # tokens por segundo
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def take(self, amount: int) -> int:
+        # um pedido maior que a capacidade esperaria para sempre; limita ao balde cheio
+        amount = min(max(1, amount), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return amount
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def refund(self, amount: int):
+        self._refill()
+        self.tokens = max(-self.capacity, min(self.capacity, self.tokens + amount))
+
+
+class _Lane:
+    def __init__(self, name: LLMLane, concurrency: int, tokens_per_minute: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = _TokenBucket(tokens_per_minute)
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+
+
+class LLMGovernor:
+    """
+    Limita as chamadas ao modelo para o processo inteiro, com concorrência e orçamento
+    de tokens por minuto independentes para cada LLMLane.
+    """
+
+    def __init__(self, limits: dict[LLMLane, tuple[int, int]]):
+        self.lanes = {
+            lane: _Lane(lane, concurrency, tpm) for lane, (concurrency, tpm) in limits.items()
+        }
+        # liberado quando nenhuma chamada interativa está aguardando vaga
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+
+    @classmethod
+    def from_settings(cls) -> "LLMGovernor":
+        return cls({
+            LLMLane.READING: (settings.LLM_READING_CONCURRENCY, settings.LLM_READING_TPM),
+            LLMLane.AUXILIARY: (settings.LLM_AUXILIARY_CONCURRENCY, settings.LLM_AUXILIARY_TPM),
+            LLMLane.BATCH: (settings.LLM_BATCH_CONCURRENCY, settings.LLM_BATCH_TPM),
+        })
+
+    @staticmethod
+    def estimate_tokens(prompt: str, role: str, max_tokens: int) -> int:
+        """Estimativa barata: ~4 caracteres por token de entrada + o máximo de saída."""
+        return (len(prompt or "") + len(role or "")) // 4 + int(max_tokens or 0)
+
+    def _update_interactive_idle(self):
+        waiting = sum(
+            lane.waiting for name, lane in self.lanes.items() if name != LLMLane.BATCH
+        )
+        if waiting:
+            self._interactive_idle.clear()
+        else:
+            self._interactive_idle.set()
+
+    @asynccontextmanager
+    async def slot(self, lane: LLMLane, estimated_tokens: int):
+        """
+        Reserva uma vaga na fila e o orçamento estimado de tokens.
+        Retorna uma função `report(tokens_usados)` para devolver a diferença ao balde.
+        """
+        current = self.lanes[LLMLane(lane)]
+        current.waiting += 1
+        self._update_interactive_idle()
+        try:
+            if current.name == LLMLane.BATCH:
+                await self._interactive_idle.wait()
+            await current.semaphore.acquire()
+        finally:
+            current.waiting -= 1
+            self._update_interactive_idle()
+
+        reserved = 0
+        started = False
+        try:
+            reserved = await current.bucket.take(estimated_tokens)
+            current.in_flight += 1
+            started = True
+
+            def report(used_tokens: int | None):
+                nonlocal reserved
+                if used_tokens is not None:
+                    current.bucket.refund(reserved - used_tokens)
+                    reserved = used_tokens
+
+            yield report
+        finally:
+            if started:
+                current.in_flight -= 1
+                current.completed += 1
+            current.semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            lane.name.value: {
+                "concurrency": lane.concurrency,
+                "in_flight": lane.in_flight,
+                "waiting": lane.waiting,
+                "completed": lane.completed,
+                "tokens_available": int(lane.bucket.tokens),
+            }
+            for lane in self.lanes.values()
+        }
+
+
+# Instância global
+llm_governor = LLMGovernor.from_settings()
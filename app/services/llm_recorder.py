@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+from collections import deque
+from datetime import datetime
+
+from app.core.configs import settings
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_errors import LLMReplayMissError
+
+
+class LLMRecorder:
+    """
+    Grava e reproduz o tráfego do modelo em um arquivo JSONL (uma chamada por linha).
+    - record: cada resposta bem-sucedida é gravada com a latência observada
+      (e, no streaming, o instante relativo de cada trecho).
+    - replay: as respostas são servidas do arquivo, sem chamar o Azure, com a latência
+      original multiplicada por `latency_scale`. Chamadas repetidas com o mesmo prompt
+      recebem as respostas gravadas em sequência (circular). Prompts que variam a cada
+      execução (data, posições dos planetas, sorteios) não repetem a chave exata: com
+      `fallback`, a falta é servida por uma gravação da mesma lane, role e max_tokens
+      (também em sequência) e contada em `approximate`.
+    """
+
+    def __init__(
+        self, mode: str = "off", path: str = "llm_traffic.jsonl", latency_scale: float = 1.0, fallback: bool = True,
+    ):
+        if mode not in ("off", "record", "replay"):
+            raise ValueError(f"Modo de gravação inválido: {mode}")
+        self.mode = mode
+        self.path = path
+        self.latency_scale = max(0.0, latency_scale)
+        self.fallback = fallback
+        self._entries: dict[str, deque] | None = None
+        self._similar: dict[tuple, deque] = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.approximate = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "LLMRecorder":
+        return cls(
+            settings.LLM_RECORD_MODE, settings.LLM_RECORD_PATH,
+            settings.LLM_REPLAY_LATENCY_SCALE, settings.LLM_REPLAY_FALLBACK,
+        )
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def make_key(prompt: str, role: str, max_tokens, temperature) -> str:
+        # o modelo fica fora da chave para permitir reproduzir uma gravação com outro deployment
+        return LLMResponseCache.make_key(prompt, role, "", max_tokens, temperature)
+
+    @staticmethod
+    def _similar_key(lane, role: str, max_tokens) -> tuple:
+        return (getattr(lane, "value", lane), role, max_tokens)
+
+    def _append(self, entry: dict):
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    async def record(
+        self, prompt: str, role: str, max_tokens, temperature, lane, response: str,
+        latency: float, chunks: list[tuple[float, str]] | None = None,
+    ):
+        entry = {
+            "key": self.make_key(prompt, role, max_tokens, temperature),
+            "recorded_at": datetime.now().isoformat(),
+            "lane": getattr(lane, "value", lane),
+            "model": settings.OPENAI_MODEL,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "role": role,
+            "prompt": prompt,
+            "response": response,
+            "latency": round(latency, 4),
+        }
+        if chunks is not None:
+            entry["chunks"] = [[round(offset, 4), text] for offset, text in chunks]
+        try:
+            await asyncio.to_thread(self._append, entry)
+            self.recorded += 1
+        except OSError as e:
+            # a gravação nunca deve derrubar a chamada real
+            print(f"Erro ao gravar tráfego do modelo em {self.path}: {e}")
+
+    def _load(self) -> dict[str, deque]:
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.path):
+                with open(self.path, encoding="utf-8") as file:
+                    for line in file:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._entries.setdefault(entry["key"], deque()).append(entry)
+                            similar = self._similar_key(entry.get("lane"), entry.get("role"), entry.get("max_tokens"))
+                            self._similar.setdefault(similar, deque()).append(entry)
+            print(f"LLMRecorder: {sum(len(v) for v in self._entries.values())} respostas carregadas de {self.path}")
+        return self._entries
+
+    def _next(self, prompt: str, role: str, max_tokens, temperature, lane=None) -> dict:
+        entries = self._load().get(self.make_key(prompt, role, max_tokens, temperature))
+        if entries:
+            self.replayed += 1
+        else:
+            entries = self._similar.get(self._similar_key(lane, role, max_tokens)) if self.fallback else None
+            if not entries:
+                self.misses += 1
+                raise LLMReplayMissError("Chamada ao modelo não encontrada na gravação.")
+            self.approximate += 1
+        entry = entries[0]
+        entries.rotate(-1)
+        return entry
+
+    async def replay(self, prompt: str, role: str, max_tokens, temperature, lane=None) -> str:
+        entry = self._next(prompt, role, max_tokens, temperature, lane)
+        await asyncio.sleep(entry["latency"] * self.latency_scale)
+        return entry["response"]
+
+    async def replay_stream(self, prompt: str, role: str, max_tokens, temperature, lane=None):
+        entry = self._next(prompt, role, max_tokens, temperature, lane)
+        chunks = entry.get("chunks") or [[entry["latency"], entry["response"]]]
+        elapsed = 0.0
+        for offset, text in chunks:
+            await asyncio.sleep(max(0.0, offset - elapsed) * self.latency_scale)
+            elapsed = offset
+            yield text
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "approximate": self.approximate,
+            "misses": self.misses,
+        }
+
+
+# Instância global
+llm_recorder = LLMRecorder.from_settings()
@@ -0,0 +1,47 @@
+from collections import deque
+
+
+class MetricsRegistry:
+    """
+    Métricas em memória do processo: contadores e amostras de latência
+    (janela deslizante das últimas `window` observações por métrica).
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: dict[str, deque] = {}
+        self._counters: dict[str, int] = {}
+
+    def observe(self, name: str, value: float):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(value)
+
+    def increment(self, name: str, amount: int = 1):
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    @staticmethod
+    def _percentile(ordered: list[float], pct: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(pct * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        samples = {}
+        for name, values in self._samples.items():
+            ordered = sorted(values)
+            if not ordered:
+                continue
+            samples[name] = {
+                "count": len(ordered),
+                "last": round(values[-1], 4),
+                "p50": round(self._percentile(ordered, 0.50), 4),
+                "p95": round(self._percentile(ordered, 0.95), 4),
+                "p99": round(self._percentile(ordered, 0.99), 4),
+                "max": round(ordered[-1], 4),
+            }
+        return {"counters": dict(self._counters), "samples": samples}
+
+
+# Instância global
+metrics = MetricsRegistry()
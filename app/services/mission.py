@@ -1,14 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 import asyncio
 import logging
 from app.core.postgresdatabase import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.status import StatusSchemaBase
 from app.schemas.recurrence_mode import RecurrenceMode
-from app.schemas.user import UserSchemaBase
 from app.schemas.mission_type import MissionTypeSchemaBase
 from app.schemas.mission import MissionSchemaBase
-from app.schemas.event import EventSchemaBase
+from app.services.catalog import mission_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -24,14 +23,46 @@ class MissionService:
         mission_type_id: int,
         status_filter: list[int],
         status_to_set: int,
-    ):
-        """Marks all missions of a given type and status as expired."""
-        await MissionSchemaBase.update_missions_status_by_type_and_status(
+    ) -> int:
+        """Marks all missions of a given type and status as expired; returns the number of missions updated."""
+        return await MissionSchemaBase.update_missions_status_by_type_and_status(
             session, mission_type_id, status_filter, status_to_set
         )
         
+    @staticmethod
+    def activation_time(mission_type) -> datetime | None:
+        """Momento em que um tipo de missão pendente passa a ativo (start_date no horário de reset_time)."""
+        start_date = mission_type.start_date
+        if start_date is not None and mission_type.reset_time:
+            reset_time = mission_type.reset_time
+            return start_date.replace(
+                hour=reset_time.hour,
+                minute=reset_time.minute,
+                second=reset_time.second,
+                microsecond=reset_time.microsecond
+            )
+        return start_date
+
+    @staticmethod
+    def expiration_time(mission_type) -> datetime | None:
+        """Momento em que um tipo de missão ativo expira (expiration_date no horário de reset_time)."""
+        expiration_date = mission_type.expiration_date
+        if expiration_date and mission_type.reset_time:
+            reset_time = mission_type.reset_time
+            return expiration_date.replace(
+                hour=reset_time.hour,
+                minute=reset_time.minute,
+                second=reset_time.second,
+                microsecond=reset_time.microsecond
+            )
+        return expiration_date
+
     #funcao que vai "ativar" e "desativar" as missoes
-    async def update_status_missions(self):
+    async def update_status_missions(self, mission_type_ids: set[int] | None = None):
+        """
+        Ativa os tipos de missão pendentes e expira os ativos.
+        `mission_type_ids` limita a varredura a esses tipos (usado pelo MissionDeadlineScheduler); None = todos.
+        """
         async with Session() as session:
             db: AsyncSession = session
 
@@ -44,76 +75,53 @@ class MissionService:
             )
             
             
-            all_pending_mission_types = await MissionTypeSchemaBase.get_all_id_by_status_and_recurrence_mode(
-                db, id_pending, [self.id_user_based, self.id_expired_date, self.id_calendar]
-            )
-            
+            recurrence_modes = [self.id_user_based, self.id_expired_date, self.id_calendar]
+            catalog = await mission_catalog.get(db)
+            # tipos ativados/expirados + missões expiradas (telemetria da varredura)
+            changes = 0
+
             # para todas as missões pendentes, verificar se ta na data e hora de ligar, se tiver, ativa a missão mudando o status para ativo
-            for mission_type_id in all_pending_mission_types:
+            for mission_type in catalog.mission_types_by(id_pending, recurrence_modes):
+                mission_type_id = mission_type.id
+                if mission_type_ids is not None and mission_type_id not in mission_type_ids:
+                    continue
                 # print(f"Checking mission type {mission_type_id} for activation...")
-                is_event_active = await EventSchemaBase.has_active_event_for_mission(
-                    db, mission_type_id, id_active
-                )
+                is_event_active = catalog.has_active_event_for_mission(mission_type_id, id_active)
 
                 if not is_event_active:
-                    await self._expire_missions_for_type(
+                    changes += await self._expire_missions_for_type(
                         db, mission_type_id, [id_pending], id_expired
                     )
                     continue
 
-                start_date = await MissionTypeSchemaBase.get_start_date_by_id(db, mission_type_id)
-                reset_time = await MissionTypeSchemaBase.get_reset_time_by_id(db, mission_type_id)
-                
-                if start_date is not None and reset_time:
-                    start_date = (
-                        (start_date).replace(
-                            hour=reset_time.hour,
-                            minute=reset_time.minute,
-                            second=reset_time.second,
-                            microsecond=reset_time.microsecond
-                        )
-                    )
-                elif start_date is not None:
-                    start_date = start_date + timedelta(days=start_date)
-                else:
-                    start_date = None
-                
+                start_date = self.activation_time(mission_type)
+
                 # verifica se a data atual é maior ou igual a start_date, se for, muda o status da missão para ativo
                 if start_date and now >= start_date:
                     # print(f"Mission type {mission_type_id} is ready to be activated.")
                     await MissionTypeSchemaBase.update_mission_type_status(db, mission_type_id, id_active)
+                    changes += 1
                 
 
             # agora vamos pegar todas as missões ativas e verificar se elas estão no período de expiração
-            all_active_mission_types = await MissionTypeSchemaBase.get_all_id_by_status_and_recurrence_mode(
-                db, id_active, [self.id_user_based, self.id_expired_date, self.id_calendar]
-            )
-            
-            for mission_type_id in all_active_mission_types:
-                is_event_active = await EventSchemaBase.has_active_event_for_mission(
-                    db, mission_type_id, id_active
-                )
+            # (a ativação acima invalida o catálogo; a nova fotografia já inclui os tipos ativados)
+            catalog = await mission_catalog.get(db)
+
+            for mission_type in catalog.mission_types_by(id_active, recurrence_modes):
+                mission_type_id = mission_type.id
+                if mission_type_ids is not None and mission_type_id not in mission_type_ids:
+                    continue
+                is_event_active = catalog.has_active_event_for_mission(mission_type_id, id_active)
 
                 if not is_event_active:
-                    await self._expire_missions_for_type(
+                    changes += await self._expire_missions_for_type(
                         db, mission_type_id, [id_pending], id_expired
                     )
                     continue
 
-                reset_time = await MissionTypeSchemaBase.get_reset_time_by_id(db, mission_type_id)
-                auto_renew = await MissionTypeSchemaBase.get_auto_renew_by_id(db, mission_type_id)
-                expiration_date = await MissionTypeSchemaBase.get_expired_date_by_id(db, mission_type_id)
-                # print(f"Checking mission type {mission_type_id} for expiration...")
-                # print(f"Reset time: {reset_time}, Expiration date: {expiration_date}")
-                
-                if expiration_date and reset_time:
-                    expiration_date = expiration_date.replace(
-                        hour=reset_time.hour,
-                        minute=reset_time.minute,
-                        second=reset_time.second,
-                        microsecond=reset_time.microsecond
-                    )
-            
+                auto_renew = mission_type.auto_renew
+                expiration_date = self.expiration_time(mission_type)
+
                 # print(f"Current time: {now}, Expiration date: {expiration_date}")
                 if expiration_date and now >= expiration_date:
                     try:
@@ -126,9 +134,11 @@ class MissionService:
                                 # se não for auto_renew, muda o status da missão para expirado
                                 logger.info(f"Mission {mission_type_id} expired (auto_renew=False). Marking as expired.")
                                 await MissionTypeSchemaBase.update_mission_type_status(db, mission_type_id, id_expired)
+                                changes += 1
                     except Exception as e:
                         logger.error(f"Error processing mission {mission_type_id} expiration: {e}")
                         await db.rollback()
+            return changes
                     
             
 
@@ -0,0 +1,275 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.configs import settings
+from app.core.postgresdatabase import Session, engine
+from app.schemas.mission import MissionSchemaBase
+from app.schemas.recurrence_mode import RecurrenceMode
+from app.schemas.status import StatusSchemaBase
+from app.services.calendar import Calendar
+from app.services.catalog import mission_catalog
+from app.services.event import EventService
+from app.services.expired import Expired
+from app.services.leader_election import scheduler_leader
+from app.services.metrics import metrics
+from app.services.mission import MissionService
+from app.services.sweep import mission_sweep
+from app.services.user_based import UserBased
+
+MISSION_TYPE = "mission_type"
+EVENT = "event"
+# canal do Postgres (NOTIFY/LISTEN) usado por notify() para acordar o agendador em outro processo
+WAKE_CHANNEL = "tarot_mission_scheduler_wake"
+
+
+class MissionDeadlineScheduler:
+    """
+    Reconcilia missões e eventos nas fronteiras em que algo muda, em vez de varrer tudo a cada minuto.
+
+    Uma fila de prioridade (heapq) guarda o próximo instante de transição de cada tipo de missão
+    (ativação, expiração, fim do período de calendário, vencimento da missão relativa mais antiga)
+    e de cada evento (ativação, expiração). O loop dorme até o primeiro instante e processa só os
+    tipos/eventos vencidos. Uma varredura completa, que cobre o que não tem fronteira conhecida
+    (usuários novos, mudanças feitas por outro processo), roda no máximo `max_sleep_seconds` depois
+    da anterior, haja ou não fronteiras pendentes, e também quando `notify()` é chamado (ex.: cadastro ou
+    confirmação de um usuário), respeitando um intervalo mínimo de `min_full_sweep_seconds` entre elas.
+    O pedido vale para qualquer processo: o líder faz LISTEN em WAKE_CHANNEL numa conexão dedicada.
+    """
+
+    def __init__(
+        self,
+        max_sleep_seconds: float = 600.0,
+        grace_seconds: float = 0.5,
+        min_full_sweep_seconds: float = 30.0,
+    ):
+        self.max_sleep_seconds = max_sleep_seconds
+        self.grace_seconds = grace_seconds
+        self.min_full_sweep_seconds = min(min_full_sweep_seconds, max_sleep_seconds)
+        # time.monotonic() da última varredura completa (None = nenhuma desde que virou líder)
+        self._last_full_sweep: float | None = None
+        self._heap: list[tuple[datetime, str, int]] = []
+        self._wake = asyncio.Event()
+        self._full_sweep = True
+        self._stopped = False
+        # conexão com o LISTEN de WAKE_CHANNEL (só enquanto este processo é o líder)
+        self._listener = None
+        self._listener_driver = None
+        self.mission = MissionService()
+        self.event = EventService()
+        self.calendar = Calendar()
+        self.expired = Expired()
+        self.user_based = UserBased()
+
+    def wake(self):
+        """
+        Pede uma varredura completa neste processo. Para pedir ao líder, esteja ele onde estiver
+        (outro worker, worker separado), use notify().
+        """
+        self._full_sweep = True
+        self._wake.set()
+
+    async def notify(self):
+        """
+        Pede uma varredura completa ao processo líder (ex.: usuário novo ou confirmado) via NOTIFY.
+        Se o NOTIFY falhar, acorda só este processo; a varredura periódica cobre os demais casos.
+        """
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("SELECT pg_notify(:channel, '')"), {"channel": WAKE_CHANNEL})
+        except Exception as e:
+            print(f"Erro ao notificar o agendador de missões: {e}")
+            self.wake()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.wake()
+
+    async def _listen(self):
+        """Mantém o LISTEN de WAKE_CHANNEL, refazendo-o se a conexão dedicada tiver caído."""
+        if self._listener is not None and not self._listener_driver.is_closed():
+            return
+        await self._unlisten()
+        conn = await engine.connect()
+        try:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.add_listener(WAKE_CHANNEL, self._on_notify)
+        except Exception:
+            await conn.close()
+            raise
+        self._listener, self._listener_driver = conn, raw.driver_connection
+        # pedidos feitos antes do LISTEN se perderam: a próxima volta faz a varredura completa
+        self._full_sweep = True
+
+    async def _unlisten(self):
+        if self._listener is None:
+            return
+        conn, driver = self._listener, self._listener_driver
+        self._listener = self._listener_driver = None
+        try:
+            if not driver.is_closed():
+                await driver.remove_listener(WAKE_CHANNEL, self._on_notify)
+            await conn.close()
+        except Exception as e:
+            print(f"Erro ao encerrar o LISTEN do agendador de missões: {e}")
+
+    async def stop(self):
+        self._stopped = True
+        self._wake.set()
+        await self._unlisten()
+
+    async def _deadlines(self, db: AsyncSession, now: datetime) -> list[tuple[datetime, str, int]]:
+        """Próximos instantes de transição (estritamente futuros) de cada tipo de missão e evento."""
+        id_active = await StatusSchemaBase.get_id_by_name(db, "active")
+        id_pending = await StatusSchemaBase.get_id_by_name(db, "pending_confirmation")
+        catalog = await mission_catalog.get(db)
+        deadlines = []
+
+        for mission_type in catalog.mission_types.values():
+            candidates = []
+            if mission_type.status == id_pending:
+                candidates.append(MissionService.activation_time(mission_type))
+            elif mission_type.status == id_active:
+                candidates.append(MissionService.expiration_time(mission_type))
+                if mission_type.recurrence_mode == RecurrenceMode.CALENDAR.value:
+                    try:
+                        _, period_end = self.calendar.get_current_period(
+                            mission_type.recurrence_type, mission_type.start_date,
+                            mission_type.reset_time, mission_type.auto_renew,
+                        )
+                        candidates.append(period_end)
+                    except Exception as e:
+                        print(f"Erro ao calcular o período do tipo de missão {mission_type.id}: {e}")
+                elif mission_type.recurrence_mode == RecurrenceMode.EXPIRED_DATE.value:
+                    # a criação das missões começa em start_date
+                    candidates.append(mission_type.start_date)
+            deadlines.extend(
+                (when, MISSION_TYPE, mission_type.id) for when in candidates if when and when > now
+            )
+
+        # missões relativas: a primeira a vencer é a pendente mais antiga de cada tipo
+        user_based_types = {
+            mission_type.id: mission_type
+            for mission_type in catalog.mission_types_by(id_active, RecurrenceMode.USER_BASED.value)
+            if mission_type.relative_days is not None
+        }
+        oldest = await MissionSchemaBase.get_oldest_created_at_by_types(db, list(user_based_types), id_pending)
+        for mission_type_id, created_at in oldest.items():
+            mission_type = user_based_types[mission_type_id]
+            when = UserBased.calculate_expired_date(created_at, mission_type.relative_days, mission_type.reset_time)
+            if when and when > now:
+                deadlines.append((when, MISSION_TYPE, mission_type_id))
+
+        for event in catalog.events.values():
+            if event.status == id_pending:
+                when = EventService.activation_time(event)
+            elif event.status == id_active:
+                when = event.expiration()
+            else:
+                continue
+            if when and when > now:
+                deadlines.append((when, EVENT, event.id))
+        return deadlines
+
+    async def rebuild(self):
+        async with Session() as db:
+            deadlines = await self._deadlines(db, datetime.now())
+        heapq.heapify(deadlines)
+        self._heap = deadlines
+
+    def _pop_due(self, now: datetime) -> tuple[set[int], set[int]]:
+        mission_type_ids, event_ids = set(), set()
+        while self._heap and self._heap[0][0] <= now:
+            _, kind, item_id = heapq.heappop(self._heap)
+            (mission_type_ids if kind == MISSION_TYPE else event_ids).add(item_id)
+        return mission_type_ids, event_ids
+
+    async def process(self, mission_type_ids: set[int] | None = None, event_ids: set[int] | None = None):
+        """
+        Executa as etapas da antiga varredura do minuto, na mesma ordem, só para os itens informados
+        (None = todos). Tipos de missão dos eventos vencidos entram junto, pois dependem do evento.
+        """
+        if mission_type_ids is not None and event_ids:
+            async with Session() as db:
+                catalog = await mission_catalog.get(db)
+            for event_id in event_ids:
+                event = catalog.event(event_id)
+                if event:
+                    mission_type_ids |= set(event.missions)
+
+        stages = [
+            ("mission_status", lambda: self.mission.update_status_missions(mission_type_ids)),
+            ("event_status", lambda: self.event.update_status_events(event_ids)),
+            ("calendar", lambda: self.calendar.calendar(mission_type_ids)),
+            ("expired", lambda: self.expired.expired(mission_type_ids)),
+            ("user_based", lambda: self.user_based.user_based(mission_type_ids)),
+        ]
+        await mission_sweep.run_stages(stages)
+        metrics.increment("missions.scheduler.full_sweeps" if mission_type_ids is None else "missions.scheduler.deadline_runs")
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Dorme até `seconds` ou até wake(); retorna True se foi acordado."""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, seconds))
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._wake.clear()
+
+    def _since_full_sweep(self) -> float:
+        if self._last_full_sweep is None:
+            return float("inf")
+        return time.monotonic() - self._last_full_sweep
+
+    async def run(self):
+        print("🕒 Mission deadline scheduler started")
+        while not self._stopped:
+            # só o líder reconcilia; ao (re)assumir a liderança começa com uma varredura completa
+            if not scheduler_leader.is_leader:
+                self._last_full_sweep = None
+                await self._unlisten()
+                await self._sleep(settings.LEADER_RETRY_SECONDS)
+                continue
+            # varredura completa de segurança: no máximo max_sleep_seconds após a anterior,
+            # mesmo que sempre haja uma fronteira mais próxima na fila
+            if self._since_full_sweep() >= self.max_sleep_seconds:
+                self._full_sweep = True
+            try:
+                await self._listen()
+            except Exception as e:
+                print(f"Erro ao escutar {WAKE_CHANNEL}: {e}")
+            try:
+                if self._full_sweep and self._since_full_sweep() >= self.min_full_sweep_seconds:
+                    self._full_sweep = False
+                    self._last_full_sweep = time.monotonic()
+                    await self.process()
+                    await self.rebuild()
+                else:
+                    mission_type_ids, event_ids = self._pop_due(datetime.now())
+                    if mission_type_ids or event_ids:
+                        await self.process(mission_type_ids, event_ids)
+                        await self.rebuild()
+            except Exception as e:
+                print(f"Erro no agendador de missões: {e}")
+
+            since = self._since_full_sweep()
+            delay = self.max_sleep_seconds - since
+            if self._full_sweep:
+                # pedida por notify() logo após outra varredura: espera o intervalo mínimo
+                delay = min(delay, self.min_full_sweep_seconds - since)
+            if self._heap:
+                until_next = (self._heap[0][0] - datetime.now()).total_seconds() + self.grace_seconds
+                delay = min(delay, until_next)
+            await self._sleep(delay)
+
+
+# Instância global
+mission_scheduler = MissionDeadlineScheduler(
+    max_sleep_seconds=settings.MISSION_SCHEDULER_MAX_SLEEP_SECONDS,
+    grace_seconds=settings.MISSION_SCHEDULER_GRACE_SECONDS,
+    min_full_sweep_seconds=settings.MISSION_SCHEDULER_MIN_FULL_SWEEP_SECONDS,
+)
@@ -1,37 +1,323 @@
 import asyncio
-from openai import AzureOpenAI
+import random
+import time
+from typing import AsyncIterator
+import httpx
+import openai
+from openai import AsyncAzureOpenAI
 import os
 from dotenv import load_dotenv
 
+from app.core.configs import settings
+from app.services.llm_governor import LLMLane, llm_governor
+from app.services.llm_cache import llm_cache
+from app.services.llm_recorder import llm_recorder
+from app.services.llm_errors import (
+    CircuitBreaker,
+    LLMDeadlineExceeded,
+    LLMError,
+    LLMProviderError,
+    LLMRateLimitError,
+    LLMTimeoutError,
+)
+
+
 class OpenAIService:
+    # Cliente assíncrono único por processo: todas as instâncias compartilham o mesmo pool HTTP
+    _client: AsyncAzureOpenAI | None = None
+    # Circuit breaker compartilhado: falha imediatamente quando o provedor está degradado
+    breaker = CircuitBreaker(
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.LLM_BREAKER_RESET_SECONDS,
+    )
+
     def __init__(self):
-        load_dotenv()
-        self.client = AzureOpenAI(
-            api_key=os.getenv("AZURE_API_KEY"),
-            api_version="2023-03-15-preview",
-            azure_endpoint=os.getenv("AZURE_ENDPOINT")
-        )
-
-    async def gerar_texto(self, prompt_ajustado: str, role: str, max_tokens, temperature) -> str:
-        tentativas = 0
-        max_tentativas = 5
-
-        while tentativas < max_tentativas:
+        self.client = OpenAIService.get_client()
+
+    @classmethod
+    def get_client(cls) -> AsyncAzureOpenAI:
+        """
+        Retorna o cliente AsyncAzureOpenAI compartilhado, criando-o na primeira chamada.
+        """
+        if cls._client is None:
+            load_dotenv()
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(
+                    settings.OPENAI_TIMEOUT,
+                    connect=settings.OPENAI_CONNECT_TIMEOUT,
+                ),
+            )
+            cls._client = AsyncAzureOpenAI(
+                api_key=os.getenv("AZURE_API_KEY"),
+                api_version=settings.OPENAI_API_VERSION,
+                azure_endpoint=os.getenv("AZURE_ENDPOINT"),
+                http_client=http_client,
+                # as novas tentativas são controladas por gerar_texto
+                max_retries=0,
+            )
+        return cls._client
+
+    @classmethod
+    async def close(cls) -> None:
+        """
+        Fecha o cliente compartilhado (chamado no encerramento da aplicação).
+        """
+        if cls._client is not None:
+            await cls._client.close()
+            cls._client = None
+
+    async def gerar_texto(
+        self,
+        prompt_ajustado: str,
+        role: str,
+        max_tokens,
+        temperature,
+        timeout: float | None = None,
+        lane: LLMLane = LLMLane.AUXILIARY,
+        cache_ttl: int | None = None,
+        deadline: float | None = None,
+    ) -> str:
+        """
+        Gera um texto com o modelo configurado sem bloquear o event loop.
+        `timeout` (segundos) limita cada tentativa; se None usa OPENAI_TIMEOUT.
+        `lane` define a fila de prioridade do llm_governor usada pela chamada.
+        `cache_ttl` (segundos) habilita o llm_cache para chamadas determinísticas; None desativa.
+        `deadline` (time.monotonic()) é o prazo total da requisição: limita tentativas, esperas e backoff.
+
+        Novas tentativas usam backoff exponencial com jitter e respeitam o Retry-After do provedor.
+        Em caso de falha levanta uma subclasse de LLMError (nunca retorna a mensagem de erro como texto).
+        """
+        cache_key = None
+        if cache_ttl:
+            cache_key = llm_cache.make_key(
+                prompt_ajustado, role, settings.OPENAI_MODEL, max_tokens, temperature
+            )
+            cached = await llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        estimated_tokens = llm_governor.estimate_tokens(prompt_ajustado, role, max_tokens)
+        max_attempts = max(1, settings.LLM_MAX_ATTEMPTS)
+        attempt_timeout = timeout if timeout is not None else settings.OPENAI_TIMEOUT
+
+        for attempt in range(1, max_attempts + 1):
+            remaining = self._remaining(deadline)
+            if remaining <= 0:
+                raise LLMDeadlineExceeded("Prazo da requisição esgotado antes de chamar o modelo.")
+            OpenAIService.breaker.before_call()
             try:
-                response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": role},
-                        {"role": "user", "content": prompt_ajustado}
-                    ],
-                    max_tokens=max_tokens,
-                    temperature=temperature
+                text = await asyncio.wait_for(
+                    self._create_completion(
+                        prompt_ajustado, role, max_tokens, temperature,
+                        min(attempt_timeout, remaining), lane, estimated_tokens,
+                    ),
+                    timeout=remaining,
                 )
-                return response.choices[0].message.content.strip()
             except Exception as e:
-                tentativas += 1
-                print(f"[Tentativa {tentativas}] Erro ao gerar texto: {e}")
-                if tentativas < max_tentativas:
-                    await asyncio.sleep(2 ** (tentativas - 1))  # 1s, 2s, 4s, 8s...
+                error = self._classify_error(e)
+                if self._is_provider_failure(e):
+                    OpenAIService.breaker.record_failure()
+                else:
+                    OpenAIService.breaker.record_neutral()
+                print(f"[Tentativa {attempt}] Erro ao gerar texto: {e}")
+                if not self._is_retryable(e) or attempt == max_attempts:
+                    raise error from e
+
+                delay = self._backoff_delay(attempt, e)
+                if self._remaining(deadline) <= delay:
+                    raise LLMDeadlineExceeded(
+                        f"Prazo da requisição esgotado após {attempt} tentativa(s): {e}"
+                    ) from e
+                await asyncio.sleep(delay)
+                continue
+
+            OpenAIService.breaker.record_success()
+            if cache_key:
+                await llm_cache.set(cache_key, text, cache_ttl)
+            return text
+
+    async def _create_completion(
+        self, prompt_ajustado, role, max_tokens, temperature, timeout, lane, estimated_tokens
+    ) -> str:
+        if llm_recorder.replaying:
+            async with llm_governor.slot(lane, estimated_tokens):
+                return await llm_recorder.replay(prompt_ajustado, role, max_tokens, temperature, lane)
+
+        started = time.monotonic()
+        async with llm_governor.slot(lane, estimated_tokens) as report:
+            response = await self.client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": role},
+                    {"role": "user", "content": prompt_ajustado}
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=timeout,
+            )
+            report(response.usage.total_tokens if response.usage else None)
+        content = response.choices[0].message.content if response.choices else None
+        if not content:
+            raise LLMProviderError("Resposta vazia do modelo.")
+        if llm_recorder.recording:
+            await llm_recorder.record(
+                prompt_ajustado, role, max_tokens, temperature, lane,
+                content.strip(), time.monotonic() - started,
+            )
+        return content.strip()
+
+    @staticmethod
+    def _remaining(deadline: float | None) -> float:
+        """Segundos restantes até o deadline (time.monotonic()); infinito se não houver deadline."""
+        if deadline is None:
+            return float("inf")
+        return deadline - time.monotonic()
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        return isinstance(error, (
+            openai.RateLimitError,
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.InternalServerError,
+            asyncio.TimeoutError,
+            LLMProviderError,
+        ))
+
+    @classmethod
+    def _is_provider_failure(cls, error: Exception) -> bool:
+        """
+        Só conta para o circuit breaker o que indica provedor degradado (5xx, timeout, conexão,
+        resposta vazia). 429 é controle de vazão e erros do cliente (400, filtro de conteúdo,
+        autenticação) vêm do prompt/configuração: não devem abrir o circuito para todos.
+        """
+        return cls._is_retryable(error) and not isinstance(error, (openai.RateLimitError, LLMRateLimitError))
+
+    @staticmethod
+    def _classify_error(error: Exception) -> LLMError:
+        if isinstance(error, LLMError):
+            return error
+        if isinstance(error, openai.RateLimitError):
+            return LLMRateLimitError(str(error))
+        if isinstance(error, (openai.APITimeoutError, asyncio.TimeoutError)):
+            return LLMTimeoutError(str(error) or "Tempo limite da chamada ao modelo excedido.")
+        return LLMProviderError(str(error))
+
+    @staticmethod
+    def _retry_after(error: Exception) -> float | None:
+        """Lê o Retry-After (ou retry-after-ms) enviado pelo provedor, se houver."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            return None
+        return None
+
+    @classmethod
+    def _backoff_delay(cls, attempt: int, error: Exception) -> float:
+        # full jitter: aleatório entre 0 e o backoff exponencial (com teto)
+        ceiling = min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * 2 ** (attempt - 1))
+        delay = random.uniform(0, ceiling)
+        hint = cls._retry_after(error)
+        if hint is not None:
+            # respeita a dica do provedor, com um pequeno jitter para não sincronizar os clientes
+            delay = hint + random.uniform(0, min(1.0, ceiling))
+        return delay
+
+    @staticmethod
+    async def _stream_texts(stream) -> AsyncIterator[str]:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    @classmethod
+    async def _until_deadline(cls, chunks: AsyncIterator[str], deadline: float | None) -> AsyncIterator[str]:
+        """
+        Aplica o deadline à resposta inteira: o timeout do cliente vale por leitura, então um
+        stream que continua mandando trechos devagar passaria do prazo da requisição.
+        """
+        iterator = chunks.__aiter__()
+        while True:
+            remaining = cls._remaining(deadline)
+            if remaining <= 0:
+                raise LLMDeadlineExceeded("Prazo da requisição esgotado durante o streaming.")
+            try:
+                text = await asyncio.wait_for(
+                    iterator.__anext__(), timeout=None if deadline is None else remaining
+                )
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise LLMDeadlineExceeded("Prazo da requisição esgotado durante o streaming.")
+            yield text
+
+    async def gerar_texto_stream(
+        self,
+        prompt_ajustado: str,
+        role: str,
+        max_tokens,
+        temperature,
+        timeout: float | None = None,
+        lane: LLMLane = LLMLane.READING,
+        deadline: float | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Versão em streaming de gerar_texto: produz os trechos de texto conforme o modelo os gera.
+        Não há novas tentativas, pois parte da resposta já pode ter sido entregue ao cliente.
+        Falhas são levantadas como subclasses de LLMError.
+        """
+        remaining = self._remaining(deadline)
+        if remaining <= 0:
+            raise LLMDeadlineExceeded("Prazo da requisição esgotado antes de chamar o modelo.")
+        OpenAIService.breaker.before_call()
+        estimated_tokens = llm_governor.estimate_tokens(prompt_ajustado, role, max_tokens)
+        attempt_timeout = timeout if timeout is not None else settings.OPENAI_TIMEOUT
+        started = time.monotonic()
+        recorded_chunks: list[tuple[float, str]] = []
+        try:
+            async with llm_governor.slot(lane, estimated_tokens):
+                if llm_recorder.replaying:
+                    chunks = llm_recorder.replay_stream(prompt_ajustado, role, max_tokens, temperature, lane)
                 else:
-                    return f"Erro após {max_tentativas} tentativas: {str(e)}"
+                    stream = await self.client.chat.completions.create(
+                        model=settings.OPENAI_MODEL,
+                        messages=[
+                            {"role": "system", "content": role},
+                            {"role": "user", "content": prompt_ajustado}
+                        ],
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=min(attempt_timeout, remaining),
+                        stream=True,
+                    )
+                    chunks = self._stream_texts(stream)
+                async for text in self._until_deadline(chunks, deadline):
+                    if llm_recorder.recording:
+                        recorded_chunks.append((time.monotonic() - started, text))
+                    yield text
+        except Exception as e:
+            error = self._classify_error(e)
+            if self._is_provider_failure(e):
+                OpenAIService.breaker.record_failure()
+            else:
+                OpenAIService.breaker.record_neutral()
+            print(f"Erro ao gerar texto em streaming: {e}")
+            raise error from e
+        OpenAIService.breaker.record_success()
+        if llm_recorder.recording and recorded_chunks:
+            await llm_recorder.record(
+                prompt_ajustado, role, max_tokens, temperature, lane,
+                "".join(text for _, text in recorded_chunks), time.monotonic() - started,
+                chunks=recorded_chunks,
+            )
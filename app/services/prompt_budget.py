@@ -0,0 +1,72 @@
+from app.services.llm_governor import LLMGovernor
+
+
+class PromptBudget:
+    """
+    Monta o bloco de contextos anteriores de uma leitura dentro de um orçamento de tokens.
+    As entradas chegam já ordenadas por prioridade (avaliação e similaridade); cada uma entra
+    completa se couber, senão numa versão compacta (textos cortados, sem comentário), senão fica de fora.
+    """
+
+    def __init__(self, max_tokens: int, compact_chars: int = 160):
+        self.max_tokens = max(0, max_tokens)
+        self.compact_chars = compact_chars
+        self.used_tokens = 0
+        self.included = 0
+        self.compacted = 0
+        self.dropped = 0
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        return LLMGovernor.estimate_tokens(text, "", 0)
+
+    @staticmethod
+    def _shorten(text: str | None, limit: int) -> str | None:
+        if not text or len(text) <= limit:
+            return text
+        return text[:limit].rsplit(" ", 1)[0] + "..."
+
+    @staticmethod
+    def format_entry(ctx: dict, card_names: list[str]) -> str:
+        is_reversed = ctx.get("is_reversed")
+        if not is_reversed or len(is_reversed) != len(card_names):
+            is_reversed = [False] * len(card_names)
+        line = (
+            f"- Contexto anterior: '{ctx['context']}', Baralho: '{ctx['deck_name']}', Spread: '{ctx['spread_type_name']}', "
+            f"Cartas: {card_names}, Está invertida?: {is_reversed}"
+        )
+        if ctx.get("reading_summary"):
+            line += f", Resumo: {ctx['reading_summary']}"
+        if ctx.get("rating") is not None:
+            line += f", Avaliação do usuário: {ctx['rating']}"
+            if ctx.get("comment"):
+                line += f", Comentário do usuário: '{ctx['comment']}'"
+        return line
+
+    def compact_entry(self, ctx: dict, card_names: list[str]) -> str:
+        compact = dict(ctx)
+        compact["context"] = self._shorten(ctx["context"], self.compact_chars)
+        compact["reading_summary"] = self._shorten(ctx.get("reading_summary"), self.compact_chars)
+        compact["comment"] = None
+        return self.format_entry(compact, card_names)
+
+    def add(self, ctx: dict, card_names: list[str]) -> str | None:
+        """
+        Retorna a linha do contexto (completa ou compacta) se couber no orçamento, senão None.
+        """
+        for compacted, line in (
+            (False, self.format_entry(ctx, card_names)),
+            (True, self.compact_entry(ctx, card_names)),
+        ):
+            tokens = self.estimate_tokens(line)
+            if self.used_tokens + tokens <= self.max_tokens:
+                self.used_tokens += tokens
+                self.included += 1
+                self.compacted += int(compacted)
+                return line
+        self.dropped += 1
+        return None
+
+    def build(self, entries: list[tuple[dict, list[str]]]) -> str:
+        lines = [line for line in (self.add(ctx, names) for ctx, names in entries) if line]
+        return "\n".join(lines)
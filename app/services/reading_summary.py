@@ -0,0 +1,85 @@
+import asyncio
+
+from app.core.configs import settings
+from app.core.postgresdatabase import Session
+from app.schemas.deck import DeckSchema
+from app.schemas.draw import DrawSchemaBase
+from app.schemas.spread_type import SpreadTypeSchema
+from app.services.extract import JsonExtractor
+from app.services.llm_governor import LLMLane
+from app.services.llm_errors import LLMError
+from app.services.openai import OpenAIService
+from app.prompts.resumo_leitura import (
+    prompt_resumo_leitura_template,
+    role_resumo_leitura,
+)
+
+
+class ReadingSummaryService:
+    """
+    Gera e persiste o resumo (draws.reading_summary) de uma tiragem concluída.
+    A leitura não muda depois de concluída, então o resumo é gerado uma única vez
+    e reaproveitado em todas as buscas de tiragens parecidas.
+    """
+
+    def __init__(self):
+        # tarefas em segundo plano por draw_id (evita duplicatas e coleta pelo GC)
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    async def summarize_draw(self, db, draw_id: int) -> str | None:
+        details = await DrawSchemaBase.get_draw_details_by_id(db, draw_id)
+        if not details or not details.get("reading"):
+            return None
+
+        reading = details.get("reading")
+        if isinstance(reading, str):
+            try:
+                reading = JsonExtractor.extract_json_from_reading(reading)
+            except Exception:
+                pass
+
+        prompt = prompt_resumo_leitura_template.format(
+            context=details.get("context"),
+            deck_name=await DeckSchema.get_deck_name_by_id(db, details.get("deck_id")),
+            spread_name=await SpreadTypeSchema.get_spread_type_name_by_id(db, details.get("spread_type_id")),
+            cards=details.get("cards"),
+            reading=reading,
+        )
+        try:
+            summary = await OpenAIService().gerar_texto(
+                prompt_ajustado=prompt,
+                role=role_resumo_leitura,
+                max_tokens=50,
+                temperature=0.9,
+                lane=LLMLane.BATCH,
+                cache_ttl=settings.LLM_CACHE_TTL_SUMMARY,
+            )
+        except LLMError as e:
+            print(f"Resumo da tiragem {draw_id} não gerado: {e}")
+            return None
+
+        await DrawSchemaBase.update_reading_summary(db, draw_id, summary)
+        return summary
+
+    async def _summarize_in_background(self, draw_id: int):
+        try:
+            async with Session() as session:
+                await self.summarize_draw(session, draw_id)
+        except Exception as e:
+            print(f"Erro ao gerar resumo da tiragem {draw_id}: {e}")
+
+    def schedule(self, draw_id: int) -> asyncio.Task:
+        """
+        Agenda a geração do resumo sem bloquear a resposta da requisição.
+        Se já houver uma geração em andamento para a tiragem, reaproveita a mesma tarefa.
+        """
+        task = self._tasks.get(draw_id)
+        if task is None:
+            task = asyncio.create_task(self._summarize_in_background(draw_id))
+            self._tasks[draw_id] = task
+            task.add_done_callback(lambda _t, key=draw_id: self._tasks.pop(key, None))
+        return task
+
+
+# Instância global
+reading_summary_service = ReadingSummaryService()
@@ -0,0 +1,108 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.configs import settings
+from app.core.postgresdatabase import Session
+from app.services.metrics import metrics
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Mantém apenas as últimas `keep` linhas de cada usuário em `table`."""
+    name: str
+    table: str
+    keep: int
+    user_column: str = '"user"'
+    # filtro extra (SQL) para limitar as linhas sujeitas à retenção
+    where: str = "TRUE"
+
+
+def default_policies() -> list[RetentionPolicy]:
+    return [
+        RetentionPolicy("daily_zodiac", "daily_zodiac", settings.RETENTION_DAILY_ZODIAC_KEEP),
+        RetentionPolicy("daily_tips", "daily_tips", settings.RETENTION_DAILY_TIPS_KEEP),
+        RetentionPolicy("daily_path", "daily_path", settings.RETENTION_DAILY_PATH_KEEP),
+        RetentionPolicy(
+            "daily_login_transactions", "transaction", settings.RETENTION_DAILY_TRANSACTIONS_KEEP,
+            user_column="user_id", where="transaction_type = 'DAILY_LOGIN'",
+        ),
+    ]
+
+
+class RetentionService:
+    """
+    Retenção "manter as últimas N por usuário" com um DELETE por tabela (row_number() por usuário),
+    executado em faixas de ids de usuário de `chunk_users` para manter as transações curtas.
+    Roda em segundo plano depois dos jobs diários, fora do caminho das requisições.
+    """
+
+    def __init__(self, policies: list[RetentionPolicy] | None = None, chunk_users: int | None = None):
+        self.policies = policies if policies is not None else default_policies()
+        self.chunk_users = max(1, chunk_users or settings.RETENTION_CHUNK_USERS)
+
+    @staticmethod
+    async def _user_range(db: AsyncSession, policy: RetentionPolicy) -> tuple[int | None, int | None]:
+        result = await db.execute(
+            text(f"SELECT MIN({policy.user_column}), MAX({policy.user_column}) FROM {policy.table} WHERE {policy.where}")
+        )
+        return tuple(result.one())
+
+    @staticmethod
+    async def _delete_chunk(db: AsyncSession, policy: RetentionPolicy, first_user: int, last_user: int) -> int:
+        result = await db.execute(
+            text(f"""
+                DELETE FROM {policy.table}
+                WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY {policy.user_column} ORDER BY created_at DESC, id DESC
+                        ) AS position
+                        FROM {policy.table}
+                        WHERE {policy.user_column} BETWEEN :first_user AND :last_user
+                        AND {policy.where}
+                    ) ranked
+                    WHERE position > :keep
+                )
+            """),
+            {"first_user": first_user, "last_user": last_user, "keep": policy.keep},
+        )
+        await db.commit()
+        return result.rowcount or 0
+
+    async def enforce(self, db: AsyncSession, policy: RetentionPolicy) -> int:
+        """
+        Aplica uma política e retorna a quantidade de linhas removidas.
+        """
+        first, last = await self._user_range(db, policy)
+        if first is None:
+            return 0
+        removed = 0
+        for start in range(first, last + 1, self.chunk_users):
+            try:
+                removed += await self._delete_chunk(db, policy, start, start + self.chunk_users - 1)
+            except Exception as e:
+                print(f"Erro na retenção de {policy.name} (usuários {start}..{start + self.chunk_users - 1}): {e}")
+                await db.rollback()
+        return removed
+
+    async def enforce_all(self) -> dict:
+        """
+        Aplica todas as políticas. Retorna {política: linhas removidas}.
+        """
+        report = {}
+        async with Session() as session:
+            db: AsyncSession = session
+            for policy in self.policies:
+                started = time.monotonic()
+                removed = await self.enforce(db, policy)
+                report[policy.name] = removed
+                metrics.increment(f"retention.{policy.name}.removed", removed)
+                print(f"Retention {policy.name}: kept last {policy.keep} per user, removed {removed} rows in {time.monotonic() - started:.1f}s")
+        return report
+
+
+# Instância global
+retention_service = RetentionService()
@@ -1,3 +1,4 @@
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from app.services.calendar import Calendar
@@ -7,6 +8,9 @@ from app.services.mission import MissionService
 from app.services.event import EventService
 from app.services.subscription import Subscription
 from app.core.postgresdatabase import Session
+from app.services.leader_election import scheduler_leader
+from app.services.sweep import minute_sweep
+from app.core.configs import settings
 
 
 scheduler = AsyncIOScheduler()
@@ -22,12 +26,21 @@ def start_jobs():
     
 
     async def executar_em_ordem():
-        await subscription.verify_subscription()
-        await mission.update_status_missions()
-        await event.update_status_events()
-        await calendar.calendar()
-        await expired.expired()
-        await user_based.user_based()
+        # com vários workers/instâncias, só o líder executa a varredura do minuto
+        if not scheduler_leader.is_leader:
+            return
+        stages = [("subscription", subscription.verify_subscription)]
+        if not settings.MISSION_DEADLINE_SCHEDULER:
+            # sem o MissionDeadlineScheduler, missões e eventos também são varridos a cada tick
+            stages += [
+                ("mission_status", mission.update_status_missions),
+                ("event_status", event.update_status_events),
+                ("calendar", calendar.calendar),
+                ("expired", expired.expired),
+                ("user_based", user_based.user_based),
+            ]
+        # descarta o tick se o anterior ainda estiver rodando e ajusta o intervalo à duração
+        await minute_sweep.tick(stages)
         
         # criar um serviço que adiciona as tiragens diarias de acordo com o tipo de usuario 
         
@@ -35,10 +48,27 @@ def start_jobs():
 
     scheduler.add_job(
         executar_em_ordem,
-        trigger=IntervalTrigger(minutes=1),
+        trigger=IntervalTrigger(seconds=minute_sweep.interval),
         id="sequencial_task",
         name="Execução sequencial de todas as tarefas",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
     )
 
+    def reagendar(interval: float):
+        scheduler.reschedule_job("sequencial_task", trigger=IntervalTrigger(seconds=interval))
+
+    def job_nao_executado(event):
+        # tick descartado pelo APScheduler: o anterior ainda rodando (max_instances) ou atraso (misfire)
+        if event.job_id != "sequencial_task":
+            return
+        if event.code == EVENT_JOB_MAX_INSTANCES:
+            minute_sweep.record_skipped()
+        else:
+            minute_sweep.record_missed()
+
+    minute_sweep.on_interval_change = reagendar
+    scheduler.add_listener(job_nao_executado, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+
     scheduler.start()
@@ -0,0 +1,37 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única execução.
+    Quem chega enquanto a chave está em andamento aguarda o mesmo resultado.
+
+    Com `keep_results=True` o resultado também fica memorizado até `forget`/`clear`,
+    útil para deduplicar trabalho dentro de uma mesma execução de job.
+    """
+
+    def __init__(self, keep_results: bool = False):
+        self.keep_results = keep_results
+        self._futures: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._futures[key] = future
+            # falhas nunca ficam memorizadas: a próxima chamada tenta de novo
+            future.add_done_callback(lambda f, k=key: self._on_done(k, f))
+        # shield: o cancelamento de um chamador não cancela os demais que aguardam
+        return await asyncio.shield(future)
+
+    def _on_done(self, key: Hashable, future: asyncio.Future):
+        failed = future.cancelled() or future.exception() is not None
+        if (failed or not self.keep_results) and self._futures.get(key) is future:
+            del self._futures[key]
+
+    def forget(self, key: Hashable):
+        self._futures.pop(key, None)
+
+    def clear(self):
+        self._futures.clear()
@@ -2,7 +2,8 @@ from app.schemas.status import StatusSchemaBase  # Adjust the import path as nee
 from app.schemas.user_type import UserTypeSchemaBase  # Adjust the import path as needed
 from app.schemas.user import UserSchemaBase  # Adjust the import path as needed
 from app.schemas.subscription import SubscriptionSchemaBase  # Adjust the import path as needed
-from datetime import datetime
+from datetime import date, datetime
+import time
 from app.core.postgresdatabase import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from collections import Counter
@@ -13,6 +14,8 @@ from app.schemas.user_type import UserTypeSchema  # Add this import
 from app.services.descricao_astrologica import DescricaoAstrologicaService  # Add this import
 from app.schemas.personal_sign import PersonalSignSchema  # Add this import
 from app.schemas.zodiac import ZodiacSchemaBase  # Add this import
+from app.schemas.job_ledger import JobLedgerSchemaBase
+from app.core.configs import settings
 
 
 class Subscription:
@@ -21,6 +24,11 @@ class Subscription:
     async def create_daily_gift_for_all_users(self):
         """
         Create a daily gift for all active users.
+        Users are processed in chunks of DAILY_GIFT_CHUNK_SIZE with set-based statements
+        (one transaction per chunk); the run is tracked in the job ledger so a restart
+        resumes only the missing users. A run already completed today is not skipped:
+        a restart still tops up active users that are not in the ledger yet (e.g. users
+        that became active after the run), while users already gifted are not gifted twice.
         """
         async with Session() as session:
             db: AsyncSession = session
@@ -40,9 +48,46 @@ class Subscription:
                 print("No active users found.")
                 return
 
-            print(f"Active users: {active_users}")
-            for user in active_users:
-                await self.create_daily_gift_for_user(db=db, user_id=user)
+            run = await JobLedgerSchemaBase.get_or_create_run(db, "daily_gift", date.today())
+            already_done = await JobLedgerSchemaBase.get_done_item_ids(db, run["id"])
+            pending_users = [user for user in active_users if user not in already_done]
+            if not pending_users:
+                print("Daily gifts already issued to every active user today, skipping.")
+                return {"processed": 0, "total": len(active_users), "errors": [], "skipped": True}
+
+            started = time.monotonic()
+            processed = 0
+            errors = []
+            chunk_size = max(1, settings.DAILY_GIFT_CHUNK_SIZE)
+            for offset in range(0, len(pending_users), chunk_size):
+                chunk = pending_users[offset:offset + chunk_size]
+                try:
+                    await self.create_daily_gift_for_users(db=db, user_ids=chunk)
+                    processed += len(chunk)
+                    await JobLedgerSchemaBase.mark_items(db, run["id"], chunk, "done")
+                except Exception as e:
+                    await db.rollback()
+                    print(f"Error creating daily gifts for users {chunk[0]}..{chunk[-1]}: {e}")
+                    errors.extend({"user": user, "error": str(e)} for user in chunk)
+                    await JobLedgerSchemaBase.mark_items(db, run["id"], chunk, "failed", error=str(e))
+
+            await JobLedgerSchemaBase.finish_run(
+                db, run["id"],
+                status="completed" if not errors else "partial",
+                total=len(active_users),
+                processed=len(already_done) + processed,
+                failed=len(errors),
+            )
+
+        elapsed = time.monotonic() - started
+        print(f"Processed {processed} of {len(pending_users)} users in {elapsed:.1f}s. Errors: {len(errors)}")
+        return {
+            "processed": processed,
+            "resumed": len(already_done),
+            "total": len(active_users),
+            "errors": errors,
+            "elapsed": round(elapsed, 2),
+        }
 
     @staticmethod
     # Esta função pode ser reutilizada em outras partes do sistema
@@ -51,65 +96,59 @@ class Subscription:
         Create a daily gift for a single user.
         """
         print(f"Creating daily gift for user {user_id}.")
+        await Subscription.create_daily_gift_for_users(db=db, user_ids=[user_id])
 
+    @staticmethod
+    async def create_daily_gift_for_users(db: AsyncSession, user_ids: list[int]):
+        """
+        Create the daily gift for many users with a fixed number of statements, in one transaction:
+        - draws of each user's last DAILY_LOGIN transaction that are still pending confirmation
+          are carried over (created_at renewed) and count towards the user's daily gifts;
+        - the missing draws (daily_gift of the user type minus carried over) are inserted in bulk;
+        - one DAILY_LOGIN transaction per user is inserted in bulk.
+        Older DAILY_LOGIN transactions are pruned by the nightly retention job.
+        """
+        if not user_ids:
+            return
         id_pending_confirmation = await StatusSchemaBase.get_id_by_name(
             db=db, name="pending_confirmation"
         )
+        id_active = await StatusSchemaBase.get_id_by_name(db=db, name="active")
 
-        user_type = await UserSchemaBase.get_user_type_by_id(db=db, id=user_id)
-        gifts = await UserTypeSchemaBase.get_daily_gift_by_user_type(
-            session=db, user_type_id=user_type
-        )
-
-        last_transaction_id = await TransactionSchemaBase.get_last_transaction_by_user_id(
-            session=db, user_id=user_id, transaction_type="DAILY_LOGIN"
-        )
-
-        last_transaction_draws = await TransactionSchemaBase.get_draws_by_transaction_id(
-            session=db, transaction_id=last_transaction_id
-        )
-
-        pending_gift_counts = {}
-        new_draws = []
-
-        if last_transaction_draws:
-            for draw in last_transaction_draws:
-                draw_status = await DrawCreate.get_draw_status_by_id(session=db, draw_id=draw)
-                if draw_status == id_pending_confirmation:
-                    spread_type_id = await DrawCreate.get_spread_type_id_by_draw_id(session=db, draw_id=draw)
-                    pending_gift_counts[spread_type_id] = pending_gift_counts.get(spread_type_id, 0) + 1
-                    await DrawCreate.update_created_at(session=db, draw_id=draw)
-                    new_draws.append(draw)
-                else:
-                    print(f"Draw {draw} for user {user_id} is not pending confirmation, skipping.")
-
-        gifts_counter = Counter(gifts)
-        for gift, required_count in gifts_counter.items():
-            already_pending = pending_gift_counts.get(gift, 0)
-            to_create = required_count - already_pending
-            for _ in range(to_create):
-                # print(f"Adding gift {gift} for user {user_id}.")
-                created_draw = await DrawCreate.create_draw(
-                    db,
-                    user_id=user_id,
-                    spread_type_id=gift
-                )
-                new_draws.append(created_draw.id)
-                # print(f"Gift {gift} added as draw for user {user_id}. Draw ID: {created_draw.id}")
-
-        if new_draws:
-            await TransactionSchemaBase.create_transaction(
-                session=db,
-                user_id=user_id,
-                transaction_type="DAILY_LOGIN",
-                draws=new_draws
+        user_types = await UserSchemaBase.get_user_types_by_ids(db, user_ids)
+        gifts_by_type = {
+            user_type: Counter(
+                await UserTypeSchemaBase.get_daily_gift_by_user_type(session=db, user_type_id=user_type)
             )
-            print(f"Created DAILY_LOGIN transaction for user {user_id} with draws {new_draws}")
+            for user_type in set(user_types.values())
+        }
 
-        await TransactionSchemaBase.delete_old_daily_transactions(
-            session=db,
-            user_id=user_id
+        last_draws = await TransactionSchemaBase.get_last_daily_draws_by_user_ids(db, user_ids)
+        pending = await DrawCreate.get_draws_with_status(
+            db, [draw for draws in last_draws.values() for draw in draws], id_pending_confirmation
         )
+        # só conta a tiragem pendente se ela pertence ao mesmo usuário da transação
+        owner_by_draw = {draw: user for user, draws in last_draws.items() for draw in draws}
+        pending = [draw for draw in pending if owner_by_draw.get(draw["id"]) == draw["user_id"]]
+
+        new_draws: dict[int, list[int]] = {}
+        pending_counts: dict[int, Counter] = {}
+        for draw in pending:
+            new_draws.setdefault(draw["user_id"], []).append(draw["id"])
+            pending_counts.setdefault(draw["user_id"], Counter())[draw["spread_type_id"]] += 1
+        await DrawCreate.bulk_update_created_at(db, [draw["id"] for draw in pending])
+
+        to_create = []
+        for user in user_ids:
+            gifts = gifts_by_type.get(user_types.get(user), Counter())
+            deficit = gifts - pending_counts.get(user, Counter())
+            to_create.extend((user, spread_type_id) for spread_type_id in deficit.elements())
+        for draw_id, user in await DrawCreate.bulk_create_draws(db, to_create, id_pending_confirmation):
+            new_draws.setdefault(user, []).append(draw_id)
+
+        await TransactionSchemaBase.bulk_create_daily_transactions(db, new_draws, status_id=id_active)
+        await db.commit()
+        print(f"Daily gifts: {len(to_create)} draws created, {len(pending)} carried over for {len(user_ids)} users")
 
     async def verify_subscription(self):
         """
@@ -129,11 +168,12 @@ class Subscription:
             )
             if not active_premium_users:
                 print("No active premium users found.")
-                return            
+                return 0
             #pegamos todos os usuarios ativos e premium
             print(f"Active premium users: {active_premium_users}")
             
             #agora temos que pegar a assinatura e ver se ta expirada ou não
+            downgraded = 0
             for user in active_premium_users:
                 # tem que pegar a assinatura ativa e sua data de expiração
                 subscription_id = await SubscriptionSchemaBase.get_id_by_user_id(session=db, user_id=user, status_id=id_active)
@@ -157,6 +197,7 @@ class Subscription:
                         new_status=id_standard
                     )
                     print(f"User {user} has expired subscription and is now set to standard.")
+                    downgraded += 1
                     
                     
                     # atualiza a descrição dos planetas para o usuário
@@ -199,4 +240,5 @@ class Subscription:
             
                 else:
                     print(f"User {user} has an active subscription.")
+            return downgraded
     
\ No newline at end of file
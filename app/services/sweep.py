@@ -0,0 +1,170 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from app.core.configs import settings
+from app.core.postgresdatabase import Session
+from app.schemas.sweep_stats import SweepStatsSchemaBase
+from app.services.metrics import metrics
+
+# etapa de uma varredura: (nome, função async que retorna a quantidade de linhas afetadas ou None)
+Stage = tuple[str, Callable[[], Awaitable[int | None]]]
+
+
+class SweepRunner:
+    """
+    Executa as etapas de uma varredura periódica em sequência, com:
+    - proteção contra sobreposição (um tick que chega com o anterior ainda rodando é descartado);
+    - telemetria por etapa (duração, linhas afetadas, falhas) em `snapshot()` e no registro de métricas,
+      gravada na tabela sweep_stats ao fim de cada execução (só o líder executa as varreduras, então
+      /dev/scheduler-stats lê do banco e funciona também no processo só API);
+    - intervalo adaptativo: quando um tick ocupa mais que `load_ratio` do intervalo, o intervalo
+      aumenta (até `max_interval`); quando fica leve, volta aos poucos para `base_interval`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_interval: float,
+        max_interval: float,
+        backoff_factor: float = 2.0,
+        load_ratio: float = 0.5,
+    ):
+        self.name = name
+        self.base_interval = base_interval
+        self.max_interval = max(base_interval, max_interval)
+        self.backoff_factor = max(1.0, backoff_factor)
+        self.load_ratio = load_ratio
+        self.interval = base_interval
+        # chamado com o novo intervalo (segundos) quando ele muda, ex.: para reagendar o job
+        self.on_interval_change: Callable[[float], None] | None = None
+        self._lock = asyncio.Lock()
+        self.runs = 0
+        self.skipped_overlap = 0
+        self.missed = 0
+        self.overruns = 0
+        self.last_started_at: datetime | None = None
+        self.last_duration: float | None = None
+        self.stages: dict[str, dict] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def record_skipped(self):
+        # contador único de ticks descartados: chamado pelo listener EVENT_JOB_MAX_INSTANCES do APScheduler
+        self.skipped_overlap += 1
+        metrics.increment(f"sweep.{self.name}.skipped_overlap")
+
+    def record_missed(self):
+        self.missed += 1
+        metrics.increment(f"sweep.{self.name}.missed")
+
+    def _record_stage(self, stage: str, seconds: float, rows: int | None, failed: bool):
+        entry = self.stages.setdefault(stage, {
+            "runs": 0, "failures": 0, "last_seconds": 0.0, "max_seconds": 0.0,
+            "total_seconds": 0.0, "last_rows": 0, "total_rows": 0,
+        })
+        entry["runs"] += 1
+        entry["last_seconds"] = round(seconds, 4)
+        entry["max_seconds"] = round(max(entry["max_seconds"], seconds), 4)
+        entry["total_seconds"] = round(entry["total_seconds"] + seconds, 4)
+        entry["last_rows"] = rows or 0
+        entry["total_rows"] += rows or 0
+        metrics.observe(f"sweep.{self.name}.{stage}.seconds", seconds)
+        if rows:
+            metrics.increment(f"sweep.{self.name}.{stage}.rows", rows)
+        if failed:
+            entry["failures"] += 1
+            metrics.increment(f"sweep.{self.name}.{stage}.failures")
+
+    async def run_stages(self, stages: list[Stage]) -> float:
+        """Executa as etapas em ordem (a falha de uma não impede as seguintes) e retorna a duração total."""
+        started = time.monotonic()
+        self.last_started_at = datetime.now()
+        for stage, fn in stages:
+            stage_started = time.monotonic()
+            rows, failed = None, False
+            try:
+                rows = await fn()
+            except Exception as e:
+                failed = True
+                print(f"Erro na etapa {stage} da varredura {self.name}: {e}")
+            self._record_stage(stage, time.monotonic() - stage_started, rows if isinstance(rows, int) else None, failed)
+        duration = time.monotonic() - started
+        self.runs += 1
+        self.last_duration = duration
+        metrics.observe(f"sweep.{self.name}.seconds", duration)
+        await self.persist()
+        return duration
+
+    async def persist(self):
+        """Grava o snapshot (e as métricas deste processo) na tabela sweep_stats."""
+        try:
+            async with Session() as db:
+                await SweepStatsSchemaBase.upsert(
+                    db, self.name, {**self.snapshot(), "metrics": metrics.snapshot()}
+                )
+        except Exception as e:
+            print(f"Erro ao gravar a telemetria da varredura {self.name}: {e}")
+
+    async def tick(self, stages: list[Stage]) -> bool:
+        """Executa um tick; retorna False se foi descartado porque o anterior ainda está rodando."""
+        if self._lock.locked():
+            # com max_instances=1 o APScheduler já descarta (e conta, via record_skipped) o tick
+            # sobreposto; este guarda só cobre chamadas fora do agendador e não conta de novo
+            print(f"⏭️ Varredura {self.name} ainda em execução; tick descartado")
+            return False
+        async with self._lock:
+            duration = await self.run_stages(stages)
+        if duration > self.interval:
+            self.overruns += 1
+            metrics.increment(f"sweep.{self.name}.overruns")
+            print(f"⚠️ Varredura {self.name} levou {duration:.1f}s (intervalo de {self.interval:.0f}s)")
+        self._adapt(duration)
+        return True
+
+    def _adapt(self, duration: float):
+        interval = self.interval
+        if duration > interval * self.load_ratio:
+            # sob carga: recua o bastante para o tick voltar a ocupar no máximo load_ratio do intervalo
+            interval = min(self.max_interval, max(interval * self.backoff_factor, duration / self.load_ratio))
+        elif duration < interval * self.load_ratio / 2:
+            interval = max(self.base_interval, interval / self.backoff_factor)
+        if interval != self.interval:
+            print(f"🔁 Intervalo da varredura {self.name}: {self.interval:.0f}s -> {interval:.0f}s")
+            self.interval = interval
+            if self.on_interval_change:
+                self.on_interval_change(interval)
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "base_interval_seconds": self.base_interval,
+            "runs": self.runs,
+            "skipped_overlap": self.skipped_overlap,
+            "missed": self.missed,
+            "overruns": self.overruns,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_seconds": round(self.last_duration, 4) if self.last_duration is not None else None,
+            "stages": {stage: dict(entry) for stage, entry in self.stages.items()},
+        }
+
+
+# Instâncias globais
+# varredura sequencial do minuto (app/services/scheduler.py)
+minute_sweep = SweepRunner(
+    "minute",
+    base_interval=settings.SWEEP_INTERVAL_SECONDS,
+    max_interval=settings.SWEEP_MAX_INTERVAL_SECONDS,
+    backoff_factor=settings.SWEEP_BACKOFF_FACTOR,
+    load_ratio=settings.SWEEP_LOAD_RATIO,
+)
+# execuções do MissionDeadlineScheduler (só a telemetria por etapa; o intervalo vem das fronteiras)
+mission_sweep = SweepRunner(
+    "missions",
+    base_interval=settings.MISSION_SCHEDULER_MAX_SLEEP_SECONDS,
+    max_interval=settings.MISSION_SCHEDULER_MAX_SLEEP_SECONDS,
+)
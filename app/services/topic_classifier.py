@@ -0,0 +1,106 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from app.basic.topic import topics as topic_catalog
+from app.basic.topic_keywords import topic_keywords
+from app.schemas.draw import DrawSchemaBase
+
+
+_STOPWORDS = {
+    "a", "o", "as", "os", "um", "uma", "de", "do", "da", "dos", "das", "em", "no", "na", "nos", "nas",
+    "e", "ou", "que", "com", "por", "para", "pra", "se", "meu", "minha", "meus", "minhas", "eu", "me",
+    "ele", "ela", "vai", "vou", "sera", "sobre", "como", "qual", "quando", "isso", "esse", "essa",
+    "mais", "muito", "ja", "nao", "sim", "ao", "aos", "seu", "sua", "tem", "ter", "estou", "esta",
+}
+
+
+class TopicClassifier:
+    """
+    Classificador local de tópicos (TF-IDF + similaridade de cosseno com o centróide de cada tópico).
+    Cada tópico é representado pelo nome, descrição e palavras-chave do catálogo
+    e, depois de `fit_history`, também pelos contextos de tiragens antigas marcadas com ele.
+    """
+
+    def __init__(self, catalog: list[dict] | None = None, keywords: dict[int, str] | None = None):
+        self.catalog = catalog if catalog is not None else topic_catalog
+        self.keywords = keywords if keywords is not None else topic_keywords
+        self.names = {topic["id"]: topic["name"] for topic in self.catalog}
+        self.idf: dict[str, float] = {}
+        self.centroids: dict[int, dict[str, float]] = {}
+        self.history_size = 0
+        self._fit({})
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        text = unicodedata.normalize("NFKD", (text or "").lower())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        words = [w for w in re.findall(r"[a-z]+", text) if len(w) > 2 and w not in _STOPWORDS]
+        # radical aproximado: os 6 primeiros caracteres (trabalho/trabalhar, viagem/viajar...)
+        return [w[:6] for w in words]
+
+    def _fit(self, history: dict[int, list[str]]):
+        documents: dict[int, Counter] = {}
+        for topic in self.catalog:
+            seed = f"{topic['name']} {topic['name']} {topic.get('description', '')} {self.keywords.get(topic['id'], '')}"
+            documents[topic["id"]] = Counter(self.tokenize(seed))
+        for topic_id, contexts in history.items():
+            if topic_id in documents:
+                for context in contexts:
+                    documents[topic_id].update(self.tokenize(context))
+
+        document_frequency = Counter()
+        for counts in documents.values():
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        self.idf = {
+            term: math.log((1 + total) / (1 + frequency)) + 1
+            for term, frequency in document_frequency.items()
+        }
+        self.centroids = {
+            topic_id: self._normalize({term: (1 + math.log(count)) * self.idf[term] for term, count in counts.items()})
+            for topic_id, counts in documents.items()
+        }
+
+    @staticmethod
+    def _normalize(vector: dict[str, float]) -> dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {term: v / norm for term, v in vector.items()} if norm else vector
+
+    async def fit_history(self, session, limit: int = 5000):
+        """
+        Reforça os tópicos com os contextos das tiragens mais recentes que já têm tópicos.
+        """
+        rows = await DrawSchemaBase.get_contexts_with_topics(session, limit=limit)
+        history: dict[int, list[str]] = {}
+        for context, topic_ids in rows:
+            for topic_id in topic_ids or []:
+                history.setdefault(topic_id, []).append(context)
+        self._fit(history)
+        self.history_size = len(rows)
+
+    def classify(self, context: str, max_topics: int = 3, relative_cutoff: float = 0.6) -> tuple[list[int], float]:
+        """
+        Retorna (ids dos tópicos, confiança). A confiança é a similaridade do melhor tópico;
+        os demais só entram se tiverem pelo menos `relative_cutoff` da similaridade do melhor.
+        """
+        counts = Counter(term for term in self.tokenize(context) if term in self.idf)
+        if not counts:
+            return [], 0.0
+        query = self._normalize({term: (1 + math.log(count)) * self.idf[term] for term, count in counts.items()})
+        scores = []
+        for topic_id, centroid in self.centroids.items():
+            score = sum(weight * centroid.get(term, 0.0) for term, weight in query.items())
+            if score > 0:
+                scores.append((score, topic_id))
+        if not scores:
+            return [], 0.0
+        scores.sort(reverse=True)
+        best = scores[0][0]
+        selected = [topic_id for score, topic_id in scores[:max_topics] if score >= best * relative_cutoff]
+        return selected, best
+
+
+# Instância global
+topic_classifier = TopicClassifier()
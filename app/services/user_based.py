@@ -4,8 +4,7 @@ from app.core.postgresdatabase import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.status import StatusSchemaBase
 from app.schemas.recurrence_mode import RecurrenceMode
-from app.schemas.user import UserSchemaBase
-from app.schemas.mission_type import MissionTypeSchemaBase
+from app.services.catalog import mission_catalog
 from app.schemas.mission import MissionSchemaBase
 
 class UserBased:
@@ -30,7 +29,12 @@ class UserBased:
         return expired_date
     
     
-    async def user_based(self):
+    async def user_based(self, mission_type_ids: set[int] | None = None):
+        """
+        Expira as missões relativas à data de criação (relative_days) com um UPDATE por tipo de missão;
+        o prazo de cada instância é calculado no banco com a mesma regra de calculate_expired_date.
+        `mission_type_ids` limita a varredura a esses tipos (usado pelo MissionDeadlineScheduler); None = todos.
+        """
         async with Session() as session:
             db: AsyncSession = session
 
@@ -42,55 +46,27 @@ class UserBased:
                 *(StatusSchemaBase.get_id_by_name(db, name) for name in status_names)
             )
 
-            all_active_users = await UserSchemaBase.get_all_id_by_status(db, id_active)
+            catalog = await mission_catalog.get(db)
+            mission_types = catalog.mission_types_by([id_active, id_expired], self.id_user_based)
+            if mission_type_ids is not None:
+                mission_types = [entry for entry in mission_types if entry.id in mission_type_ids]
 
-            # print(f"All active users: {all_active_users}")
-
-            all_active_mission_types = await MissionTypeSchemaBase.get_all_id_by_status_and_recurrence_mode(
-                db, [id_active, id_expired], self.id_user_based
-            )
-
-            for mission_type_id in all_active_mission_types:
-                # Buscar todos os dados de uma vez (pode ser otimizado no banco também)
-                relative_days, reset_time = await asyncio.gather(
-                    # MissionTypeSchemaBase.get_start_date_by_id(db, mission_type_id),
-                    MissionTypeSchemaBase.get_relative_days_by_id(db, mission_type_id),
-                    MissionTypeSchemaBase.get_reset_time_by_id(db, mission_type_id)
-                )
-
-                # if not start_date:
-                #     continue
-
-                statusMission = await MissionTypeSchemaBase.get_status_by_id(db, mission_type_id)
-
-
-                for user_id in all_active_users:
-                    mission_ids = await MissionSchemaBase.get_list_id_by_user_and_types_and_period_and_status(
-                        session=db,
-                        user_id=user_id,
-                        mission_type_id=mission_type_id,
-                        start_date=None,
-                        end_date=None,
-                        status_ids=[id_pending, id_completed]
-                    )
-                    
-                    
-                    for mission_id in mission_ids:
-                        # Verificar se a missão já existe
-                        if not mission_id:
-                            continue
-                        
-                        # Obter dados da missão
-                        start_date = await MissionSchemaBase.get_created_at_by_id(db, mission_id) if mission_id else None
-                    
-                        expired_date = self.calculate_expired_date(start_date, relative_days, reset_time)
-                        
-
-                        if (expired_date and now >= expired_date and mission_id) or (statusMission == id_expired):
-                            
-                            statusMissionInstance = await MissionSchemaBase.get_status_by_mission_id(session=db, mission_id=mission_id)
-                            if statusMissionInstance == id_pending:
-                                await MissionSchemaBase.update_mission_status(db, mission_id, id_expired)
-                                # print(f"Missão {mission_type_id} do usuário {user_id} expirou e não será auto-renovada.")
-                            else:
-                                print(f"Missão {mission_type_id} do usuário {user_id} já está concluída ou expirada.")
+            rows = 0
+            for mission_type in mission_types:
+                type_rows = 0
+                try:
+                    if mission_type.status == id_expired:
+                        type_rows += await MissionSchemaBase.bulk_expire_missions(
+                            db, mission_type.id, id_active, [id_pending], id_expired
+                        )
+                    elif mission_type.relative_days is not None:
+                        type_rows += await MissionSchemaBase.bulk_expire_relative_missions(
+                            db, mission_type.id, id_active, id_pending, id_expired,
+                            mission_type.relative_days, mission_type.reset_time, now,
+                        )
+                    await db.commit()
+                    rows += type_rows
+                except Exception as e:
+                    await db.rollback()
+                    print(f"Erro ao reconciliar missões relativas do tipo {mission_type.id}: {e}")
+            return rows
@@ -16,7 +16,10 @@ from app.schemas.zodiac import ZodiacSchemaBase  # Add this import
 from app.schemas.daily_zodiac import DailyZodiacSchemaBase  # Add this import
 from app.services.planet import PlanetSignCalculator  # Add this import
 from app.services.openai import OpenAIService
+from app.services.activity import precompute_active_since
+from app.services.llm_governor import LLMLane
 from app.services.extract import JsonExtractor
+from app.services.batch_runner import BatchRunner
 from app.prompts.daily_zodiac import build_daily_zodiac_prompt, build_daily_zodiac_role
 import asyncio
 
@@ -25,13 +28,15 @@ class DailyZodiacService:
     def __init__(self):
         # Inicializa o dicionário com as posições atuais dos planetas uma única vez
         self.current_positions_dict = None
+        self.positions_date = None
         # retry configuration
         self.max_retries = 3
         self.retry_delay = 2  # seconds
         self.backoff = 2  # exponential backoff multiplier
         
     async def _initialize_planet_positions(self, db: AsyncSession):
-        if self.current_positions_dict is None:
+        # recalcula quando o dia muda (a instância pode ser longa, como na geração sob demanda)
+        if self.current_positions_dict is None or self.positions_date != datetime.now().date():
             planets = await PlanetSchemaBase.get_all_planet_ids_and_names(session=db)
             now_date = datetime.now().strftime("%Y-%m-%d")
             now_time = datetime.now().strftime("%H:%M")
@@ -54,14 +59,19 @@ class DailyZodiacService:
                     else None
                 )
             self.current_positions_dict = positions
+            self.positions_date = datetime.now().date()
 
     async def create_daily_zodiac_for_user(
         self,
         db: AsyncSession,
-        user_id: int
+        user_id: int,
+        lane: LLMLane = LLMLane.BATCH,
+        deadline: float | None = None,
     ):
         """
         Create a daily zodiac for a specific user.
+        The prompt combines the user's natal signs with the day's planet positions,
+        loaded once per day by _initialize_planet_positions.
         """
         try:
             print(f"Creating daily zodiac for user {user_id}...")
@@ -117,6 +127,8 @@ class DailyZodiacService:
                 role=role,
                 max_tokens=requested_max_tokens,
                 temperature=0.9,
+                lane=lane,
+                deadline=deadline,
             )
             # print(f"Response from OpenAI: {response}")  # Debugging line to check the response
             
@@ -147,6 +159,8 @@ class DailyZodiacService:
     async def create_daily_zodiac_for_all_users(self):
         """
         Create a daily zodiac for all active users.
+        Users are processed concurrently by a BatchRunner (one session per worker);
+        the run is tracked in the job ledger so a restart resumes only the missing users.
         """
         async with Session() as session:
             db: AsyncSession = session
@@ -159,53 +173,32 @@ class DailyZodiacService:
             id_admin = await UserTypeSchemaBase.get_id_by_name(session=session, name="ADM")
 
             active_users = await UserSchemaBase.get_all_id_by_status(
-                db=db, status_id=id_active, user_type=[id_standard, id_premium, id_admin], require_birth_info=True
+                db=db, status_id=id_active, user_type=[id_standard, id_premium, id_admin], require_birth_info=True,
+                active_since=precompute_active_since(),
             )
 
             if not active_users:
                 print("No active users found.")
                 return
 
-            print(f"Active users: {active_users}")
-            errors = []
-            processed = 0
-            for user in active_users:
-                # retry loop for creating daily zodiac per user
-                last_exc = None
-                for attempt in range(self.max_retries):
-                    try:
-                        await self.create_daily_zodiac_for_user(db=db, user_id=user)
-                        processed += 1
-                        last_exc = None
-                        break
-                    except Exception as e:
-                        last_exc = e
-                        wait = self.retry_delay * (self.backoff ** attempt)
-                        print(f"Attempt {attempt+1} failed for user {user}: {e}. Retrying in {wait}s...")
-                        if attempt < self.max_retries - 1:
-                            await asyncio.sleep(wait)
-                        else:
-                            print(f"All attempts failed for user {user}: {e}")
-                            errors.append({"user": user, "error": str(e)})
-
-                # retry deleting old entries (best-effort)
-                last_del_exc = None
-                for attempt in range(max(1, self.max_retries - 1)):
-                    try:
-                        await DailyZodiacSchemaBase.delete_old_entries(session=db, user_id=user, count=7)
-                        last_del_exc = None
-                        break
-                    except Exception as e:
-                        last_del_exc = e
-                        wait = self.retry_delay * (self.backoff ** attempt)
-                        print(f"Attempt {attempt+1} to delete old entries failed for user {user}: {e}. Retrying in {wait}s...")
-                        if attempt < max(1, self.max_retries - 1) - 1:
-                            await asyncio.sleep(wait)
-                        else:
-                            print(f"Delete attempts failed for user {user}: {e}")
-                            errors.append({"user": user, "error_delete": str(e)})
-
-            print(f"Processed {processed} of {len(active_users)} users. Errors: {errors}")
-            return {"processed": processed, "total": len(active_users), "errors": errors}
-
-            # agora por ultimo vamos fazer uma funcão que so mantem os 7 ultimos dias de leitura salvos
+            # usuários que já receberam o horóscopo hoje (execução anterior interrompida) não recebem outro
+            start_of_day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            already_created = await DailyZodiacSchemaBase.get_user_ids_with_entry_since(db, active_users, start_of_day)
+            active_users = [user for user in active_users if user not in already_created]
+
+            # as posições atuais são as mesmas para todos; calcula antes de iniciar os workers
+            if active_users:
+                await self._initialize_planet_positions(db)
+
+        runner = BatchRunner(
+            "daily_zodiac",
+            max_attempts=self.max_retries,
+            retry_delay=self.retry_delay,
+            backoff=self.backoff,
+            ledger=True,
+        )
+        report = await runner.run(
+            active_users, lambda db, user: self.create_daily_zodiac_for_user(db=db, user_id=user)
+        )
+        print(f"Processed {report['processed']} of {report['total']} users. Errors: {report['errors']}")
+        return report
@@ -0,0 +1,33 @@
+import asyncio
+import signal
+
+from app.core.lifespan import init_database, start_background_jobs, stop_background_jobs
+from app.services.openai import OpenAIService
+
+
+async def main():
+    """
+    Processo de jobs em segundo plano, separado da API:
+    varredura de 1 minuto (missões, eventos, assinaturas...) e jobs diários (presentes,
+    horóscopo, caminho diário, dicas). Com várias réplicas, só o líder eleito executa.
+
+    Uso: python -m app.worker  (e a API com RUN_BACKGROUND_JOBS=false)
+    """
+    await init_database()
+    tasks = start_background_jobs()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    print("⚙️ Worker iniciado; aguardando jobs (Ctrl+C para encerrar)")
+    await stop.wait()
+
+    print("Encerrando worker...")
+    await stop_background_jobs(tasks)
+    await OpenAIService.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())